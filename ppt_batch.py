@@ -0,0 +1,418 @@
+# PPT 多檔案批次轉換 (Multi-file Batch)
+# 接受目錄與萬用字元，將 (檔案 × 風格) 工作分派到行程池；每完成一個工作就寫入 manifest，
+# 中斷後以 --resume 重新執行時會跳過已完成的工作
+
+"""
+使用方法:
+    # 轉換目錄下所有 .pptx (含子目錄)，4 個行程
+    python ppt_batch.py decks/ --recursive --all --workers 4
+
+    # 萬用字元 (請加引號，交給程式展開)
+    python ppt_batch.py "decks/**/*.pptx" --styles modern minimal
+
+    # 中斷後繼續 (跳過 manifest 中已成功的工作)
+    python ppt_batch.py decks/ --recursive --all --workers 4 --resume
+
+    # 也可以從主程式使用 (傳入多個檔案、目錄或萬用字元時自動切換為批次模式)
+    python ppt_style_converter.py decks/ --all --workers 4
+"""
+
+import argparse
+import contextlib
+import glob
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from ppt_media import DEFAULT_MEDIA_DPI
+from ppt_store import OutputStore, DEFAULT_OUTPUT_MAX_BYTES
+from ppt_style_converter import (PPTStyleConverter, STYLE_PRESETS, ENGINES, DEFAULT_ENGINE)
+
+MANIFEST_NAME = 'manifest.jsonl'
+_GLOB_CHARS = '*?['
+
+
+# ==================== 輸入展開 ====================
+
+def is_batch_pattern(pattern: str) -> bool:
+    """輸入是否為目錄或萬用字元 (需要展開為多個檔案)"""
+    return os.path.isdir(pattern) or any(char in pattern for char in _GLOB_CHARS)
+
+
+def expand_inputs(patterns: Iterable[str], recursive: bool = False) -> List[Path]:
+    """將檔案、目錄與萬用字元展開為 .pptx 檔案列表
+
+    Args:
+        patterns: 檔案路徑、目錄或萬用字元 (支援 **)
+        recursive: 目錄是否包含子目錄
+
+    Returns:
+        排序且不重複的檔案列表 (略過 Office 的 ~$ 暫存檔)
+    """
+    files = set()
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            root = Path(pattern)
+            files.update(root.rglob('*.pptx') if recursive else root.glob('*.pptx'))
+        elif any(char in pattern for char in _GLOB_CHARS):
+            files.update(Path(path) for path in glob.glob(pattern, recursive=True))
+        else:
+            files.add(Path(pattern))
+    return sorted(path for path in files
+                  if path.suffix.lower() == '.pptx' and not path.name.startswith('~$'))
+
+
+def _output_dirs(files: List[Path], output_root: Path) -> Dict[Path, Path]:
+    """依輸入檔案的相對位置決定輸出目錄 (避免不同目錄的同名檔案互相覆寫)"""
+    parents = [path.parent.resolve() for path in files]
+    base = Path(os.path.commonpath(parents)) if parents else Path('.')
+    return {path: output_root / parent.relative_to(base)
+            for path, parent in zip(files, parents)}
+
+
+# ==================== Manifest ====================
+
+def _file_signature(path: Path) -> Tuple[int, int]:
+    """檔案大小與修改時間 (判斷上次完成後檔案是否被修改)"""
+    stat = path.stat()
+    return stat.st_size, stat.st_mtime_ns
+
+
+class BatchManifest:
+    """以 JSON Lines 記錄每個工作的結果 (只附加寫入，中斷時最多遺失正在寫入的一行)"""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def job_key(path: Path, style_name: str, engine: str) -> str:
+        return f"{path.resolve()}|{style_name}|{engine}"
+
+    def completed(self) -> Dict[str, Dict]:
+        """讀取已成功完成的工作 {工作鍵: 最後一筆紀錄}"""
+        latest = {}
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue  # 中斷時寫到一半的行
+                    latest[record['key']] = record
+        except OSError:
+            return {}
+        return {key: record for key, record in latest.items() if record['status'] == 'done'}
+
+    def append(self, record: Dict):
+        """寫入一筆紀錄並立即同步到磁碟"""
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record, ensure_ascii=False) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+
+
+def _output_settings(optimize_media: bool, media_dpi: int, fix_contrast: bool) -> Dict:
+    """影響輸出內容的選項 (記錄於 manifest；選項改變時 --resume 不跳過舊的輸出)"""
+    return {'optimize_media': optimize_media,
+            'media_dpi': media_dpi if optimize_media else None,
+            'fix_contrast': fix_contrast}
+
+
+def _is_done(record: Optional[Dict], path: Path, settings: Dict) -> bool:
+    """manifest 中的紀錄是否仍然有效 (輸入未修改、選項相同且輸出檔案存在)"""
+    if record is None or record.get('settings') != settings:
+        return False
+    try:
+        size, mtime_ns = _file_signature(path)
+    except OSError:
+        return False
+    return (record['size'] == size and record['mtime_ns'] == mtime_ns
+            and record['output'] is not None and os.path.exists(record['output']))
+
+
+# ==================== 工作行程 ====================
+# 排程單位是「一個檔案的所有待處理風格」，每份簡報在工作行程中只解析一次；
+# manifest 仍以 (檔案 × 風格) 為單位記錄
+
+_worker_options = None
+
+
+def _init_worker(options: Dict):
+    """工作行程初始化: 記錄轉換器設定"""
+    global _worker_options
+    _worker_options = options
+
+
+def _convert_file(path: str, output_dir: str, styles: List[str],
+                  options: Dict = None
+                  ) -> List[Tuple[str, Optional[str], Optional[str], float, Optional[str],
+                                  Optional[int], Optional[int]]]:
+    """轉換單一檔案的多種風格 (進度輸出不顯示，結果由主行程彙整)
+
+    Returns:
+        每種風格一筆 (風格名稱, 輸出檔案路徑, 錯誤訊息, 耗時秒數, 原始檔案內容雜湊,
+        媒體最佳化節省的位元組數, 對比不足的文字 run 數)
+    """
+    options = options if options is not None else _worker_options
+    with open(os.devnull, 'w', encoding='utf-8') as devnull, \
+            contextlib.redirect_stdout(devnull):
+        try:
+            converter = PPTStyleConverter(path, **options)
+        except Exception as e:
+            return [(style_name, None, str(e), 0.0, None, None, None) for style_name in styles]
+        converter.output_dir = Path(output_dir)
+        results = []
+        for style_name in styles:
+            style_name, output_file, error, seconds, _, metrics = converter._run_style(style_name)
+            reported = error is None and metrics is not None
+            media_saved = metrics.media.bytes_saved \
+                if reported and metrics.media is not None else None
+            contrast_failures = metrics.contrast.failing \
+                if reported and metrics.contrast is not None else None
+            results.append((style_name, output_file, error, seconds, converter.source_hash,
+                            media_saved, contrast_failures))
+    return results
+
+
+# ==================== 批次執行 ====================
+
+def run_batch(patterns: List[str], styles: List[str], output_root: str = './redesigned_ppts',
+              workers: int = 1, engine: str = DEFAULT_ENGINE, passthrough: bool = True,
+              incremental: bool = True, recursive: bool = False, resume: bool = False,
+              manifest_path: str = None,
+              output_max_bytes: Optional[int] = DEFAULT_OUTPUT_MAX_BYTES,
+              output_max_age_days: Optional[float] = None,
+              streaming: bool = False, optimize_media: bool = False,
+              media_dpi: int = DEFAULT_MEDIA_DPI, media_workers: int = 1,
+              audit_contrast: bool = False, fix_contrast: bool = False) -> Dict[str, int]:
+    """批次轉換多個檔案
+
+    Args:
+        patterns: 檔案路徑、目錄或萬用字元
+        styles: 風格列表
+        output_root: 輸出根目錄 (保留輸入檔案的相對目錄結構)
+        workers: 平行處理的行程數
+        engine: 轉換引擎
+        passthrough: 儲存時直接複製未修改的 zip 項目
+        incremental: 重用上次輸出中內容未變的投影片
+        recursive: 目錄是否包含子目錄
+        resume: 跳過 manifest 中已成功完成的工作
+        manifest_path: manifest 檔案路徑 (預設為輸出根目錄下的 manifest.jsonl)
+        output_max_bytes: 輸出根目錄的總大小上限 (None 表示不限制)
+        output_max_age_days: 超過此天數未使用的輸出會被刪除 (None 表示不限制)
+        streaming: 逐張讀取、轉換並寫入投影片 (不載入整份簡報)
+        optimize_media: 縮小解析度過高的圖片並合併重複圖片
+        media_dpi: 圖片在顯示尺寸下保留的解析度 (每吋像素)
+        media_workers: 縮小圖片使用的行程數 (workers > 1 時固定為 1，避免行程數相乘)
+        audit_contrast: 檢查輸出中文字與背景的 WCAG 對比
+        fix_contrast: 檢查對比並將不足的文字色調整到符合 WCAG AA
+
+    Returns:
+        {'done': 成功數, 'failed': 失敗數, 'skipped': 跳過數, 'evicted': 淘汰的舊輸出數,
+         'media_saved': 媒體最佳化節省的位元組數,
+         'contrast_failures': 對比不足的文字 run 數 (調整模式下為調整前)}
+    """
+    for style_name in styles:
+        if style_name not in STYLE_PRESETS:
+            raise ValueError(f"未知風格: {style_name}")
+
+    files = expand_inputs(patterns, recursive=recursive)
+    output_root = Path(output_root)
+    manifest = BatchManifest(manifest_path or output_root / MANIFEST_NAME)
+    completed = manifest.completed() if resume else {}
+    # 工作行程不寫入索引，由主行程記錄所有輸出並淘汰超出限制的舊輸出；
+    # 本次執行寫入的輸出已在 manifest 中標記完成，淘汰時一律保留 (否則 --resume 會跳過已遺失的輸出)
+    store = OutputStore(output_root, max_bytes=output_max_bytes,
+                        max_age_days=output_max_age_days)
+    output_dirs = _output_dirs(files, output_root)
+
+    # 依檔案分組待處理的風格
+    settings = _output_settings(optimize_media, media_dpi, fix_contrast)
+    tasks = []
+    skipped = 0
+    for path in files:
+        pending = [style_name for style_name in styles
+                   if not _is_done(completed.get(BatchManifest.job_key(path, style_name, engine)),
+                                   path, settings)]
+        skipped += len(styles) - len(pending)
+        if pending:
+            tasks.append((path, pending))
+
+    total_jobs = sum(len(pending) for _, pending in tasks)
+    workers = max(1, min(workers, len(tasks)))
+    print("\n📦 開始批次轉換...")
+    print(f"   檔案: {len(files)} 個 | 風格: {len(styles)} 種 | 工作: {total_jobs} 個")
+    if skipped:
+        print(f"   跳過已完成的工作: {skipped} 個")
+    if workers > 1:
+        print(f"   平行處理: {workers} 個行程")
+    print(f"   Manifest: {manifest.path}")
+    print("-" * 60)
+
+    options = {'engine': engine, 'passthrough': passthrough, 'incremental': incremental,
+               'index_outputs': False, 'streaming': streaming, 'optimize_media': optimize_media,
+               'media_dpi': media_dpi, 'media_workers': media_workers if workers == 1 else 1,
+               'audit_contrast': audit_contrast, 'fix_contrast': fix_contrast}
+    counts = {'done': 0, 'failed': 0, 'skipped': skipped, 'evicted': 0, 'media_saved': 0,
+              'contrast_failures': 0}
+    finished = 0
+    written: List[str] = []
+    start = time.perf_counter()
+
+    def record_results(path: Path, results):
+        nonlocal finished
+        try:
+            size, mtime_ns = _file_signature(path)
+        except OSError:
+            size, mtime_ns = None, None
+        deck_saved, optimized = 0, 0
+        for (style_name, output_file, error, seconds, source_hash, media_saved,
+             contrast_failures) in results:
+            finished += 1
+            if media_saved is not None:
+                deck_saved += media_saved
+                optimized += 1
+            if error is None:
+                counts['evicted'] += len(store.record(output_file, str(path), source_hash,
+                                                      style_name, engine, seconds, keep=written))
+                written.append(output_file)
+            status = 'done' if error is None else 'failed'
+            counts[status] += 1
+            manifest.append({
+                'key': BatchManifest.job_key(path, style_name, engine),
+                'file': str(path), 'style': style_name, 'engine': engine,
+                'size': size, 'mtime_ns': mtime_ns, 'settings': settings,
+                'status': status, 'error': error,
+                'output': str(Path(output_file).resolve()) if output_file else None,
+                'seconds': round(seconds, 4),
+                'media_saved': media_saved,
+                'contrast_failures': contrast_failures,
+                'finished': datetime.now().isoformat(timespec='seconds'),
+            })
+            mark = '✓' if error is None else '✗'
+            detail = f"({seconds:.2f}s)" if error is None else f"失敗: {error}"
+            if contrast_failures:
+                counts['contrast_failures'] += contrast_failures
+                detail += (f" 🔍 對比不足 {contrast_failures} 個 run"
+                           f"{' (已調整)' if fix_contrast else ''}")
+            print(f"{mark} [{finished}/{total_jobs}] {path} × {style_name} {detail}")
+        if optimized:
+            counts['media_saved'] += deck_saved
+            print(f"  🖼️ {path}: 媒體最佳化節省 {deck_saved / 1024 / 1024:.2f} MB "
+                  f"({optimized} 個輸出)")
+
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(options,)) as executor:
+            futures = {
+                executor.submit(_convert_file, str(path), str(output_dirs[path]), pending): path
+                for path, pending in tasks
+            }
+            for future in as_completed(futures):
+                path = futures[future]
+                try:
+                    results = future.result()
+                except Exception as e:  # 工作行程異常結束 (例如記憶體不足)
+                    results = [(style_name, None, str(e), 0.0, None, None, None)
+                               for style_name in dict(tasks)[path]]
+                record_results(path, results)
+    else:
+        for path, pending in tasks:
+            record_results(path, _convert_file(str(path), str(output_dirs[path]), pending,
+                                               options))
+
+    wall_time = time.perf_counter() - start
+    print("-" * 60)
+    print(f"✓ 批次轉換完成: 成功 {counts['done']} | 失敗 {counts['failed']} | "
+          f"跳過 {counts['skipped']}")
+    print(f"  總耗時: {wall_time:.2f} 秒")
+    if counts['media_saved']:
+        print(f"  🖼️ 媒體最佳化共節省 {counts['media_saved'] / 1024 / 1024:.2f} MB")
+    if counts['contrast_failures']:
+        action = '已調整' if fix_contrast else '加上 --fix-contrast 可自動調整'
+        print(f"  🔍 對比不足的文字 run 共 {counts['contrast_failures']} 個 ({action})")
+    if counts['evicted']:
+        print(f"  🗑️ 已淘汰 {counts['evicted']} 個舊輸出 (超出輸出目錄限制)")
+    if counts['failed']:
+        print(f"  失敗的工作記錄於 {manifest.path}，修正後可加上 --resume 重新執行")
+    return counts
+
+
+def add_batch_arguments(parser: argparse.ArgumentParser):
+    """批次模式專用的命令行參數"""
+    parser.add_argument('--recursive', action='store_true', help='目錄包含子目錄')
+    parser.add_argument('--resume', action='store_true',
+                        help='跳過 manifest 中已成功完成的工作')
+    parser.add_argument('--manifest', help=f'manifest 檔案路徑 (預設 <輸出目錄>/{MANIFEST_NAME})')
+    parser.add_argument('--output-dir', default='./redesigned_ppts', help='輸出根目錄')
+    parser.add_argument('--output-max-mb', type=int,
+                        default=0,
+                        help='輸出目錄大小上限 (MB，超過時刪除最久未使用的輸出；預設 0 表示不限制)')
+    parser.add_argument('--output-max-age-days', type=float,
+                        help='刪除超過此天數未使用的輸出 (預設不限制)')
+
+
+def add_media_arguments(parser: argparse.ArgumentParser):
+    """媒體最佳化的命令行參數"""
+    parser.add_argument('--optimize-media', action='store_true',
+                        help='縮小解析度超過顯示尺寸所需的圖片並合併重複圖片')
+    parser.add_argument('--media-dpi', type=int, default=DEFAULT_MEDIA_DPI,
+                        help=f'圖片在顯示尺寸下保留的解析度 (預設 {DEFAULT_MEDIA_DPI} dpi)')
+    parser.add_argument('--media-workers', type=int, default=1,
+                        help='縮小圖片使用的行程數 (預設 1)')
+
+
+def add_contrast_arguments(parser: argparse.ArgumentParser):
+    """文字對比檢查的命令行參數"""
+    parser.add_argument('--audit-contrast', action='store_true',
+                        help='檢查輸出中文字與背景的 WCAG 對比並列出不足的投影片')
+    parser.add_argument('--fix-contrast', action='store_true',
+                        help='檢查對比並將不足的文字色調整到符合 WCAG AA')
+
+
+def output_limit_bytes(args: argparse.Namespace) -> Optional[int]:
+    """命令行參數中的輸出目錄大小上限 (位元組；None 表示不限制)"""
+    return args.output_max_mb * 1024 * 1024 if args.output_max_mb > 0 else None
+
+
+def main():
+    """命令行介面"""
+    parser = argparse.ArgumentParser(description='PPT 多檔案批次轉換')
+    parser.add_argument('inputs', nargs='+', help='檔案、目錄或萬用字元')
+    parser.add_argument('--styles', nargs='+', help='指定風格 (空格分隔)')
+    parser.add_argument('--all', action='store_true', help='使用所有風格')
+    parser.add_argument('--workers', type=int, default=1, help='平行處理的行程數 (預設 1)')
+    parser.add_argument('--engine', choices=ENGINES, default=DEFAULT_ENGINE,
+                        help=f'轉換引擎 (預設 {DEFAULT_ENGINE})')
+    parser.add_argument('--no-passthrough', action='store_true',
+                        help='儲存時重新壓縮整個檔案 (不直接複製未修改的項目)')
+    parser.add_argument('--no-incremental', action='store_true',
+                        help='每次都完整轉換 (不重用上次輸出中未修改的投影片)')
+    parser.add_argument('--streaming', action='store_true',
+                        help='逐張讀取、轉換並寫入投影片，記憶體峰值與投影片數無關 (大型簡報)')
+    add_media_arguments(parser)
+    add_contrast_arguments(parser)
+    add_batch_arguments(parser)
+    args = parser.parse_args()
+
+    styles = list(STYLE_PRESETS) if args.all else (args.styles or ['modern', 'minimal'])
+    counts = run_batch(args.inputs, styles, output_root=args.output_dir, workers=args.workers,
+                       engine=args.engine, passthrough=not args.no_passthrough,
+                       incremental=not args.no_incremental, recursive=args.recursive,
+                       resume=args.resume, manifest_path=args.manifest,
+                       output_max_bytes=output_limit_bytes(args),
+                       output_max_age_days=args.output_max_age_days,
+                       streaming=args.streaming, optimize_media=args.optimize_media,
+                       media_dpi=args.media_dpi, media_workers=args.media_workers,
+                       audit_contrast=args.audit_contrast, fix_contrast=args.fix_contrast)
+    sys.exit(1 if counts['failed'] else 0)
+
+
+if __name__ == '__main__':
+    main()
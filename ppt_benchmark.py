@@ -0,0 +1,355 @@
+# PPT 風格轉換效能測試 (Benchmark Suite)
+# 產生指定規模的合成簡報，分別量測載入、套用風格與儲存的時間及記憶體峰值
+
+"""
+使用方法:
+    # 以 50 / 200 張投影片、每段 3 個 run、每張 1 個表格與 1 個群組測試
+    python ppt_benchmark.py --slides 50 200 --runs 3 --tables 1 --groups 1 --output bench.json
+
+    # 比較兩次測試結果 (例如新舊版本)
+    python ppt_benchmark.py --compare bench_old.json bench_new.json
+
+    # 量測網頁介面冷啟動與重新執行的腳本耗時，超出預算時結束代碼為 1
+    python ppt_benchmark.py --app
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from io import BytesIO
+from pathlib import Path
+from typing import Dict, List
+
+import pptx
+from pptx import Presentation
+from pptx.util import Inches, Pt
+
+from ppt_style_converter import PPTStyleConverter, STYLE_PRESETS, ENGINES, ENGINE_VERSION
+from ppt_style_program import compile_style
+
+STAGES = ('load', 'clone', 'apply', 'save')
+
+APP_PATH = Path(__file__).with_name('streamlit_ppt_converter.py')
+# 網頁介面的腳本耗時預算 (秒)，不含 Streamlit 本身的載入與瀏覽器繪製
+APP_BUDGET = {'cold_start': 0.5, 'rerun': 0.05}
+# 冷啟動時不應載入的套件 (只在開啟的分頁需要時才載入)
+APP_LAZY_MODULES = ('pptx', 'pandas')
+
+
+# ==================== 合成簡報 ====================
+
+def _noise_image(image_bytes: int) -> BytesIO:
+    """產生約 image_bytes 大小的 PNG (隨機像素無法被壓縮，檔案大小接近原始資料)"""
+    from PIL import Image
+
+    side = max(8, int((image_bytes / 3) ** 0.5))
+    image = Image.frombytes('RGB', (side, side), os.urandom(side * side * 3))
+    buffer = BytesIO()
+    image.save(buffer, 'PNG', compress_level=1)
+    buffer.seek(0)
+    return buffer
+
+
+def generate_synthetic_deck(slides: int = 50, paragraphs: int = 5, runs_per_paragraph: int = 3,
+                            tables: int = 0, groups: int = 0, image_bytes: int = 0) -> bytes:
+    """產生指定規模的合成簡報
+
+    Args:
+        slides: 投影片數
+        paragraphs: 每張投影片正文的段落數
+        runs_per_paragraph: 每個段落的 run 數
+        tables: 每張投影片的表格數 (3 x 3)
+        groups: 每張投影片的群組數 (每組兩個文字框)
+        image_bytes: 每張投影片圖片的大約位元組數 (0 表示不加圖片；每張圖片內容都不同)
+
+    Returns:
+        .pptx 檔案內容
+    """
+    prs = Presentation()
+    layout = prs.slide_layouts[1]  # 標題及內容
+
+    for slide_idx in range(slides):
+        slide = prs.slides.add_slide(layout)
+        slide.shapes.title.text = f"投影片 {slide_idx + 1}"
+
+        text_frame = slide.placeholders[1].text_frame
+        for para_idx in range(paragraphs):
+            paragraph = text_frame.paragraphs[0] if para_idx == 0 else text_frame.add_paragraph()
+            for run_idx in range(runs_per_paragraph):
+                run = paragraph.add_run()
+                run.text = f"段落 {para_idx + 1} 文字 {run_idx + 1} "
+                run.font.size = Pt(14)
+
+        for table_idx in range(tables):
+            table = slide.shapes.add_table(
+                3, 3, Inches(0.5 + table_idx), Inches(4.5), Inches(3), Inches(1.5)).table
+            for cell in table.iter_cells():
+                cell.text = "儲存格"
+
+        for group_idx in range(groups):
+            group = slide.shapes.add_group_shape()
+            for box_idx in range(2):
+                box = group.shapes.add_textbox(
+                    Inches(6 + box_idx), Inches(1 + group_idx), Inches(1), Inches(0.5))
+                box.text_frame.text = f"群組 {group_idx + 1}-{box_idx + 1}"
+
+        if image_bytes:
+            slide.shapes.add_picture(_noise_image(image_bytes), Inches(7), Inches(5), Inches(2))
+
+    buffer = BytesIO()
+    prs.save(buffer)
+    return buffer.getvalue()
+
+
+# ==================== 量測 ====================
+
+class _quiet:
+    """暫時隱藏轉換器的進度輸出"""
+
+    def __enter__(self):
+        self._stdout = sys.stdout
+        sys.stdout = open(os.devnull, 'w', encoding='utf-8')
+
+    def __exit__(self, *exc):
+        sys.stdout.close()
+        sys.stdout = self._stdout
+
+
+def _run_stages(deck: bytes, style_name: str, engine: str) -> Dict[str, float]:
+    """執行一次完整轉換並回傳各階段耗時 (秒)"""
+    style = STYLE_PRESETS[style_name]
+    timings = {}
+
+    start = time.perf_counter()
+    converter = PPTStyleConverter.from_buffer(deck, name='benchmark.pptx', engine=engine)
+    converter.prs  # 觸發解析
+    program = compile_style(style)
+    if engine == 'fanout':
+        converter._fanout_index(program)  # 每份簡報只分析一次，計入載入時間
+    timings['load'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    output_prs = converter._clone_template(engine)
+    timings['clone'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    apply_style = {
+        'proxy': converter.apply_style_to_slide,
+        'lxml': converter.apply_style_to_slide_lxml,
+        'theme': converter.apply_style_to_slide_theme,
+        'fanout': converter.apply_style_to_slide_fanout,
+    }[engine]
+    if engine == 'theme':
+        converter.apply_style_to_theme(output_prs, style)
+    for slide in output_prs.slides:
+        apply_style(slide, program)
+    timings['apply'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    converter._save_output(output_prs, BytesIO(), engine)
+    timings['save'] = time.perf_counter() - start
+
+    return timings
+
+
+def _peak_memory(deck: bytes, style_name: str, engine: str) -> int:
+    """以 tracemalloc 量測一次轉換的記憶體峰值 (與計時分開執行，避免影響時間)"""
+    tracemalloc.start()
+    try:
+        _run_stages(deck, style_name, engine)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def run_benchmark(deck: bytes, engines: List[str], style_name: str = 'modern',
+                  repeat: int = 3) -> List[Dict]:
+    """對同一份簡報以各引擎量測
+
+    Args:
+        deck: 簡報內容
+        engines: 要量測的引擎
+        style_name: 使用的風格
+        repeat: 重複次數 (取中位數)
+
+    Returns:
+        每個引擎一筆結果
+    """
+    results = []
+    for engine in engines:
+        with _quiet():
+            runs = [_run_stages(deck, style_name, engine) for _ in range(repeat)]
+            peak = _peak_memory(deck, style_name, engine)
+        stages = {stage: statistics.median(run[stage] for run in runs) for stage in STAGES}
+        results.append({
+            'engine': engine,
+            'style': style_name,
+            'stages': stages,
+            'total': sum(stages.values()),
+            'peak_memory': peak,
+        })
+    return results
+
+
+def benchmark_matrix(slide_counts: List[int], engines: List[str], repeat: int = 3,
+                     **deck_options) -> Dict:
+    """依投影片數產生簡報並量測，回傳可存成 JSON 的結果"""
+    cases = []
+    for slides in slide_counts:
+        deck = generate_synthetic_deck(slides=slides, **deck_options)
+        for result in run_benchmark(deck, engines, repeat=repeat):
+            result.update({'slides': slides, 'deck_bytes': len(deck), **deck_options})
+            cases.append(result)
+            print(f"  {slides:>5} 張 | {result['engine']:<6} | "
+                  + " ".join(f"{stage} {result['stages'][stage]:.3f}s" for stage in STAGES)
+                  + f" | 峰值 {result['peak_memory'] / 1024 / 1024:.1f} MB")
+    return {
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'engine_version': ENGINE_VERSION,
+        'python': platform.python_version(),
+        'python_pptx': pptx.__version__,
+        'platform': platform.platform(),
+        'repeat': repeat,
+        'cases': cases,
+    }
+
+
+def compare_results(old: Dict, new: Dict):
+    """比較兩份測試結果 (相同投影片數與引擎的案例)，列出耗時比例"""
+    def key(case):
+        return case['slides'], case['engine']
+
+    old_cases = {key(case): case for case in old['cases']}
+    print(f"{'投影片':>6} {'引擎':<6} {'舊 (s)':>9} {'新 (s)':>9} {'比例':>7} {'記憶體比例':>10}")
+    for case in new['cases']:
+        before = old_cases.get(key(case))
+        if before is None:
+            continue
+        ratio = case['total'] / before['total'] if before['total'] else float('nan')
+        memory_ratio = (case['peak_memory'] / before['peak_memory']
+                        if before['peak_memory'] else float('nan'))
+        print(f"{case['slides']:>6} {case['engine']:<6} {before['total']:>9.3f} "
+              f"{case['total']:>9.3f} {ratio:>6.2f}x {memory_ratio:>9.2f}x")
+
+
+# ==================== 網頁介面 ====================
+
+# 在新的行程中以 AppTest 執行網頁介面；腳本自行記錄每次執行的耗時 (last_run_seconds)
+_APP_PROBE = """
+import json, statistics, sys
+from streamlit.testing.v1 import AppTest
+
+app = AppTest.from_file(sys.argv[1], default_timeout=120)
+app.run()
+result = {'cold_start': app.session_state['last_run_seconds'],
+          'loaded': [name for name in json.loads(sys.argv[3]) if name in sys.modules],
+          'tabs': {}}
+for label in [tab.label for tab in app.tabs]:
+    app.session_state['main_tab'] = label
+    app.run()
+    seconds = []
+    for _ in range(int(sys.argv[2])):
+        app.run()
+        seconds.append(app.session_state['last_run_seconds'])
+    result['tabs'][label] = statistics.median(seconds)
+print(json.dumps(result))
+"""
+
+
+def benchmark_app(app_path: Path = APP_PATH, reruns: int = 10) -> Dict:
+    """量測網頁介面的冷啟動與各分頁重新執行的腳本耗時
+
+    Args:
+        app_path: Streamlit 腳本
+        reruns: 每個分頁重新執行的次數 (取中位數)
+
+    Returns:
+        {'cold_start': 秒, 'loaded': 冷啟動後已載入的延遲載入套件, 'tabs': {分頁: 秒}}
+    """
+    completed = subprocess.run(
+        [sys.executable, '-c', _APP_PROBE, str(app_path), str(reruns),
+         json.dumps(APP_LAZY_MODULES)],
+        cwd=Path(app_path).parent, capture_output=True, text=True, check=True)
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def check_app_budget(result: Dict) -> List[str]:
+    """檢查網頁介面量測結果，回傳超出預算的項目"""
+    problems = []
+    if result['cold_start'] > APP_BUDGET['cold_start']:
+        problems.append(f"冷啟動 {result['cold_start'] * 1000:.1f} ms "
+                        f"> {APP_BUDGET['cold_start'] * 1000:.0f} ms")
+    if result['loaded']:
+        problems.append(f"冷啟動時載入了 {', '.join(result['loaded'])}")
+    for label, seconds in result['tabs'].items():
+        if seconds > APP_BUDGET['rerun']:
+            problems.append(f"{label} 重新執行 {seconds * 1000:.1f} ms "
+                            f"> {APP_BUDGET['rerun'] * 1000:.0f} ms")
+    return problems
+
+
+def main():
+    """命令行介面"""
+    parser = argparse.ArgumentParser(description='PPT 風格轉換效能測試')
+    parser.add_argument('--slides', type=int, nargs='+', default=[10, 100], help='投影片數')
+    parser.add_argument('--paragraphs', type=int, default=5, help='每張投影片的段落數')
+    parser.add_argument('--runs', type=int, default=3, help='每個段落的 run 數')
+    parser.add_argument('--tables', type=int, default=0, help='每張投影片的表格數')
+    parser.add_argument('--groups', type=int, default=0, help='每張投影片的群組數')
+    parser.add_argument('--image-kb', type=int, default=0, help='每張投影片的圖片大小 (KB)')
+    parser.add_argument('--engines', nargs='+', choices=ENGINES, default=list(ENGINES),
+                        help='要量測的引擎')
+    parser.add_argument('--repeat', type=int, default=3, help='重複次數 (取中位數)')
+    parser.add_argument('--output', help='結果輸出 JSON 檔案')
+    parser.add_argument('--compare', nargs=2, metavar=('OLD', 'NEW'), help='比較兩份結果')
+    parser.add_argument('--app', action='store_true',
+                        help='量測網頁介面的冷啟動與重新執行耗時 (與預算比較)')
+    args = parser.parse_args()
+
+    if args.app:
+        print("⏱️ 量測網頁介面...")
+        result = benchmark_app(reruns=args.repeat * 5)
+        print(f"  冷啟動: {result['cold_start'] * 1000:.1f} ms "
+              f"(預算 {APP_BUDGET['cold_start'] * 1000:.0f} ms)")
+        for label, seconds in result['tabs'].items():
+            print(f"  {label} 重新執行: {seconds * 1000:.1f} ms "
+                  f"(預算 {APP_BUDGET['rerun'] * 1000:.0f} ms)")
+        problems = check_app_budget(result)
+        for problem in problems:
+            print(f"⚠️ {problem}")
+        if args.output:
+            with open(args.output, 'w', encoding='utf-8') as f:
+                json.dump({'budget': APP_BUDGET, **result}, f, ensure_ascii=False, indent=2)
+            print(f"✓ 結果已儲存: {args.output}")
+        if problems:
+            sys.exit(1)
+        print("✅ 符合預算")
+        return
+
+    if args.compare:
+        with open(args.compare[0], encoding='utf-8') as f_old, \
+                open(args.compare[1], encoding='utf-8') as f_new:
+            compare_results(json.load(f_old), json.load(f_new))
+        return
+
+    print("⏱️ 開始效能測試...")
+    report = benchmark_matrix(
+        args.slides, args.engines, repeat=args.repeat,
+        paragraphs=args.paragraphs, runs_per_paragraph=args.runs,
+        tables=args.tables, groups=args.groups, image_bytes=args.image_kb * 1024,
+    )
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"✓ 結果已儲存: {args.output}")
+
+
+if __name__ == '__main__':
+    main()
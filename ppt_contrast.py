@@ -0,0 +1,550 @@
+# PPT 文字對比檢查 (WCAG Contrast Audit)
+# 逐張讀取輸出簡報的投影片 XML，收集每個文字 run 的 (文字色, 背景色) 配對 (背景依序為表格儲存格、
+# 形狀填滿、投影片/版面配置/母片背景；佈景主題色彩依母片色彩對應解析)，再以 NumPy 一次計算所有配對的
+# 相對亮度與對比值；可選擇將對比不足的文字色往黑色或白色調整到剛好符合 WCAG AA
+
+"""
+使用方法:
+    converter = PPTStyleConverter('input.pptx', audit_contrast=True)   # 或 fix_contrast=True
+    converter.redesign_with_style('modern')
+    print(converter.last_metrics.contrast.describe())
+
+    # 直接使用 (檢查多個輸出；--fix 另存 *_fixed.pptx)
+    python ppt_contrast.py redesigned_ppts/*.pptx --fix
+
+    report = audit_contrast('styled.pptx')
+    for issue in report.issues[:10]:
+        print(issue.describe())
+"""
+
+import argparse
+import colorsys
+import glob
+import sys
+import time
+import zipfile
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+from lxml import etree
+from pptx.opc.constants import RELATIONSHIP_TYPE as RT
+from pptx.oxml.ns import qn as _qn
+
+from ppt_package_writer import copy_raw_member
+from ppt_streaming import plan_stream, read_relationships
+
+NORMAL_TEXT_CONTRAST = 4.5    # WCAG AA 一般文字
+LARGE_TEXT_CONTRAST = 3.0     # WCAG AA 大字 (18pt 以上，或 14pt 以上粗體)
+_LARGE_SZ = 1800              # a:rPr sz 以百分之一點表示
+_LARGE_BOLD_SZ = 1400
+_FIX_MARGIN = 0.05            # 調整後的對比值比門檻多保留的餘量
+_FIX_ITERATIONS = 16          # 二分搜尋混合比例的次數
+
+# 走訪數萬個 run 時標籤名稱轉換會被呼叫數十萬次，快取結果
+qn = lru_cache(maxsize=None)(_qn)
+
+_WHITE = 0xFFFFFF
+_BLACK = 0x000000
+_FILL_TAGS = tuple(qn(f'a:{tag}') for tag in
+                   ('noFill', 'solidFill', 'gradFill', 'blipFill', 'pattFill', 'grpFill'))
+_COLOR_TAGS = {qn('a:srgbClr'), qn('a:schemeClr'), qn('a:sysClr'), qn('a:prstClr')}
+# 填滿無法以單一色彩表示 (圖片、圖樣)，其上的文字不檢查
+_UNKNOWN = ()
+
+# 背景色彩: 一個或多個色彩 (漸層的各個停駐點)；None 表示透明 (往下一層找)
+Colors = Optional[Tuple[int, ...]]
+
+
+class ContrastIssue(NamedTuple):
+    """對比不足的文字 (同一形狀中相同色彩配對的 run 合併為一筆)"""
+    slide: int            # 投影片編號 (從 1 開始)
+    shape: str            # 形狀名稱
+    text: str             # 第一個 run 的文字 (截斷)
+    foreground: int       # 0xRRGGBB
+    background: int
+    ratio: float
+    required: float
+    runs: int
+
+    def describe(self) -> str:
+        return (f"投影片 {self.slide} / {self.shape}: #{self.foreground:06X} 在 "
+                f"#{self.background:06X} 上 {self.ratio:.2f}:1 (需要 {self.required:g}:1，"
+                f"{self.runs} 個 run) 「{self.text}」")
+
+
+class ContrastReport(NamedTuple):
+    """對比檢查結果"""
+    runs: int                     # 檢查的文字 run 數
+    skipped: int                  # 背景為圖片或圖樣而未檢查的 run 數
+    failing: int                  # 對比不足的 run 數 (修正模式下為修正前)
+    fixed: int                    # 已調整文字色的 run 數
+    issues: List[ContrastIssue]
+
+    @property
+    def failing_slides(self) -> List[int]:
+        return sorted({issue.slide for issue in self.issues})
+
+    def describe(self) -> str:
+        text = f"對比檢查: {self.runs} 個文字 run"
+        if self.skipped:
+            text += f" (背景為圖片/圖樣略過 {self.skipped} 個)"
+        if not self.failing:
+            return text + "，全部符合 WCAG AA"
+        text += (f"，{self.failing} 個對比不足 "
+                 f"(投影片 {', '.join(map(str, self.failing_slides[:10]))}"
+                 f"{' ...' if len(self.failing_slides) > 10 else ''})")
+        if self.fixed:
+            text += f"，已調整 {self.fixed} 個"
+        return text
+
+
+# ==================== 色彩解析 ====================
+
+def _hex(value: str) -> int:
+    return int(value, 16) & 0xFFFFFF
+
+
+def _transform(rgb: int, color) -> int:
+    """套用常見的色彩調整 (lumMod/lumOff/tint/shade)"""
+    if not len(color):
+        return rgb
+    mods = {child.tag: int(child.get('val', '100000')) / 100000 for child in color}
+    if not mods:
+        return rgb
+    r, g, b = ((rgb >> 16) & 0xFF) / 255, ((rgb >> 8) & 0xFF) / 255, (rgb & 0xFF) / 255
+    if qn('a:shade') in mods:
+        r, g, b = (value * mods[qn('a:shade')] for value in (r, g, b))
+    if qn('a:tint') in mods:
+        r, g, b = (value + (1 - value) * (1 - mods[qn('a:tint')]) for value in (r, g, b))
+    if qn('a:lumMod') in mods or qn('a:lumOff') in mods:
+        hue, lightness, saturation = colorsys.rgb_to_hls(r, g, b)
+        lightness = lightness * mods.get(qn('a:lumMod'), 1) + mods.get(qn('a:lumOff'), 0)
+        r, g, b = colorsys.hls_to_rgb(hue, min(1.0, max(0.0, lightness)), saturation)
+    return (int(round(r * 255)) << 16) | (int(round(g * 255)) << 8) | int(round(b * 255))
+
+
+class _ColorScheme:
+    """母片的佈景主題色彩與色彩對應 (bg1→lt1、tx1→dk1 ...)"""
+
+    def __init__(self, theme_root, clr_map):
+        self.colors: Dict[str, int] = {}
+        scheme = theme_root.find(f".//{qn('a:clrScheme')}") if theme_root is not None else None
+        for slot in (scheme if scheme is not None else ()):
+            name = etree.QName(slot).localname
+            for color in slot:
+                if color.tag == qn('a:srgbClr'):
+                    self.colors[name] = _hex(color.get('val'))
+                elif color.tag == qn('a:sysClr'):
+                    self.colors[name] = _hex(color.get('lastClr', 'FFFFFF' if name.startswith('lt')
+                                                       else '000000'))
+        self.mapping = dict(clr_map.attrib) if clr_map is not None else {}
+
+    def resolve(self, name: str) -> int:
+        name = self.mapping.get(name, name)
+        return self.colors.get(name, _WHITE if name.startswith(('lt', 'bg')) else _BLACK)
+
+    def color(self, element) -> Optional[int]:
+        """色彩元素 (a:srgbClr / a:schemeClr ...) 的 RGB"""
+        if element.tag == qn('a:srgbClr'):
+            rgb = _hex(element.get('val'))
+        elif element.tag == qn('a:schemeClr'):
+            rgb = self.resolve(element.get('val'))
+        elif element.tag == qn('a:sysClr'):
+            rgb = _hex(element.get('lastClr', '000000'))
+        elif element.tag == qn('a:prstClr'):
+            rgb = _WHITE if element.get('val') == 'white' else _BLACK
+        else:
+            return None
+        return _transform(rgb, element)
+
+    def fill(self, container) -> Colors:
+        """容器 (spPr / tcPr / rPr / bgPr) 中的填滿色彩
+
+        Returns:
+            色彩 tuple；沒有填滿元素或 noFill 時回傳 None；圖片/圖樣填滿回傳 _UNKNOWN
+        """
+        if container is None:
+            return None
+        for child in container:
+            if child.tag not in _FILL_TAGS:
+                continue
+            if child.tag == qn('a:solidFill'):
+                colors = tuple(self.color(color) for color in child if color.tag in _COLOR_TAGS)
+                return colors or None
+            if child.tag == qn('a:gradFill'):
+                colors = tuple(self.color(color) for stop in child.iter(qn('a:gs'))
+                               for color in stop if color.tag in _COLOR_TAGS)
+                return colors or None
+            if child.tag == qn('a:noFill'):
+                return None
+            if child.tag == qn('a:grpFill'):
+                return None  # 群組填滿: 依群組往上找
+            return _UNKNOWN
+        return None
+
+    def style_color(self, shape, ref: str) -> Colors:
+        """形狀樣式 (p:style 的 a:fillRef / a:fontRef) 指定的色彩"""
+        style = shape.find(qn('p:style'))
+        ref_elm = style.find(qn(f'a:{ref}')) if style is not None else None
+        if ref_elm is None or ref_elm.get('idx') == '0':
+            return None
+        colors = tuple(self.color(color) for color in ref_elm if color.tag in _COLOR_TAGS)
+        return colors or None
+
+
+def _background(root, scheme: _ColorScheme) -> Colors:
+    """部件 (投影片/版面配置/母片) 自己的背景"""
+    bg = root.find(f"{qn('p:cSld')}/{qn('p:bg')}")
+    if bg is None:
+        return None
+    bg_pr = bg.find(qn('p:bgPr'))
+    if bg_pr is not None:
+        return scheme.fill(bg_pr)
+    bg_ref = bg.find(qn('p:bgRef'))
+    if bg_ref is not None:
+        colors = tuple(scheme.color(color) for color in bg_ref if color.tag in _COLOR_TAGS)
+        return colors or None
+    return None
+
+
+# ==================== 收集 ====================
+
+class _SlideContext(NamedTuple):
+    scheme: _ColorScheme
+    background: Tuple[int, ...]
+
+
+def _text_defaults(tx_body, scheme: _ColorScheme) -> Tuple[Colors, Optional[int], bool]:
+    """文字框清單樣式第一層的預設色彩、字級與粗體"""
+    def_r_pr = tx_body.find(f"{qn('a:lstStyle')}/{qn('a:lvl1pPr')}/{qn('a:defRPr')}")
+    if def_r_pr is None:
+        return None, None, False
+    size = int(def_r_pr.get('sz')) if def_r_pr.get('sz') else None
+    return scheme.fill(def_r_pr), size, def_r_pr.get('b') in ('1', 'true')
+
+
+def _iter_text_runs(root, context: _SlideContext):
+    """依文件順序走訪投影片中的文字 run
+
+    Yields:
+        (a:r 元素, 文字, 形狀名稱, 文字色彩, 背景色彩, 字級, 是否粗體)；
+        背景為 _UNKNOWN 表示無法判斷 (圖片或圖樣填滿)
+    """
+    scheme = context.scheme
+    sp_tree = root.find(f"{qn('p:cSld')}/{qn('p:spTree')}")
+    if sp_tree is None:
+        return
+
+    def walk(container, background: Tuple[int, ...]):
+        for shape in container:
+            tag = shape.tag
+            if tag == qn('p:grpSp'):
+                fill = scheme.fill(shape.find(qn('p:grpSpPr')))
+                yield from walk(shape, fill if fill is not None else background)
+            elif tag == qn('p:sp'):
+                sp_pr = shape.find(qn('p:spPr'))
+                fill = scheme.fill(sp_pr)
+                if fill is None and sp_pr is not None and sp_pr.find(qn('a:noFill')) is None:
+                    fill = scheme.style_color(shape, 'fillRef')
+                tx_body = shape.find(qn('p:txBody'))
+                if tx_body is not None:
+                    font = scheme.style_color(shape, 'fontRef')
+                    yield from _body_runs(tx_body, _name(shape), fill if fill is not None
+                                          else background, font, scheme)
+            elif tag == qn('p:graphicFrame'):
+                for tc in shape.iter(qn('a:tc')):
+                    fill = scheme.fill(tc.find(qn('a:tcPr')))
+                    tx_body = tc.find(qn('a:txBody'))
+                    if tx_body is not None:
+                        yield from _body_runs(tx_body, _name(shape), fill if fill is not None
+                                              else background, None, scheme)
+
+    yield from walk(sp_tree, context.background)
+
+
+def _name(shape) -> str:
+    c_nv_pr = shape.find(f".//{qn('p:cNvPr')}")
+    return c_nv_pr.get('name', '') if c_nv_pr is not None else ''
+
+
+def _body_runs(tx_body, name: str, background: Tuple[int, ...], font: Colors,
+               scheme: _ColorScheme):
+    """文字框中的 run (未指定色彩時依清單樣式、形狀樣式字型色彩、tx1 的順序繼承)"""
+    default_fill, default_size, default_bold = _text_defaults(tx_body, scheme)
+    inherited = default_fill or font or (scheme.resolve('tx1'),)
+    t_tag, r_pr_tag = qn('a:t'), qn('a:rPr')
+    for r in tx_body.iterfind(f"{qn('a:p')}/{qn('a:r')}"):
+        text = r.findtext(t_tag)
+        if not text or text.isspace():
+            continue
+        r_pr = r.find(r_pr_tag)
+        if r_pr is None:
+            foreground, size, bold = inherited, default_size, default_bold
+        else:
+            foreground = scheme.fill(r_pr) or inherited
+            size = int(r_pr.get('sz')) if r_pr.get('sz') else default_size
+            bold = r_pr.get('b') in ('1', 'true') if r_pr.get('b') is not None else default_bold
+        yield r, text, name, foreground, background, size, bold
+
+
+class _ContextResolver:
+    """投影片的色彩配置與背景 (版面配置、母片與佈景主題只解析一次)"""
+
+    def __init__(self, zin: zipfile.ZipFile):
+        self.zin = zin
+        self._parsed: Dict[str, object] = {}
+        self._schemes: Dict[Optional[str], _ColorScheme] = {}
+
+    def _parse(self, partname: str):
+        if partname not in self._parsed:
+            try:
+                self._parsed[partname] = etree.fromstring(self.zin.read(partname.lstrip('/')))
+            except KeyError:
+                self._parsed[partname] = None
+        return self._parsed[partname]
+
+    def _related(self, partname: str, reltype: str) -> Optional[str]:
+        return next((target for rel_type, target
+                     in read_relationships(self.zin, partname).values()
+                     if rel_type == reltype), None)
+
+    def context(self, slide: str, root) -> _SlideContext:
+        """已解析的投影片 (root) 的色彩配置與背景 (投影片 → 版面配置 → 母片，都沒有時為 bg1)"""
+        layout = self._related(slide, RT.SLIDE_LAYOUT)
+        master = self._related(layout, RT.SLIDE_MASTER) if layout else None
+        if master not in self._schemes:
+            master_root = self._parse(master) if master else None
+            theme = self._related(master, RT.THEME) if master else None
+            self._schemes[master] = _ColorScheme(
+                self._parse(theme) if theme else None,
+                master_root.find(qn('p:clrMap')) if master_root is not None else None)
+        scheme = self._schemes[master]
+        background = _background(root, scheme)
+        for partname in (layout, master):
+            if background is not None:
+                break
+            part_root = self._parse(partname) if partname else None
+            if part_root is not None:
+                background = _background(part_root, scheme)
+        return _SlideContext(scheme, background or (scheme.resolve('bg1'),))
+
+
+# ==================== 計算 ====================
+
+def relative_luminance(rgb: np.ndarray) -> np.ndarray:
+    """WCAG 相對亮度 (輸入為 0xRRGGBB 整數陣列)"""
+    channels = np.stack([(rgb >> 16) & 0xFF, (rgb >> 8) & 0xFF, rgb & 0xFF],
+                        axis=-1).astype(np.float64) / 255
+    linear = np.where(channels <= 0.04045, channels / 12.92,
+                      ((channels + 0.055) / 1.055) ** 2.4)
+    return linear @ np.array([0.2126, 0.7152, 0.0722])
+
+
+def contrast_ratios(foreground: np.ndarray, background: np.ndarray) -> np.ndarray:
+    """WCAG 對比值 (相同色彩只計算一次亮度)"""
+    colors, inverse = np.unique(np.concatenate([foreground, background]), return_inverse=True)
+    luminance = relative_luminance(colors)[inverse.ravel()]
+    fg, bg = luminance[:len(foreground)], luminance[len(foreground):]
+    return (np.maximum(fg, bg) + 0.05) / (np.minimum(fg, bg) + 0.05)
+
+
+def _adjusted_colors(foreground: np.ndarray, background: np.ndarray,
+                     required: np.ndarray) -> np.ndarray:
+    """將文字色往黑色或白色 (與背景對比較高者) 混合到剛好符合門檻，所有配對同時二分搜尋"""
+    bg_luminance = relative_luminance(background)
+    toward_white = 1.05 / (bg_luminance + 0.05) > (bg_luminance + 0.05) / 0.05
+    target = np.where(toward_white, 255.0, 0.0)[:, None]
+    start = np.stack([(foreground >> 16) & 0xFF, (foreground >> 8) & 0xFF, foreground & 0xFF],
+                     axis=1).astype(np.float64)
+    goal = required + _FIX_MARGIN
+
+    def mixed(amount: np.ndarray) -> np.ndarray:
+        channels = np.rint(start + (target - start) * amount[:, None]).astype(np.int64)
+        return (channels[:, 0] << 16) | (channels[:, 1] << 8) | channels[:, 2]
+
+    low, high = np.zeros(len(foreground)), np.ones(len(foreground))
+    for _ in range(_FIX_ITERATIONS):
+        middle = (low + high) / 2
+        ok = contrast_ratios(mixed(middle), background) >= goal
+        high = np.where(ok, middle, high)
+        low = np.where(ok, low, middle)
+    return mixed(high)
+
+
+def _set_run_color(r, rgb: int):
+    """以單色填滿取代 run 的文字色 (a:rPr 中的填滿位於 a:ln 之後)"""
+    r_pr = r.find(qn('a:rPr'))
+    if r_pr is None:
+        r_pr = etree.SubElement(r, qn('a:rPr'))
+        r.insert(0, r_pr)
+    for child in list(r_pr):
+        if child.tag in _FILL_TAGS:
+            r_pr.remove(child)
+    fill = etree.Element(qn('a:solidFill'))
+    etree.SubElement(fill, qn('a:srgbClr')).set('val', f"{rgb:06X}")
+    ln = r_pr.find(qn('a:ln'))
+    r_pr.insert(r_pr.index(ln) + 1 if ln is not None else 0, fill)
+
+
+def _audit(zin: zipfile.ZipFile, fix: bool) -> Tuple[ContrastReport, Dict[str, object]]:
+    """收集所有配對並計算對比
+
+    Args:
+        zin: 簡報 zip
+        fix: 是否直接在解析出的 XML 上調整對比不足的文字色
+
+    Returns:
+        (報告, 修正模式下有調整的投影片 {部件名稱: XML 根元素})
+    """
+    slides = plan_stream(zin).slides
+    resolver = _ContextResolver(zin)
+
+    # 每列一個 (文字色, 背景色) 配對；漸層的每個停駐點各一列，run 取最差的一列
+    fg_rows, bg_rows, run_of_row = [], [], []
+    run_slide, run_large, run_shape, run_text, run_elements = [], [], [], [], []
+    roots = {}
+    skipped = 0
+    for slide_index, slide in enumerate(slides):
+        root = etree.fromstring(zin.read(slide.lstrip('/')))
+        if fix:
+            roots[slide] = root
+        for r, text, name, foreground, background, size, bold in _iter_text_runs(
+                root, resolver.context(slide, root)):
+            if background == _UNKNOWN or foreground == _UNKNOWN:
+                skipped += 1
+                continue
+            run_id = len(run_slide)
+            for fg in foreground:
+                for bg in background:
+                    fg_rows.append(fg)
+                    bg_rows.append(bg)
+                    run_of_row.append(run_id)
+            run_slide.append(slide_index)
+            run_large.append(size is not None and
+                             (size >= _LARGE_SZ or (bold and size >= _LARGE_BOLD_SZ)))
+            run_shape.append(name)
+            run_text.append(text)
+            if fix:
+                run_elements.append(r)
+
+    runs = len(run_slide)
+    if not runs:
+        return ContrastReport(0, skipped, 0, 0, []), {}
+
+    foreground = np.array(fg_rows, dtype=np.int64)
+    background = np.array(bg_rows, dtype=np.int64)
+    run_of_row = np.array(run_of_row)
+    ratios = contrast_ratios(foreground, background)
+    required = np.where(np.array(run_large), LARGE_TEXT_CONTRAST, NORMAL_TEXT_CONTRAST)
+
+    # 每個 run 最差的配對
+    order = np.lexsort((ratios, run_of_row))
+    first = order[np.r_[True, run_of_row[order][1:] != run_of_row[order][:-1]]]
+    worst_ratio = ratios[first]
+    failing = np.flatnonzero(worst_ratio < required)
+
+    issues: Dict[Tuple, List] = {}
+    for run_id in failing:
+        row = first[run_id]
+        key = (run_slide[run_id], run_shape[run_id], int(foreground[row]), int(background[row]))
+        if key in issues:
+            issues[key][1] += 1
+        else:
+            issues[key] = [run_id, 1]
+    issue_list = [ContrastIssue(slide + 1, shape, run_text[run_id][:30], fg, bg,
+                                round(float(worst_ratio[run_id]), 2), float(required[run_id]),
+                                count)
+                  for (slide, shape, fg, bg), (run_id, count) in issues.items()]
+    issue_list.sort(key=lambda issue: (issue.ratio, issue.slide))
+
+    changed = {}
+    if fix and len(failing):
+        rows = first[failing]
+        adjusted = _adjusted_colors(foreground[rows], background[rows], required[failing])
+        for run_id, rgb in zip(failing, adjusted):
+            _set_run_color(run_elements[run_id], int(rgb))
+            slide = slides[run_slide[run_id]]
+            changed[slide] = roots[slide]
+    return ContrastReport(runs, skipped, len(failing), len(failing) if fix else 0,
+                          issue_list), changed
+
+
+def audit_contrast(source) -> ContrastReport:
+    """檢查簡報中所有文字 run 與背景的對比
+
+    Args:
+        source: .pptx 檔案路徑或檔案物件
+
+    Returns:
+        檢查結果 (對比不足的配對依對比值由低到高排序)
+    """
+    with zipfile.ZipFile(source) as zin:
+        return _audit(zin, fix=False)[0]
+
+
+def fix_contrast(source, output) -> ContrastReport:
+    """檢查對比並將不足的文字色調整到剛好符合 WCAG AA，寫入新的檔案
+
+    只重新序列化有調整的投影片，其餘項目直接複製壓縮資料。
+
+    Args:
+        source: .pptx 檔案路徑或檔案物件
+        output: 輸出檔案路徑或可寫入的檔案物件 (不可與 source 相同)
+
+    Returns:
+        修正前的檢查結果 (fixed 為調整的 run 數)
+    """
+    with zipfile.ZipFile(source) as zin:
+        report, changed = _audit(zin, fix=True)
+        with zipfile.ZipFile(output, 'w', compression=zipfile.ZIP_DEFLATED,
+                             strict_timestamps=False) as zout:
+            for info in zin.infolist():
+                root = changed.get('/' + info.filename)
+                if root is None:
+                    copy_raw_member(zin, zout, info)
+                    continue
+                zinfo = zipfile.ZipInfo(info.filename, info.date_time)
+                zinfo.compress_type = info.compress_type
+                zinfo.external_attr = info.external_attr
+                zout.writestr(zinfo, etree.tostring(root, xml_declaration=True,
+                                                    encoding='UTF-8', standalone=True))
+    return report
+
+
+def main():
+    """命令行介面"""
+    parser = argparse.ArgumentParser(description='檢查簡報文字與背景的 WCAG 對比')
+    parser.add_argument('inputs', nargs='+', help='.pptx 檔案或萬用字元')
+    parser.add_argument('--fix', action='store_true',
+                        help='將對比不足的文字色調整到符合 WCAG AA，另存為 <檔名>_fixed.pptx')
+    parser.add_argument('--limit', type=int, default=10, help='每個檔案列出的問題數')
+    args = parser.parse_args()
+
+    files = sorted({path for pattern in args.inputs for path in glob.glob(pattern)})
+    if not files:
+        print("✗ 錯誤: 找不到符合的檔案")
+        sys.exit(1)
+    remaining = 0
+    for path in files:
+        start = time.perf_counter()
+        if args.fix:
+            output = Path(path).with_name(f"{Path(path).stem}_fixed.pptx")
+            report = fix_contrast(path, str(output))
+        else:
+            report = audit_contrast(path)
+            remaining += report.failing
+        mark = '✓' if not report.failing else ('🔧' if report.fixed else '⚠️')
+        print(f"{mark} {path}: {report.describe()} ({time.perf_counter() - start:.2f}s)")
+        for issue in report.issues[:args.limit]:
+            print(f"    {issue.describe()}")
+        if len(report.issues) > args.limit:
+            print(f"    ... 另有 {len(report.issues) - args.limit} 筆")
+        if args.fix and report.fixed:
+            print(f"    已另存: {output}")
+    sys.exit(1 if remaining else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,40 @@
+# PPT 轉換事件 (Conversion Events)
+# PPTStyleConverter.iter_redesign 逐步產生的結構化事件，呼叫端可以即時顯示進度、
+# 提早停止 (停止迭代即可，不會寫入輸出)，或在輸出完成時立即進行下一步
+
+"""
+使用方法:
+    for event in converter.iter_redesign('modern'):
+        if event.kind == EVENT_SLIDE_FINISHED:
+            print(f"{event.completed}/{event.total} 形狀 {event.shapes}")
+        elif event.kind == EVENT_WARNING:
+            print(event.message)
+        elif event.kind == EVENT_OUTPUT_READY:
+            print(event.output)
+"""
+
+from typing import NamedTuple, Optional, Union
+
+from ppt_metrics import ConversionMetrics
+
+EVENT_STYLE_STARTED = 'style_started'    # 開始處理一種風格
+EVENT_SLIDE_STARTED = 'slide_started'    # 開始處理一張投影片
+EVENT_SLIDE_FINISHED = 'slide_finished'  # 一張投影片處理完成 (含形狀與 run 數)
+EVENT_WARNING = 'warning'                # 處理投影片時的警告 (該投影片其餘形狀會略過)
+EVENT_OUTPUT_READY = 'output_ready'      # 輸出完成 (檔案路徑或檔案內容)
+
+
+class ConversionEvent(NamedTuple):
+    """轉換過程中的一個事件 (未使用的欄位為 None)"""
+    kind: str
+    style: str
+    index: Optional[int] = None          # 投影片在簡報中的位置 (從 0 開始)
+    partname: Optional[str] = None       # 投影片部件名稱
+    completed: Optional[int] = None      # 本次已處理完成的投影片數
+    total: Optional[int] = None          # 本次需要處理的投影片數
+    shapes: Optional[int] = None         # 套用規則的形狀數
+    runs: Optional[int] = None           # 修改的文字 run 數
+    seconds: Optional[float] = None      # 投影片處理耗時
+    message: Optional[str] = None        # 警告內容
+    output: Union[str, bytes, None] = None   # 輸出檔案路徑或內容
+    metrics: Optional[ConversionMetrics] = None
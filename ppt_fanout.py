@@ -0,0 +1,213 @@
+# PPT 多風格展開 (Style Fan-out)
+# 每份簡報只分析一次: 以第一種風格套用後的副本為模板，記錄每個需要寫入風格數值的屬性位置
+# (背景色、文字色/字型/字級/粗體、外框色/寬度、填滿色)；之後每種風格只需依位置設定屬性值
+
+"""
+使用方法:
+    converter = PPTStyleConverter('input.pptx', engine='fanout')
+    converter.batch_redesign(['modern', 'minimal', 'corporate'])   # 分析只執行一次
+
+    # 直接使用
+    index = FanoutIndex.build(prs, program, apply_slide, chart_resolver)
+    output_prs = copy.deepcopy(index.template)
+    for slide in output_prs.slides:
+        index.stamp(slide, compile_style(STYLE_PRESETS['minimal']))
+"""
+
+import copy
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from pptx.oxml.ns import qn
+
+from ppt_style_program import ChartResolver, StyleProgram, visit_shapes
+
+# 規則中會寫入 XML 的欄位；欄位是否為 None 決定套用後新增哪些元素
+_TEXT_FIELDS = ('color_hex', 'font', 'size_sz', 'bold')
+_SHAPE_FIELDS = ('line_hex', 'line_width', 'fill_hex')
+_BACKGROUND = -1  # 背景色使用的規則位置
+
+# (元素在部件中的走訪位置, 屬性名稱, 規則位置, 欄位名稱)
+Target = Tuple[int, str, int, str]
+
+
+def rule_layout(program: StyleProgram) -> Tuple:
+    """規則的目標、選擇器與欄位是否為 None
+
+    layout 相同的風格程式比對結果相同，套用後的 XML 結構也相同 (只有屬性值不同)，
+    因此可以共用分析結果。
+    """
+    return tuple((rule.target, rule.selector,
+                  tuple(getattr(rule, name) is None for name in _TEXT_FIELDS + _SHAPE_FIELDS))
+                 for rule in program.rules)
+
+
+def _values(program: StyleProgram) -> Dict[Tuple[int, str], str]:
+    """風格程式每個 (規則位置, 欄位) 要寫入的屬性值"""
+    values = {(_BACKGROUND, 'background_hex'): program.background_hex}
+    for position, rule in enumerate(program.rules):
+        for name in _TEXT_FIELDS + _SHAPE_FIELDS:
+            value = getattr(rule, name)
+            if value is None:
+                continue
+            if name == 'bold':
+                value = '1' if value else '0'
+            values[(position, name)] = str(value)
+    return values
+
+
+class PartTargets(NamedTuple):
+    """一個部件 (投影片或其圖表) 中的目標"""
+    r_id: Optional[str]      # 圖表的關聯 ID；投影片本身為 None
+    element_count: int       # 分析時部件的元素數 (用來確認副本結構相同)
+    targets: Tuple[Target, ...]
+
+
+class SlidePlan(NamedTuple):
+    """一張投影片的分析結果"""
+    shapes: int
+    runs: int
+    parts: Tuple[PartTargets, ...]
+
+
+class FanoutIndex:
+    """一份簡報的風格目標索引
+
+    template 是以分析用風格套用後的簡報副本；每種風格從 template 複製後，
+    依索引改寫屬性值，結果與直接對原始簡報套用該風格相同。
+    """
+
+    def __init__(self, template, layout: Tuple, slides: Dict[str, SlidePlan]):
+        self.template = template
+        self.layout = layout
+        self.slides = slides
+
+    @classmethod
+    def build(cls, prs, program: StyleProgram,
+              apply_slide: Callable[[object, StyleProgram], Tuple[int, int]],
+              chart_resolver: Callable[[object], Optional[ChartResolver]]) -> 'FanoutIndex':
+        """分析簡報 (不修改 prs)
+
+        Args:
+            prs: 已解析的原始簡報
+            program: 分析用的風格程式
+            apply_slide: 將風格套用到單張投影片的函數 (lxml 引擎)
+            chart_resolver: 接收投影片、回傳其圖表解析函數的函數
+
+        Returns:
+            風格目標索引
+        """
+        template = copy.deepcopy(prs)
+        rule_position = {id(rule): position for position, rule in enumerate(program.rules)}
+        slides = {}
+        for slide in template.slides:
+            shape_count, run_count = apply_slide(slide, program)
+
+            slide_elm = slide._element
+            roots = {None: slide_elm}
+            parts: Dict[Optional[str], List] = {None: []}
+            resolve = chart_resolver(slide)
+
+            def resolve_chart(r_id: str):
+                chart_space = resolve(r_id) if resolve is not None else None
+                if chart_space is not None:
+                    roots[r_id] = chart_space
+                    parts.setdefault(r_id, [])
+                return chart_space
+
+            try:
+                bg_fill = slide_elm.cSld.bg.bgPr.find(qn('a:solidFill'))
+                parts[None].append((bg_fill[0], 'val', _BACKGROUND, 'background_hex'))
+                # 比對只取決於形狀本身，套用風格後再次走訪會得到相同的形狀
+                for styled in visit_shapes(program, slide_elm.cSld.spTree, resolve_chart):
+                    if styled.text_rule is not None:
+                        position = rule_position[id(styled.text_rule)]
+                        for tx_body in styled.text_bodies:
+                            targets = parts[_owner(tx_body, roots)]
+                            for r in tx_body.xpath('./a:p/a:r'):
+                                targets.extend(_text_targets(r.rPr, styled.text_rule, position))
+                    if styled.shape_rule is not None:
+                        parts[None].extend(_shape_targets(
+                            styled.element, styled.shape_rule,
+                            rule_position[id(styled.shape_rule)]))
+            except (AttributeError, IndexError, TypeError):
+                # 套用風格時中途失敗 (已顯示警告)，這張投影片不使用索引
+                continue
+
+            part_targets = []
+            for r_id, targets in parts.items():
+                positions = {element: position
+                             for position, element in enumerate(roots[r_id].iter())}
+                part_targets.append(PartTargets(
+                    r_id, len(positions),
+                    tuple((positions[element], attribute, rule, name)
+                          for element, attribute, rule, name in targets)))
+            slides[str(slide.part.partname)] = SlidePlan(shape_count, run_count,
+                                                         tuple(part_targets))
+        return cls(template, rule_layout(program), slides)
+
+    def stamp(self, slide, program: StyleProgram) -> Optional[Tuple[int, int]]:
+        """將風格數值寫入 template 副本中的一張投影片
+
+        Args:
+            slide: 從 template 複製的簡報中的投影片
+            program: layout 與分析時相同的風格程式
+
+        Returns:
+            (套用規則的形狀數, 文字 run 數)；投影片不在索引中或結構不同時不修改並回傳 None
+        """
+        if slide.part is None or rule_layout(program) != self.layout:
+            return None
+        plan = self.slides.get(str(slide.part.partname))
+        if plan is None:
+            return None
+        resolved = []
+        for part in plan.parts:
+            root = slide._element if part.r_id is None \
+                else slide.part.related_part(part.r_id)._element
+            elements = list(root.iter())
+            if len(elements) != part.element_count:
+                return None
+            resolved.append((elements, part.targets))
+
+        values = _values(program)
+        for elements, targets in resolved:
+            for position, attribute, rule, name in targets:
+                elements[position].set(attribute, values[(rule, name)])
+        return plan.shapes, plan.runs
+
+
+def _text_targets(rPr, rule, position: int) -> List:
+    """套用文字規則後 a:rPr 中的屬性位置"""
+    targets = []
+    if rule.color_hex is not None:
+        targets.append((rPr.find(qn('a:solidFill'))[0], 'val', position, 'color_hex'))
+    if rule.font is not None:
+        targets.append((rPr.find(qn('a:latin')), 'typeface', position, 'font'))
+    if rule.size_sz is not None:
+        targets.append((rPr, 'sz', position, 'size_sz'))
+    if rule.bold is not None:
+        targets.append((rPr, 'b', position, 'bold'))
+    return targets
+
+
+def _shape_targets(shape_elm, rule, position: int) -> List:
+    """套用形狀規則後 p:spPr 中的屬性位置 (只有 p:sp 有填滿)"""
+    spPr = shape_elm.spPr
+    targets = []
+    ln = spPr.find(qn('a:ln'))
+    if rule.line_hex is not None:
+        targets.append((ln.find(qn('a:solidFill'))[0], 'val', position, 'line_hex'))
+    if rule.line_width is not None:
+        targets.append((ln, 'w', position, 'line_width'))
+    if rule.fill_hex is not None and shape_elm.tag == qn('p:sp'):
+        targets.append((spPr.find(qn('a:solidFill'))[0], 'val', position, 'fill_hex'))
+    return targets
+
+
+def _owner(element, roots: Dict[Optional[str], object]) -> Optional[str]:
+    """元素所屬的部件 (投影片為 None，圖表為其關聯 ID)"""
+    root = element.getroottree().getroot()
+    for r_id, candidate in roots.items():
+        if candidate is root:
+            return r_id
+    return None
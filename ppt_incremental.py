@@ -0,0 +1,186 @@
+# PPT 增量轉換 (Incremental Restyling)
+# 在輸出檔案旁記錄每個投影片部件的內容雜湊；再次轉換修改過的簡報時，
+# 內容未變的投影片直接複製上次已套用風格的 XML，只重新處理新增或修改的投影片
+
+"""
+使用方法:
+    converter = PPTStyleConverter('input.pptx')   # 預設啟用增量轉換
+    converter.redesign_with_style('modern')        # 第一次: 完整轉換並寫入 .slides.json
+    # ... 編輯 input.pptx 中的一張投影片 ...
+    converter = PPTStyleConverter('input.pptx')
+    converter.redesign_with_style('modern')        # 只重新處理修改過的投影片
+
+記錄檔 (與輸出檔案同名，加上 .slides.json):
+    {"render_key": 風格指紋 + 引擎 + 引擎版本,
+     "slides": {投影片部件名稱: 原始內容雜湊},
+     "shared": {其他會被修改的部件名稱: 原始內容雜湊}}
+    # proxy / lxml 引擎為圖表部件，theme 引擎為母片/版面配置/主題部件
+"""
+
+import glob
+import hashlib
+import json
+import os
+import re
+import zipfile
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from ppt_package_writer import copy_raw_member
+
+SIDECAR_SUFFIX = '.slides.json'
+SIDECAR_VERSION = 1
+
+_SLIDE_MEMBER = re.compile(r'^ppt/slides/slide(\d+)\.xml$')
+_CHART_MEMBER = re.compile(r'^ppt/charts/chart\d+\.xml$')
+
+
+def sidecar_path(output) -> Path:
+    """輸出檔案對應的記錄檔路徑"""
+    return Path(str(output) + SIDECAR_SUFFIX)
+
+
+def member_hashes(zf: zipfile.ZipFile, partnames: Iterable[str]) -> Dict[str, str]:
+    """計算部件內容 (解壓縮後) 的 SHA-256
+
+    Args:
+        zf: 來源 zip
+        partnames: 部件名稱 (例如 '/ppt/slides/slide1.xml')
+
+    Returns:
+        {部件名稱: 雜湊}；zip 中不存在的部件會引發 KeyError
+    """
+    return {partname: hashlib.sha256(zf.read(partname.lstrip('/'))).hexdigest()
+            for partname in partnames}
+
+
+def slide_partnames(zf: zipfile.ZipFile) -> List[str]:
+    """列出 zip 中的投影片部件 (依編號排序)"""
+    slides = []
+    for name in zf.namelist():
+        match = _SLIDE_MEMBER.match(name)
+        if match:
+            slides.append((int(match.group(1)), '/' + name))
+    return [partname for _, partname in sorted(slides)]
+
+
+def chart_partnames(zf: zipfile.ZipFile) -> List[str]:
+    """列出 zip 中的圖表部件"""
+    return ['/' + name for name in zf.namelist() if _CHART_MEMBER.match(name)]
+
+
+def write_sidecar(output, source_name: str, style_name: str, render_key: str,
+                  slides: Dict[str, str], shared: Dict[str, str]):
+    """在輸出檔案旁寫入部件雜湊記錄
+
+    Args:
+        output: 輸出檔案路徑 (輸出中的部件名稱必須與原始檔案相同)
+        source_name: 原始檔案名稱
+        style_name: 風格名稱
+        render_key: 風格指紋 + 引擎 + 引擎版本
+        slides: {投影片部件名稱: 原始內容雜湊}
+        shared: {其他會被修改的部件名稱: 原始內容雜湊}
+    """
+    record = {
+        'version': SIDECAR_VERSION,
+        'source': Path(source_name).name,
+        'style': style_name,
+        'render_key': render_key,
+        'slides': slides,
+        'shared': shared,
+    }
+    path = sidecar_path(output)
+    tmp_path = path.with_suffix('.tmp')
+    tmp_path.write_text(json.dumps(record), encoding='utf-8')
+    os.replace(tmp_path, path)
+
+
+def find_previous(output_dir: Path, source_name: str, style_name: str,
+                  render_key: str) -> Optional[Tuple[Path, Dict]]:
+    """尋找同一份簡報、同一風格與引擎最近一次的輸出
+
+    Args:
+        output_dir: 輸出目錄
+        source_name: 原始檔案名稱
+        style_name: 風格名稱
+        render_key: 風格指紋 + 引擎 + 引擎版本
+
+    Returns:
+        (上次輸出檔案路徑, 記錄內容)；找不到可用的輸出時回傳 None
+    """
+    # 檔名中的 [ ] * ? 需跳脫，否則會被當成萬用字元
+    stem = glob.escape(Path(source_name).stem)
+    pattern = f"{stem}_{glob.escape(style_name)}_*{glob.escape(SIDECAR_SUFFIX)}"
+    candidates = sorted(Path(output_dir).glob(pattern),
+                        key=lambda path: path.stat().st_mtime, reverse=True)
+    for path in candidates:
+        try:
+            record = json.loads(path.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            continue
+        output = Path(str(path)[:-len(SIDECAR_SUFFIX)])
+        if (record.get('version') == SIDECAR_VERSION
+                and record.get('source') == Path(source_name).name
+                and record.get('style') == style_name
+                and record.get('render_key') == render_key
+                and output.exists()):
+            return output, record
+    return None
+
+
+def plan_incremental(zin: zipfile.ZipFile, record: Dict
+                     ) -> Optional[Tuple[Dict[str, str], Dict[str, str], List[str]]]:
+    """比對原始檔案與上次的記錄
+
+    Args:
+        zin: 新的原始檔案
+        record: 上次輸出的記錄
+
+    Returns:
+        (新的投影片雜湊, {可重用的部件: 上次輸出中的部件名稱}, 需要重新處理的投影片)；
+        可重用的部件包含未變動的投影片與共用部件。共用部件 (母片等) 有變動時
+        無法增量轉換，回傳 None
+    """
+    try:
+        if member_hashes(zin, record['shared']) != record['shared']:
+            return None
+    except KeyError:
+        return None
+
+    slides = member_hashes(zin, slide_partnames(zin))
+    previous_by_hash = {digest: partname for partname, digest in record['slides'].items()}
+    reused = {partname: previous_by_hash[digest] for partname, digest in slides.items()
+              if digest in previous_by_hash}
+    changed = [partname for partname in slides if partname not in reused]
+    # 共用部件未變動，直接沿用上次套用風格後的版本
+    reused.update({partname: partname for partname in record['shared']})
+    return slides, reused, changed
+
+
+def save_incremental(source, previous_output, output,
+                     reused: Dict[str, str], restyled: Dict[str, bytes]):
+    """以新的原始檔案為基礎寫入輸出
+
+    重用的投影片從上次的輸出直接複製壓縮資料，重新處理的投影片寫入新的 XML，
+    其餘項目 (含所有 .rels 與媒體) 從原始檔案直接複製。
+
+    Args:
+        source: 新的原始 .pptx 檔案路徑或檔案物件
+        previous_output: 上次的輸出檔案路徑
+        output: 輸出檔案路徑 (不可與 previous_output 相同)
+        reused: {部件名稱: 上次輸出中的部件名稱}
+        restyled: {投影片部件名稱: 套用風格後的 XML}
+    """
+    with zipfile.ZipFile(source) as zin, \
+            zipfile.ZipFile(previous_output) as zprev, \
+            zipfile.ZipFile(output, 'w', compression=zipfile.ZIP_DEFLATED,
+                            strict_timestamps=False) as zout:
+        for info in zin.infolist():
+            partname = '/' + info.filename
+            if partname in restyled:
+                zout.writestr(info.filename, restyled[partname])
+            elif partname in reused:
+                copy_raw_member(zprev, zout, zprev.getinfo(reused[partname].lstrip('/')),
+                                arcname=info.filename)
+            else:
+                copy_raw_member(zin, zout, info)
@@ -0,0 +1,191 @@
+# PPT 背景轉換工作 (Background Conversion Jobs)
+# 轉換在背景執行緒中進行，網頁以工作 ID 查詢進度 (每種風格、每張投影片)；
+# 相同檔案與風格的工作只會執行一次，重新整理頁面後仍可取得結果
+
+"""
+使用方法:
+    manager = JobManager(cache=ConversionCache())
+    job = manager.submit(data, 'input.pptx', ['modern', 'minimal'])
+    ...
+    job = manager.get(job.job_id)
+    print(job.status, job.progress, job.progress_text())
+"""
+
+import hashlib
+import threading
+import time
+import zipfile
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from io import BytesIO
+from typing import List, Optional, Tuple
+
+from ppt_metrics import ConversionMetrics
+from ppt_store import ConversionCache, make_key
+from ppt_style_converter import PPTStyleConverter, DEFAULT_ENGINE
+
+JOB_QUEUED = 'queued'
+JOB_RUNNING = 'running'
+JOB_DONE = 'done'
+JOB_FAILED = 'failed'
+
+
+@dataclass
+class ConversionJob:
+    """一個背景轉換工作 (一份簡報的多種風格)
+
+    進度欄位由背景執行緒更新，網頁端只讀取。
+    """
+    job_id: str
+    source_name: str
+    styles: Tuple[str, ...]
+    status: str = JOB_QUEUED
+    styles_done: int = 0
+    current_style: Optional[str] = None
+    slide: int = 0
+    total_slides: int = 0
+    bundle: Optional[bytes] = None
+    files: List[Tuple[str, int]] = field(default_factory=list)  # (檔名, 大小)
+    metrics: List[ConversionMetrics] = field(default_factory=list)
+    error: Optional[str] = None
+    created: float = field(default_factory=time.time)
+    finished: Optional[float] = None
+
+    @property
+    def active(self) -> bool:
+        """工作是否仍在排隊或執行中"""
+        return self.status in (JOB_QUEUED, JOB_RUNNING)
+
+    @property
+    def progress(self) -> float:
+        """整體進度 (0.0 ~ 1.0)"""
+        if self.status == JOB_DONE:
+            return 1.0
+        if not self.styles:
+            return 0.0
+        slide_fraction = self.slide / self.total_slides if self.total_slides else 0.0
+        return min(1.0, (self.styles_done + slide_fraction) / len(self.styles))
+
+    def progress_text(self) -> str:
+        """進度說明文字"""
+        if self.status == JOB_QUEUED:
+            return "排隊中..."
+        if self.status == JOB_DONE:
+            return f"完成 {len(self.files)} 種風格"
+        if self.status == JOB_FAILED:
+            return f"失敗: {self.error}"
+        text = f"風格 {min(self.styles_done + 1, len(self.styles))}/{len(self.styles)}"
+        if self.current_style:
+            text += f" ({self.current_style})"
+        if self.total_slides:
+            text += f" · 投影片 {self.slide}/{self.total_slides}"
+        return text
+
+
+class JobManager:
+    """背景轉換工作管理 (所有網頁工作階段共用)"""
+
+    def __init__(self, max_workers: int = 1, max_finished: int = 20,
+                 cache: ConversionCache = None):
+        """初始化工作管理
+
+        Args:
+            max_workers: 同時執行的工作數
+            max_finished: 最多保留的已結束工作數 (超過時移除最舊的，連同其結果)
+            cache: 轉換結果快取
+        """
+        self.max_finished = max_finished
+        self.cache = cache
+        self._executor = ThreadPoolExecutor(max_workers=max_workers,
+                                            thread_name_prefix='ppt-job')
+        self._lock = threading.Lock()
+        self._jobs: 'OrderedDict[str, ConversionJob]' = OrderedDict()
+
+    @staticmethod
+    def job_id(data: bytes, source_name: str, styles: Tuple[str, ...], engine: str,
+               profile: bool) -> str:
+        """工作 ID: 檔案內容與轉換設定相同的請求得到相同的 ID"""
+        return make_key(hashlib.sha256(data).hexdigest(), source_name, engine,
+                        str(profile), *styles)[:16]
+
+    def submit(self, data: bytes, source_name: str, styles: List[str],
+               engine: str = DEFAULT_ENGINE, profile: bool = False) -> ConversionJob:
+        """提交轉換工作
+
+        相同 ID 的工作排隊中、執行中或已完成時直接回傳既有的工作 (不重複轉換)；
+        先前失敗的工作會重新執行。
+
+        Args:
+            data: .pptx 檔案內容
+            source_name: 原始檔案名稱
+            styles: 風格列表
+            engine: 轉換引擎
+            profile: 是否記錄記憶體峰值 (tracemalloc 是行程共用的，profile 工作的轉換會依序執行)
+
+        Returns:
+            轉換工作
+        """
+        styles = tuple(styles)
+        job_id = self.job_id(data, source_name, styles, engine, profile)
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None and job.status != JOB_FAILED:
+                return job
+            job = ConversionJob(job_id, source_name, styles)
+            self._jobs[job_id] = job
+            self._jobs.move_to_end(job_id)
+            self._prune()
+        self._executor.submit(self._run, job, data, engine, profile)
+        return job
+
+    def get(self, job_id: str) -> Optional[ConversionJob]:
+        """以 ID 取得工作 (已被移除時回傳 None)"""
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def jobs(self) -> List[ConversionJob]:
+        """所有保留中的工作 (由舊到新)"""
+        with self._lock:
+            return list(self._jobs.values())
+
+    def _prune(self):
+        """移除最舊的已結束工作，直到數量符合上限"""
+        finished = [job_id for job_id, job in self._jobs.items() if not job.active]
+        for job_id in finished[:max(0, len(finished) - self.max_finished)]:
+            del self._jobs[job_id]
+
+    def _run(self, job: ConversionJob, data: bytes, engine: str, profile: bool):
+        """在背景執行緒中執行轉換"""
+        job.status = JOB_RUNNING
+
+        def on_progress(style_name: str, slide: int, total_slides: int):
+            job.current_style = style_name
+            job.slide, job.total_slides = slide, total_slides
+
+        def on_metrics(metrics: ConversionMetrics):
+            job.metrics.append(metrics)
+            job.styles_done += 1
+            job.slide = job.total_slides = 0
+
+        try:
+            converter = PPTStyleConverter.from_buffer(
+                data, name=job.source_name, engine=engine, cache=self.cache,
+                profile=profile, on_metrics=on_metrics, on_progress=on_progress)
+            bundle = BytesIO()
+            converter.write_bundle(bundle, list(job.styles))
+            errors = [entry['error'] for entry in converter.last_batch_report
+                      if entry['error'] is not None]
+            if errors and len(errors) == len(job.styles):
+                raise RuntimeError(errors[0])
+            with zipfile.ZipFile(bundle) as zf:
+                job.files = [(info.filename, info.file_size) for info in zf.infolist()]
+            job.bundle = bundle.getvalue()
+            job.status = JOB_DONE
+        except Exception as e:
+            job.error = str(e)
+            job.status = JOB_FAILED
+        finally:
+            job.finished = time.time()
+            with self._lock:
+                self._prune()
@@ -0,0 +1,339 @@
+# PPT 媒體最佳化 (Media Optimization)
+# 依圖片在投影片/版面配置/母片中的顯示尺寸找出解析度過高的圖片，以 Pillow 縮小並重新壓縮
+# (可使用多個行程)；內容完全相同的圖片合併為一個部件。輸出的其餘項目直接複製壓縮資料
+
+"""
+使用方法:
+    converter = PPTStyleConverter('input.pptx', optimize_media=True, media_workers=4)
+    converter.redesign_with_style('modern')
+    print(converter.last_metrics.media.describe())
+
+    # 直接使用
+    report = optimize_media('styled.pptx', 'styled_small.pptx', dpi=220, workers=4)
+    print(report.bytes_saved)
+"""
+
+import hashlib
+import math
+import posixpath
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from lxml import etree
+from PIL import Image
+from pptx.opc.constants import RELATIONSHIP_TYPE as RT
+from pptx.oxml.ns import qn
+
+from ppt_package_writer import copy_raw_member
+from ppt_streaming import read_relationships
+
+DEFAULT_MEDIA_DPI = 220       # 與 Office「高畫質」壓縮選項相同
+DEFAULT_JPEG_QUALITY = 85
+
+_EMU_PER_INCH = 914400
+_DOWNSCALE_SLACK = 1.1        # 超過所需像素 10% 以上才縮小
+_CROP_UNIT = 100000           # a:srcRect 以千分之一百分比表示
+# 只重新壓縮副檔名與實際格式相符的常見格式 (避免重新壓縮後與部件的內容類型不符)
+_FORMATS = {'JPEG': ('.jpg', '.jpeg', '.jpe'), 'PNG': ('.png',)}
+_CONTENT_TYPES = '[Content_Types].xml'
+_RELS_NS = 'http://schemas.openxmlformats.org/package/2006/relationships'
+_CT_NS = 'http://schemas.openxmlformats.org/package/2006/content-types'
+
+# 圖片需要的顯示尺寸 (EMU，已換算裁切)；None 表示無法判斷 (例如並排填滿)，不縮小
+Extent = Optional[Tuple[float, float]]
+
+
+class MediaReport(NamedTuple):
+    """一份簡報的媒體最佳化結果"""
+    images: int          # 圖片部件數 (合併前)
+    downscaled: int      # 縮小並重新壓縮的圖片數
+    deduplicated: int    # 合併的重複圖片數
+    bytes_before: int    # 圖片總大小 (未壓縮)
+    bytes_after: int
+
+    @property
+    def bytes_saved(self) -> int:
+        return self.bytes_before - self.bytes_after
+
+    def describe(self) -> str:
+        """一行摘要 (命令行與報告使用)"""
+        return (f"媒體最佳化: 圖片 {self.images} 張 | 縮小 {self.downscaled} 張 | "
+                f"合併重複 {self.deduplicated} 張 | 節省 {self.bytes_saved / 1024 / 1024:.2f} MB "
+                f"({self.bytes_before / 1024 / 1024:.2f} → {self.bytes_after / 1024 / 1024:.2f} MB)")
+
+
+def _source_partname(rels_member: str) -> str:
+    """關聯檔對應的部件名稱 (ppt/slides/_rels/slide1.xml.rels → /ppt/slides/slide1.xml)"""
+    directory, filename = posixpath.split(rels_member)
+    return '/' + posixpath.join(posixpath.dirname(directory), filename[:-len('.rels')])
+
+
+def _merge_extent(current: Extent, extent: Extent, first: bool) -> Extent:
+    """同一張圖片用在多處時取各方向最大的顯示尺寸 (任一處無法判斷時不縮小)"""
+    if first:
+        return extent
+    if current is None or extent is None:
+        return None
+    return max(current[0], extent[0]), max(current[1], extent[1])
+
+
+def _blip_extent(blip, extent: Tuple[float, float]) -> Extent:
+    """依 a:blipFill 的裁切與並排設定換算整張圖片需要的顯示尺寸"""
+    blip_fill = blip.getparent()
+    if blip_fill.find(qn('a:tile')) is not None:
+        return None
+    src_rect = blip_fill.find(qn('a:srcRect'))
+    if src_rect is None:
+        return extent
+    visible_x = 1 - (int(src_rect.get('l', 0)) + int(src_rect.get('r', 0))) / _CROP_UNIT
+    visible_y = 1 - (int(src_rect.get('t', 0)) + int(src_rect.get('b', 0))) / _CROP_UNIT
+    if visible_x <= 0 or visible_y <= 0:
+        return None
+    return extent[0] / visible_x, extent[1] / visible_y
+
+
+def _shape_extent(shape) -> Optional[Tuple[int, int]]:
+    """形狀的 a:xfrm/a:ext (佔位符未指定位置時為 None)"""
+    ext = shape.find(f"./{qn('p:spPr')}/{qn('a:xfrm')}/{qn('a:ext')}")
+    if ext is None:
+        ext = shape.find(f"./{qn('p:xfrm')}/{qn('a:ext')}")
+    if ext is None:
+        return None
+    return int(ext.get('cx')), int(ext.get('cy'))
+
+
+def _group_scale(group) -> Tuple[float, float]:
+    """群組子座標系 (chExt) 換算為實際尺寸的比例"""
+    xfrm = group.find(f"./{qn('p:grpSpPr')}/{qn('a:xfrm')}")
+    ext = xfrm.find(qn('a:ext')) if xfrm is not None else None
+    ch_ext = xfrm.find(qn('a:chExt')) if xfrm is not None else None
+    if ext is None or ch_ext is None or not int(ch_ext.get('cx')) or not int(ch_ext.get('cy')):
+        return 1.0, 1.0
+    return int(ext.get('cx')) / int(ch_ext.get('cx')), int(ext.get('cy')) / int(ch_ext.get('cy'))
+
+
+def blip_extents(root, slide_size: Tuple[int, int]) -> Dict[str, Extent]:
+    """投影片、版面配置或母片中每個圖片關聯需要的顯示尺寸
+
+    圖片的顯示尺寸取所在形狀的大小 (群組內的形狀依群組比例換算)；背景圖片與
+    沒有位置資訊的佔位符以整張投影片的大小估計。
+
+    Args:
+        root: 部件的根元素 (含 p:cSld)
+        slide_size: 投影片尺寸 (EMU)
+
+    Returns:
+        {關聯 ID: 顯示尺寸}
+    """
+    extents: Dict[str, Extent] = {}
+
+    def add(blip, extent: Tuple[float, float]):
+        r_id = blip.get(qn('r:embed'))
+        if r_id is not None:
+            extents[r_id] = _merge_extent(extents.get(r_id), _blip_extent(blip, extent),
+                                          r_id not in extents)
+
+    handled = set()
+    sp_tree = root.find(f"./{qn('p:cSld')}/{qn('p:spTree')}")
+    stack = [(sp_tree, 1.0, 1.0)] if sp_tree is not None else []
+    while stack:
+        group, scale_x, scale_y = stack.pop()
+        for shape in group:
+            if shape.tag == qn('p:grpSp'):
+                child_x, child_y = _group_scale(shape)
+                stack.append((shape, scale_x * child_x, scale_y * child_y))
+                continue
+            size = _shape_extent(shape)
+            extent = (size[0] * scale_x, size[1] * scale_y) if size is not None else slide_size
+            for blip in shape.iter(qn('a:blip')):
+                handled.add(blip)
+                add(blip, extent)
+
+    for blip in root.iter(qn('a:blip')):
+        if blip not in handled:
+            add(blip, slide_size)
+    return extents
+
+
+def _slide_size(zin: zipfile.ZipFile) -> Tuple[int, int]:
+    """presentation.xml 中的投影片尺寸 (EMU)"""
+    for rel_type, presentation in read_relationships(zin, '/').values():
+        if rel_type == RT.OFFICE_DOCUMENT:
+            sld_sz = etree.fromstring(zin.read(presentation.lstrip('/'))).find(qn('p:sldSz'))
+            if sld_sz is not None:
+                return int(sld_sz.get('cx')), int(sld_sz.get('cy'))
+    return 9144000, 6858000  # 4:3 預設尺寸
+
+
+def _downscale(data: bytes, size: Tuple[int, int], quality: int) -> Optional[bytes]:
+    """縮小並以原本的格式重新壓縮 (在工作行程中執行)
+
+    Returns:
+        新的檔案內容；無法處理或沒有變小時回傳 None
+    """
+    try:
+        with Image.open(BytesIO(data)) as image:
+            image_format = image.format
+            info = dict(image.info)
+            image.draft(image.mode, size)  # JPEG 直接以較低解析度解碼
+            if image.mode == 'P':
+                image = image.convert('RGBA')
+            resized = image.resize(size, Image.LANCZOS)
+        buffer = BytesIO()
+        if image_format == 'JPEG':
+            resized.save(buffer, 'JPEG', quality=quality, optimize=True,
+                         icc_profile=info.get('icc_profile'), exif=info.get('exif', b''))
+        else:
+            resized.save(buffer, 'PNG', optimize=True, icc_profile=info.get('icc_profile'))
+    except Exception:
+        return None
+    result = buffer.getvalue()
+    return result if len(result) < len(data) else None
+
+
+def _target_size(pixels: Tuple[int, int], extent: Extent, dpi: int) -> Optional[Tuple[int, int]]:
+    """縮小後的像素尺寸 (保持長寬比)；不需要縮小時回傳 None"""
+    if extent is None or not extent[0] or not extent[1]:
+        return None
+    needed_x = extent[0] / _EMU_PER_INCH * dpi
+    needed_y = extent[1] / _EMU_PER_INCH * dpi
+    scale = max(needed_x / pixels[0], needed_y / pixels[1])
+    if scale * _DOWNSCALE_SLACK >= 1:
+        return None
+    return max(1, math.ceil(pixels[0] * scale)), max(1, math.ceil(pixels[1] * scale))
+
+
+def _rewrite_rels(blob: bytes, source_dir: str, duplicates: Dict[str, str]) -> Optional[bytes]:
+    """將指向重複圖片的關聯改為指向保留的圖片；沒有變動時回傳 None"""
+    rels = etree.fromstring(blob)
+    changed = False
+    for rel in rels.iter(f'{{{_RELS_NS}}}Relationship'):
+        if rel.get('TargetMode') == 'External':
+            continue
+        target = posixpath.normpath(posixpath.join(source_dir, rel.get('Target')))
+        if target in duplicates:
+            rel.set('Target', posixpath.relpath(duplicates[target], source_dir))
+            changed = True
+    if not changed:
+        return None
+    return etree.tostring(rels, xml_declaration=True, encoding='UTF-8', standalone=True)
+
+
+def _remove_overrides(blob: bytes, removed: Dict[str, str]) -> Optional[bytes]:
+    """從 [Content_Types].xml 移除已刪除部件的 Override；沒有變動時回傳 None"""
+    types = etree.fromstring(blob)
+    overrides = [override for override in types.iter(f'{{{_CT_NS}}}Override')
+                 if override.get('PartName') in removed]
+    if not overrides:
+        return None
+    for override in overrides:
+        types.remove(override)
+    return etree.tostring(types, xml_declaration=True, encoding='UTF-8', standalone=True)
+
+
+def optimize_media(source, output, dpi: int = DEFAULT_MEDIA_DPI,
+                   quality: int = DEFAULT_JPEG_QUALITY, workers: int = 1) -> MediaReport:
+    """縮小解析度過高的圖片並合併重複的圖片
+
+    Args:
+        source: 原始 .pptx 檔案路徑或檔案物件
+        output: 輸出檔案路徑或可寫入的檔案物件 (不可與 source 相同)
+        dpi: 圖片在顯示尺寸下保留的解析度 (每吋像素)
+        quality: 重新壓縮 JPEG 的品質
+        workers: 縮小圖片使用的行程數 (1 表示在目前行程中處理)
+
+    Returns:
+        最佳化結果
+    """
+    with zipfile.ZipFile(source) as zin:
+        members = {'/' + info.filename: info for info in zin.infolist()}
+        slide_size = _slide_size(zin)
+
+        # 1. 由所有關聯檔找出圖片，並依來源部件中的形狀計算顯示尺寸
+        usages: Dict[str, List[Tuple[str, str]]] = {}   # {來源部件: [(關聯 ID, 圖片)]}
+        for name in members:
+            if not name.endswith('.rels'):
+                continue
+            source_part = _source_partname(name[1:])
+            for r_id, (rel_type, target) in read_relationships(zin, source_part).items():
+                if rel_type == RT.IMAGE and target in members:
+                    usages.setdefault(source_part, []).append((r_id, target))
+
+        extents: Dict[str, Extent] = {}
+        for source_part, uses in usages.items():
+            part_extents = {}
+            if source_part in members and source_part.endswith('.xml'):
+                root = etree.fromstring(zin.read(source_part[1:]))
+                if root.find(qn('p:cSld')) is not None:
+                    part_extents = blip_extents(root, slide_size)
+            for r_id, image in uses:
+                extents[image] = _merge_extent(extents.get(image), part_extents.get(r_id),
+                                               image not in extents)
+
+        # 2. 依內容合併重複的圖片 (保留 zip 中的第一個)，顯示尺寸取各處的最大值
+        images = [name for name in members if name in extents]
+        canonical_by_hash: Dict[str, str] = {}
+        duplicates: Dict[str, str] = {}     # {重複圖片: 保留的圖片}
+        pixels: Dict[str, Tuple[int, int]] = {}
+        for image in images:
+            data = zin.read(image[1:])
+            digest = hashlib.sha256(data).hexdigest()
+            canonical = canonical_by_hash.setdefault(digest, image)
+            if canonical != image:
+                duplicates[image] = canonical
+                extents[canonical] = _merge_extent(extents[canonical], extents[image], False)
+                continue
+            try:
+                with Image.open(BytesIO(data)) as probe:
+                    extension = posixpath.splitext(image)[1].lower()
+                    if (extension in _FORMATS.get(probe.format, ())
+                            and not getattr(probe, 'is_animated', False)):
+                        pixels[image] = probe.size
+            except Exception:
+                pass
+
+        # 3. 縮小解析度過高的圖片 (多個行程時平行處理)
+        jobs = {}
+        for image, size in pixels.items():
+            target = _target_size(size, extents[image], dpi)
+            if target is not None:
+                jobs[image] = target
+        if workers > 1 and len(jobs) > 1:
+            with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as executor:
+                futures = {image: executor.submit(_downscale, zin.read(image[1:]), target,
+                                                  quality)
+                           for image, target in jobs.items()}
+                results = {image: future.result() for image, future in futures.items()}
+        else:
+            results = {image: _downscale(zin.read(image[1:]), target, quality)
+                       for image, target in jobs.items()}
+        optimized = {image: data for image, data in results.items() if data is not None}
+
+        # 4. 寫入輸出: 替換縮小後的圖片、改寫關聯，其餘項目直接複製
+        with zipfile.ZipFile(output, 'w', compression=zipfile.ZIP_DEFLATED,
+                             strict_timestamps=False) as zout:
+            for name, info in members.items():
+                if name in duplicates:
+                    continue
+                data = None
+                if name in optimized:
+                    data = optimized[name]
+                elif duplicates and name.endswith('.rels'):
+                    data = _rewrite_rels(zin.read(info), posixpath.dirname(
+                        _source_partname(info.filename)), duplicates)
+                elif duplicates and info.filename == _CONTENT_TYPES:
+                    data = _remove_overrides(zin.read(info), duplicates)
+                if data is None:
+                    copy_raw_member(zin, zout, info)
+                    continue
+                zinfo = zipfile.ZipInfo(info.filename, info.date_time)
+                zinfo.compress_type = info.compress_type
+                zinfo.external_attr = info.external_attr
+                zout.writestr(zinfo, data)
+
+    bytes_before = sum(members[image].file_size for image in images)
+    bytes_after = sum(len(optimized[image]) if image in optimized else members[image].file_size
+                      for image in images if image not in duplicates)
+    return MediaReport(len(images), len(optimized), len(duplicates), bytes_before, bytes_after)
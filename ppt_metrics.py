@@ -0,0 +1,156 @@
+# PPT 轉換效能指標 (Conversion Metrics)
+# 記錄每次轉換各階段耗時、每張投影片處理的形狀與文字 run 數，以及 tracemalloc 記憶體峰值
+
+"""
+使用方法:
+    converter = PPTStyleConverter('input.pptx', profile=True,
+                                  on_metrics=lambda m: print(m.format_report()))
+    converter.redesign_with_style('modern')
+    print(converter.last_metrics.stages)
+"""
+
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Dict, List, Optional
+
+if TYPE_CHECKING:  # ppt_media 依賴 Pillow、ppt_contrast 依賴 NumPy，只在型別檢查時匯入
+    from ppt_contrast import ContrastReport
+    from ppt_media import MediaReport
+
+# 報告中階段的顯示順序
+STAGES = ('cache', 'diff', 'parse', 'analyze', 'clone', 'theme', 'apply', 'save', 'media',
+          'contrast')
+
+
+@dataclass
+class SlideMetrics:
+    """單張投影片的處理結果"""
+    index: int
+    partname: str
+    shapes: int
+    runs: int
+    seconds: float
+
+
+@dataclass
+class ConversionMetrics:
+    """單次轉換 (一種風格) 的效能指標"""
+    style: str
+    engine: str
+    stages: Dict[str, float] = field(default_factory=dict)
+    slides: List[SlideMetrics] = field(default_factory=list)
+    # tracemalloc 記錄的峰值 (位元組)，只包含 Python 配置的記憶體、不含 lxml 的 C 層配置；
+    # 未啟用 profile 時為 None
+    peak_memory: Optional[int] = None
+    cached: bool = False
+    reused_slides: int = 0  # 增量轉換時直接沿用上次輸出的投影片數
+    media: Optional['MediaReport'] = None  # 媒體最佳化結果 (未啟用時為 None)
+    contrast: Optional['ContrastReport'] = None  # 對比檢查結果 (未啟用時為 None)
+
+    @contextmanager
+    def stage(self, name: str):
+        """量測一個階段的耗時 (同名階段會累加)"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = self.stages.get(name, 0.0) + time.perf_counter() - start
+
+    def add_slide(self, index: int, partname: str, shapes: int, runs: int, seconds: float):
+        """記錄一張投影片的處理結果"""
+        self.slides.append(SlideMetrics(index, partname, shapes, runs, seconds))
+
+    @property
+    def total_seconds(self) -> float:
+        return sum(self.stages.values())
+
+    @property
+    def total_shapes(self) -> int:
+        return sum(slide.shapes for slide in self.slides)
+
+    @property
+    def total_runs(self) -> int:
+        return sum(slide.runs for slide in self.slides)
+
+    def slowest_slides(self, count: int = 5) -> List[SlideMetrics]:
+        """耗時最長的投影片 (由慢到快)"""
+        return sorted(self.slides, key=lambda slide: slide.seconds, reverse=True)[:count]
+
+    def summary(self) -> Dict:
+        """扁平化的摘要 (適合放入表格或 JSON)"""
+        row = {'style': self.style, 'engine': self.engine, 'cached': self.cached}
+        for name in STAGES:
+            row[name] = self.stages.get(name, 0.0)
+        row.update({
+            'total': self.total_seconds,
+            'slides': len(self.slides),
+            'reused_slides': self.reused_slides,
+            'shapes': self.total_shapes,
+            'runs': self.total_runs,
+            'peak_memory': self.peak_memory,
+            'media_saved': self.media.bytes_saved if self.media is not None else None,
+            'contrast_failures': self.contrast.failing if self.contrast is not None else None,
+        })
+        return row
+
+    def format_report(self, slowest: int = 5) -> str:
+        """產生文字報告 (命令行 --profile 使用)"""
+        lines = [f"🔬 效能分析: {self.style} ({self.engine})"]
+        if self.cached:
+            lines.append(f"   快取命中，耗時 {self.total_seconds:.3f} 秒")
+            return '\n'.join(lines)
+        for name in STAGES:
+            if name in self.stages:
+                lines.append(f"   {name:<6} {self.stages[name]:>8.3f} 秒")
+        lines.append(f"   {'total':<6} {self.total_seconds:>8.3f} 秒")
+        lines.append(f"   投影片 {len(self.slides)} 張 | 形狀 {self.total_shapes} 個 | "
+                     f"文字 run {self.total_runs} 個")
+        if self.reused_slides:
+            lines.append(f"   重用上次輸出的投影片: {self.reused_slides} 張")
+        if self.media is not None:
+            lines.append(f"   {self.media.describe()}")
+        if self.contrast is not None:
+            lines.append(f"   {self.contrast.describe()}")
+        if self.peak_memory is not None:
+            lines.append(f"   記憶體峰值: {self.peak_memory / 1024 / 1024:.1f} MB")
+        if self.slides and slowest:
+            lines.append("   最慢的投影片:")
+            for slide in self.slowest_slides(slowest):
+                lines.append(f"     #{slide.index + 1:<4} {slide.seconds * 1000:>8.2f} ms "
+                             f"(形狀 {slide.shapes}，run {slide.runs})")
+        return '\n'.join(lines)
+
+
+# tracemalloc 是整個行程共用的: 同時進行的兩個量測會互相重設峰值或停止對方的追蹤，
+# 因此同一行程內需要量測的轉換依序執行 (可重入: 同一執行緒交錯消費兩個轉換時不會死結)
+_TRACE_LOCK = threading.RLock()
+
+
+@contextmanager
+def trace_peak_memory(metrics: ConversionMetrics, enabled: bool = True):
+    """在區塊內以 tracemalloc 量測記憶體峰值並寫入 metrics.peak_memory
+
+    若外部已經啟動 tracemalloc，只重設峰值而不停止追蹤。
+
+    限制: 同一行程內需要量測的區塊以鎖依序執行 (例如 JobManager 的多個執行緒同時處理
+    profile 工作時會排隊)；未量測的轉換仍可同時執行，其配置會計入峰值。區塊跨越產生器的
+    yield 時，消費端在兩次 yield 之間配置的記憶體也會計入。需要準確數字時請單獨執行轉換。
+    """
+    if not enabled:
+        yield
+        return
+    with _TRACE_LOCK:
+        started = not tracemalloc.is_tracing()
+        if started:
+            tracemalloc.start()
+        else:
+            tracemalloc.reset_peak()
+        try:
+            yield
+        finally:
+            metrics.peak_memory = tracemalloc.get_traced_memory()[1]
+            if started:
+                tracemalloc.stop()
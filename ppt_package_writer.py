@@ -0,0 +1,132 @@
+# PPT 封裝寫入器 (PPT Package Writer)
+# 只重新序列化有修改的 XML 部件，其餘 zip 項目 (圖片、影片等) 以壓縮後的原始位元組直接複製
+
+"""
+使用方法:
+    from ppt_package_writer import save_passthrough
+
+    if not save_passthrough(prs, source_bytes, 'output.pptx', dirty_partnames):
+        prs.save('output.pptx')  # 部件集合有變動時退回完整儲存
+"""
+
+import posixpath
+import struct
+import zipfile
+from io import BytesIO
+from typing import IO, Iterable, Optional, Union
+
+from lxml import etree
+
+# zip 本地檔頭 (local file header) 固定長度與檔名/額外欄位長度的位置
+_LOCAL_HEADER_SIZE = 30
+_LOCAL_HEADER_LENGTHS = struct.Struct('<HH')
+# 保留 UTF-8 檔名旗標，清除資料描述子 (data descriptor) 旗標
+_FLAG_UTF8 = 0x800
+
+
+def _read_raw_member(zin: zipfile.ZipFile, info: zipfile.ZipInfo) -> bytes:
+    """讀取 zip 項目壓縮後的原始位元組 (不解壓縮)"""
+    zin.fp.seek(info.header_offset)
+    header = zin.fp.read(_LOCAL_HEADER_SIZE)
+    name_len, extra_len = _LOCAL_HEADER_LENGTHS.unpack(header[26:30])
+    zin.fp.seek(info.header_offset + _LOCAL_HEADER_SIZE + name_len + extra_len)
+    return zin.fp.read(info.compress_size)
+
+
+def copy_raw_member(zin: zipfile.ZipFile, zout: zipfile.ZipFile, info: zipfile.ZipInfo,
+                    arcname: Optional[str] = None):
+    """將 zin 的一個項目原封不動 (保持壓縮狀態) 複製到 zout
+
+    Args:
+        zin: 來源 zip (讀取模式)
+        zout: 目標 zip (寫入模式)
+        info: 來源項目資訊
+        arcname: 目標項目名稱 (None 表示與來源相同)
+    """
+    data = _read_raw_member(zin, info)
+
+    zinfo = zipfile.ZipInfo(arcname or info.filename, info.date_time)
+    zinfo.compress_type = info.compress_type
+    zinfo.flag_bits = info.flag_bits & _FLAG_UTF8
+    zinfo.create_system = info.create_system
+    zinfo.external_attr = info.external_attr
+    zinfo.CRC = info.CRC
+    zinfo.compress_size = info.compress_size
+    zinfo.file_size = info.file_size
+    zip64 = (zinfo.file_size > zipfile.ZIP64_LIMIT
+             or zinfo.compress_size > zipfile.ZIP64_LIMIT)
+
+    # zipfile 沒有公開的原始寫入 API，這裡依照 ZipFile.writestr 的流程直接寫入檔頭與資料
+    with zout._lock:
+        zout._writecheck(zinfo)
+        zout._didModify = True
+        zinfo.header_offset = zout.fp.tell()
+        zout.fp.write(zinfo.FileHeader(zip64))
+        zout.fp.write(data)
+        zout.filelist.append(zinfo)
+        zout.NameToInfo[zinfo.filename] = zinfo
+        zout.start_dir = zout.fp.tell()
+
+
+def _rels_member(partname: str) -> str:
+    """部件對應的關聯檔 zip 項目名稱 (例如 ppt/_rels/presentation.xml.rels)"""
+    directory, filename = posixpath.split(partname)
+    return posixpath.join(directory, '_rels', filename + '.rels').lstrip('/')
+
+
+def _slide_partnames_unchanged(prs, zin: zipfile.ZipFile) -> bool:
+    """檢查投影片部件名稱是否與原始檔案相同
+
+    python-pptx 第一次存取 prs.slides 時會依投影片順序重新命名投影片部件；
+    原始檔案中投影片部件名稱與順序不一致時，直接複製的 .rels 會對應到錯誤的投影片。
+    """
+    partname = str(prs.part.partname)
+    try:
+        rels = etree.fromstring(zin.read(_rels_member(partname)))
+    except KeyError:
+        return False
+    base = posixpath.dirname(partname)
+    source_targets = {
+        rel.get('Id'): posixpath.normpath(posixpath.join(base, rel.get('Target')))
+        for rel in rels if rel.get('TargetMode') != 'External'
+    }
+    for rId, rel in prs.part.rels.items():
+        if not rel.is_external and source_targets.get(rId) != str(rel.target_part.partname):
+            return False
+    return True
+
+
+def save_passthrough(prs, source_bytes: bytes, output: Union[str, IO[bytes]],
+                     dirty_partnames: Iterable[str]) -> bool:
+    """以原始檔案為基礎儲存簡報，只重寫有修改的部件
+
+    未列在 dirty_partnames 中的項目 (含 [Content_Types].xml 與所有 .rels) 直接複製壓縮資料。
+    若簡報的部件集合與原始檔案不同 (例如新增了部件)，或投影片部件已被重新命名，
+    則不寫入任何內容並回傳 False。
+
+    Args:
+        prs: 簡報物件 (由 source_bytes 解析而來)
+        source_bytes: 原始 .pptx 檔案內容
+        output: 輸出檔案路徑或可寫入的檔案物件
+        dirty_partnames: 需要重新序列化的部件名稱 (例如 '/ppt/slides/slide1.xml')
+
+    Returns:
+        是否成功以直通方式寫入
+    """
+    parts = {str(part.partname): part for part in prs.part.package.iter_parts()}
+
+    with zipfile.ZipFile(BytesIO(source_bytes)) as zin:
+        members = {'/' + info.filename for info in zin.infolist()}
+        if not set(parts) <= members or not _slide_partnames_unchanged(prs, zin):
+            return False
+
+        dirty = set(dirty_partnames)
+        with zipfile.ZipFile(output, 'w', compression=zipfile.ZIP_DEFLATED,
+                             strict_timestamps=False) as zout:
+            for info in zin.infolist():
+                partname = '/' + info.filename
+                if partname in dirty and partname in parts:
+                    zout.writestr(info.filename, parts[partname].blob)
+                else:
+                    copy_raw_member(zin, zout, info)
+    return True
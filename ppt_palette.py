@@ -0,0 +1,477 @@
+# PPT 品牌色盤擷取 (Brand Palette Extraction)
+# 從參考簡報 (或標誌圖片) 取出內嵌圖片的像素與單色填滿色彩，先以 5 bit 色階分箱合併相同色彩，
+# 再以 NumPy 向量化的加權 k-means (CIELAB 色彩空間) 量化為色盤，依亮度與彩度對應到新的 StylePreset
+
+"""
+使用方法:
+    # 由參考簡報產生風格並存入自訂風格檔 (之後可以 --styles acme 使用)
+    python ppt_palette.py brand_deck.pptx --key acme --name "Acme Brand" --save
+
+    # 由標誌圖片產生，只顯示結果
+    python ppt_palette.py logo.png --key acme --name "Acme Brand"
+
+    # 直接使用
+    palette = extract_palette('brand_deck.pptx', colors=8, workers=4)
+    preset = preset_from_palette(palette, name='Acme Brand')
+"""
+
+import argparse
+import colorsys
+import posixpath
+import sys
+import time
+import zipfile
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import replace
+from io import BytesIO
+from pathlib import Path
+from typing import List, NamedTuple, Optional, Tuple
+
+import numpy as np
+from lxml import etree
+from PIL import Image
+from pptx.oxml.ns import qn
+
+from ppt_styles import BUILTIN_STYLES, CUSTOM_STYLES_PATH, STYLE_PRESETS, StylePreset, save_preset
+
+DEFAULT_COLORS = 8
+DEFAULT_SAMPLE_PIXELS = 200_000   # 所有圖片合計取樣的像素數
+DEFAULT_FILL_SHARE = 0.5          # 有圖片時單色填滿在色盤中所佔的權重比例
+
+_IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.gif', '.bmp', '.tif', '.tiff', '.webp')
+_MIN_IMAGE_SAMPLES = 2_000        # 每張圖片至少取樣的像素數
+_ALPHA_CUTOFF = 128               # 透明度低於此值的像素不計入
+_BIN_SHIFT = 3                    # 每個色版保留 5 bit 分箱
+_KMEANS_ITERATIONS = 30
+_KMEANS_TOLERANCE = 1e-3          # 中心移動量 (ΔE) 低於此值時停止
+_LINK_SLOTS = (qn('a:hlink'), qn('a:folHlink'))  # 超連結色彩不是品牌色
+
+# 色彩對應
+_NEUTRAL_CHROMA = 15              # CIELAB 彩度低於此值視為中性色 (白、灰、黑)
+_MIN_BACKGROUND_WEIGHT = 0.05     # 背景色至少佔色盤的比例 (否則使用白色)
+_DISTINCT_DELTA_E = 20            # 輔色與主色至少相差的 ΔE
+_MIN_ACCENT_WEIGHT = 0.01         # 強調色候選至少佔色盤的比例
+_TEXT_MIN_CONTRAST = 4.5          # 文字與背景的最低對比 (WCAG AA)
+_DARK_TEXT = (30, 30, 30)
+_LIGHT_TEXT = (245, 245, 245)
+
+RGB = Tuple[int, int, int]
+
+
+class Palette(NamedTuple):
+    """量化後的色盤 (依權重由高到低)"""
+    colors: List[RGB]
+    weights: List[float]                      # 每個色彩所佔的比例 (總和為 1)
+    images: int                               # 取樣的圖片數 (不含重複)
+    fills: int                                # 單色填滿出現的次數
+    fonts: Tuple[Optional[str], Optional[str]]  # 佈景主題的 (標題字型, 內文字型)
+    source: str
+
+    def describe(self) -> str:
+        swatches = ', '.join(f"#{r:02X}{g:02X}{b:02X} {weight:.0%}"
+                             for (r, g, b), weight in zip(self.colors, self.weights))
+        return f"{len(self.colors)} 色 (圖片 {self.images} 張、填滿 {self.fills} 處): {swatches}"
+
+
+# ==================== 取樣 ====================
+
+def _image_pixels(data: bytes, max_pixels: int, seed: int) -> Optional[np.ndarray]:
+    """解碼圖片並隨機取樣像素 (可在工作行程中執行)
+
+    Args:
+        data: 圖片內容
+        max_pixels: 最多取樣的像素數
+        seed: 亂數種子 (相同輸入得到相同結果)
+
+    Returns:
+        (N, 3) uint8 陣列；無法解碼時回傳 None
+    """
+    try:
+        with Image.open(BytesIO(data)) as image:
+            # 只需約 4 倍取樣數的像素: JPEG 直接以較低解析度解碼，
+            # 其他格式以最近鄰縮小 (保留原本的色彩，不產生混合色)
+            scale = (4 * max_pixels / max(1, image.width * image.height)) ** 0.5
+            if scale < 1:
+                size = (max(1, int(image.width * scale)), max(1, int(image.height * scale)))
+                image.draft('RGB', size)
+                if image.size != size:
+                    image = image.resize(size, Image.NEAREST)
+            if image.mode in ('RGBA', 'LA', 'PA') or 'transparency' in image.info:
+                rgba = np.asarray(image.convert('RGBA')).reshape(-1, 4)
+                pixels = rgba[rgba[:, 3] >= _ALPHA_CUTOFF, :3]
+            else:
+                pixels = np.asarray(image.convert('RGB')).reshape(-1, 3)
+    except Exception:
+        return None
+    if len(pixels) > max_pixels:
+        rng = np.random.default_rng(seed)
+        pixels = pixels[rng.choice(len(pixels), max_pixels, replace=False)]
+    return np.ascontiguousarray(pixels)
+
+
+def _fill_colors(zin: zipfile.ZipFile) -> Tuple[Counter, Tuple[Optional[str], Optional[str]]]:
+    """所有 XML 部件中的單色填滿與佈景主題色彩，以及佈景主題字型
+
+    Returns:
+        ({十六進位色彩: 出現次數}, (標題字型, 內文字型))
+    """
+    fills: Counter = Counter()
+    fonts = (None, None)
+    for info in zin.infolist():
+        name = info.filename
+        if not (name.startswith('ppt/') and name.endswith('.xml')):
+            continue
+        root = etree.fromstring(zin.read(info))
+        for fill in root.iter(qn('a:solidFill')):
+            color = fill.find(qn('a:srgbClr'))
+            if color is not None and color.get('val'):
+                fills[color.get('val').upper()] += 1
+        if posixpath.dirname(name) == 'ppt/theme':
+            scheme = root.find(f".//{qn('a:clrScheme')}")
+            for slot in (scheme if scheme is not None else ()):
+                if slot.tag in _LINK_SLOTS:
+                    continue
+                color = slot.find(qn('a:srgbClr'))
+                if color is not None and color.get('val'):
+                    fills[color.get('val').upper()] += 1
+            if fonts == (None, None):
+                major = root.find(f".//{qn('a:majorFont')}/{qn('a:latin')}")
+                minor = root.find(f".//{qn('a:minorFont')}/{qn('a:latin')}")
+                fonts = (major.get('typeface') if major is not None else None,
+                         minor.get('typeface') if minor is not None else None)
+    return fills, fonts
+
+
+def _bin_pixels(pixels: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """依 5 bit 色階分箱合併像素
+
+    Returns:
+        (每箱的平均色彩 (M, 3) float, 每箱的像素數 (M,))
+    """
+    packed = ((pixels[:, 0].astype(np.int32) >> _BIN_SHIFT) << 10
+              | (pixels[:, 1].astype(np.int32) >> _BIN_SHIFT) << 5
+              | (pixels[:, 2].astype(np.int32) >> _BIN_SHIFT))
+    bins, inverse, counts = np.unique(packed, return_inverse=True, return_counts=True)
+    inverse = inverse.ravel()
+    means = np.stack([np.bincount(inverse, weights=pixels[:, channel], minlength=len(bins))
+                      for channel in range(3)], axis=1) / counts[:, None]
+    return means, counts.astype(np.float64)
+
+
+# ==================== 量化 ====================
+
+def rgb_to_lab(rgb: np.ndarray) -> np.ndarray:
+    """sRGB (0-255) 轉換為 CIELAB (D65)，輸入為 (N, 3) 陣列"""
+    srgb = np.asarray(rgb, dtype=np.float64) / 255.0
+    linear = np.where(srgb <= 0.04045, srgb / 12.92, ((srgb + 0.055) / 1.055) ** 2.4)
+    xyz = linear @ np.array([[0.4124, 0.2126, 0.0193],
+                             [0.3576, 0.7152, 0.1192],
+                             [0.1805, 0.0722, 0.9505]])
+    xyz /= np.array([0.95047, 1.0, 1.08883])
+    f = np.where(xyz > 216 / 24389, np.cbrt(xyz), (24389 / 27 * xyz + 16) / 116)
+    return np.stack([116 * f[:, 1] - 16,
+                     500 * (f[:, 0] - f[:, 1]),
+                     200 * (f[:, 1] - f[:, 2])], axis=1)
+
+
+def _squared_distances(points: np.ndarray, centers: np.ndarray) -> np.ndarray:
+    """(N, K) 平方距離矩陣"""
+    distances = ((points ** 2).sum(axis=1)[:, None] - 2 * points @ centers.T
+                 + (centers ** 2).sum(axis=1)[None, :])
+    return np.maximum(distances, 0)
+
+
+def weighted_kmeans(points: np.ndarray, weights: np.ndarray, k: int,
+                    seed: int = 0) -> np.ndarray:
+    """加權 k-means (k-means++ 初始化)，每次迭代以矩陣運算同時處理所有點
+
+    Args:
+        points: (N, D) 座標
+        weights: (N,) 權重
+        k: 群數 (不超過 N)
+        seed: 亂數種子
+
+    Returns:
+        每個點所屬的群 (N,)
+    """
+    rng = np.random.default_rng(seed)
+    probabilities = weights / weights.sum()
+    centers = [points[rng.choice(len(points), p=probabilities)]]
+    closest = _squared_distances(points, np.array(centers))[:, 0]
+    for _ in range(1, k):
+        scores = closest * weights
+        if scores.sum() <= 0:
+            break
+        centers.append(points[rng.choice(len(points), p=scores / scores.sum())])
+        closest = np.minimum(closest, _squared_distances(points, centers[-1][None, :])[:, 0])
+    centers = np.array(centers)
+
+    for _ in range(_KMEANS_ITERATIONS):
+        labels = _squared_distances(points, centers).argmin(axis=1)
+        totals = np.bincount(labels, weights=weights, minlength=len(centers))
+        sums = np.stack([np.bincount(labels, weights=weights * points[:, dim],
+                                     minlength=len(centers))
+                         for dim in range(points.shape[1])], axis=1)
+        occupied = totals > 0
+        updated = centers.copy()
+        updated[occupied] = sums[occupied] / totals[occupied, None]
+        shift = np.sqrt(((updated - centers) ** 2).sum(axis=1)).max()
+        centers = updated
+        if shift < _KMEANS_TOLERANCE:
+            break
+    return _squared_distances(points, centers).argmin(axis=1)
+
+
+def extract_palette(source, colors: int = DEFAULT_COLORS,
+                    sample_pixels: int = DEFAULT_SAMPLE_PIXELS,
+                    fill_share: float = DEFAULT_FILL_SHARE, workers: int = 1,
+                    seed: int = 0) -> Palette:
+    """由參考簡報或圖片擷取色盤
+
+    Args:
+        source: .pptx 檔案或圖片 (路徑或檔案物件)
+        colors: 色盤的色彩數
+        sample_pixels: 所有圖片合計取樣的像素數 (圖片越多，每張取樣越少)
+        fill_share: 同時有圖片與單色填滿時，填滿色彩所佔的權重比例
+        workers: 解碼圖片使用的行程數 (1 表示在目前行程中處理)
+        seed: 亂數種子 (相同輸入得到相同色盤)
+
+    Returns:
+        色盤；沒有任何可用的色彩時引發 ValueError
+    """
+    name = getattr(source, 'name', None) or str(source)
+    fills: Counter = Counter()
+    fonts = (None, None)
+    images: List[bytes] = []
+    if zipfile.is_zipfile(source):
+        with zipfile.ZipFile(source) as zin:
+            fills, fonts = _fill_colors(zin)
+            # 依 CRC 與大小略過重複的圖片 (不需讀取內容)
+            seen = set()
+            for info in zin.infolist():
+                if (info.filename.startswith('ppt/media/')
+                        and info.filename.lower().endswith(_IMAGE_EXTENSIONS)
+                        and (info.CRC, info.file_size) not in seen):
+                    seen.add((info.CRC, info.file_size))
+                    images.append(zin.read(info))
+    else:
+        if hasattr(source, 'seek'):
+            source.seek(0)
+        images.append(source.read() if hasattr(source, 'read') else Path(source).read_bytes())
+
+    # 1. 圖片取樣 (多個行程時平行解碼)
+    quota = max(_MIN_IMAGE_SAMPLES, sample_pixels // max(1, len(images)))
+    if workers > 1 and len(images) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(images))) as executor:
+            samples = list(executor.map(_image_pixels, images, [quota] * len(images),
+                                        range(seed, seed + len(images))))
+    else:
+        samples = [_image_pixels(data, quota, seed + index) for index, data in enumerate(images)]
+    samples = [pixels for pixels in samples if pixels is not None and len(pixels)]
+
+    points, weights = [], []
+    image_total = 0.0
+    if samples:
+        means, counts = _bin_pixels(np.concatenate(samples))
+        points.append(means)
+        weights.append(counts)
+        image_total = counts.sum()
+
+    # 2. 單色填滿: 有圖片時依 fill_share 換算為等效像素數
+    if fills:
+        fill_rgb = np.array([[int(value[i:i + 2], 16) for i in (0, 2, 4)] for value in fills],
+                            dtype=np.float64)
+        fill_counts = np.array(list(fills.values()), dtype=np.float64)
+        if image_total:
+            fill_counts *= image_total * fill_share / (1 - fill_share) / fill_counts.sum()
+        points.append(fill_rgb)
+        weights.append(fill_counts)
+
+    if not points:
+        raise ValueError(f"{name} 中沒有可用的圖片或單色填滿色彩")
+    rgb = np.concatenate(points)
+    weight = np.concatenate(weights)
+
+    # 3. 在 CIELAB 中量化，群的色彩取成員在 sRGB 中的加權平均
+    labels = weighted_kmeans(rgb_to_lab(rgb), weight, min(colors, len(rgb)), seed)
+    totals = np.bincount(labels, weights=weight)
+    clusters = []
+    for label in np.flatnonzero(totals):
+        members = labels == label
+        mean = (rgb[members] * weight[members, None]).sum(axis=0) / totals[label]
+        clusters.append((totals[label], tuple(int(round(value)) for value in mean)))
+    clusters.sort(reverse=True)
+    total = sum(cluster_weight for cluster_weight, _ in clusters)
+    return Palette([color for _, color in clusters],
+                   [float(cluster_weight / total) for cluster_weight, _ in clusters],
+                   len(samples), sum(fills.values()), fonts, Path(name).name)
+
+
+# ==================== 對應到風格 ====================
+
+def _luminance(rgb: RGB) -> float:
+    """WCAG 相對亮度"""
+    linear = [value / 255 / 12.92 if value / 255 <= 0.04045
+              else ((value / 255 + 0.055) / 1.055) ** 2.4 for value in rgb]
+    return 0.2126 * linear[0] + 0.7152 * linear[1] + 0.0722 * linear[2]
+
+
+def contrast_ratio(first: RGB, second: RGB) -> float:
+    """WCAG 對比值 (1 - 21)"""
+    lighter, darker = sorted((_luminance(first), _luminance(second)), reverse=True)
+    return (lighter + 0.05) / (darker + 0.05)
+
+
+def _mix(color: RGB, other: RGB, amount: float) -> RGB:
+    """color 往 other 混合 amount 比例"""
+    return tuple(int(round(a + (b - a) * amount)) for a, b in zip(color, other))
+
+
+def _rotate_hue(color: RGB, degrees: float) -> RGB:
+    hue, lightness, saturation = colorsys.rgb_to_hls(*(value / 255 for value in color))
+    rotated = colorsys.hls_to_rgb((hue + degrees / 360) % 1, lightness, saturation)
+    return tuple(int(round(value * 255)) for value in rotated)
+
+
+def preset_from_palette(palette: Palette, name: str, description: Optional[str] = None,
+                        base: str = 'modern') -> StylePreset:
+    """將色盤對應到風格預設
+
+    背景取權重最高的淺色或深色中性色 (沒有時為白色)，文字取與背景對比最高的中性色
+    (不足 4.5:1 時使用近黑/近白)；彩色依「權重 × 彩度」排序 (照片中大量的低彩度色彩
+    不會蓋過品牌色)，主色為第一個，輔色為與主色明顯不同的下一個 (沒有時為主色的淡色)，
+    強調色為色相與主色差距最大的彩色 (沒有時為主色的補色)。
+
+    Args:
+        palette: extract_palette 的結果
+        name: 風格名稱
+        description: 風格描述 (預設註明來源)
+        base: 提供字級與其他設定的既有風格；參考簡報有佈景主題字型時使用該字型
+
+    Returns:
+        新的風格預設
+    """
+    colors = list(palette.colors)
+    lab = rgb_to_lab(np.array(colors, dtype=np.float64))
+    lightness = lab[:, 0]
+    chroma = np.hypot(lab[:, 1], lab[:, 2])
+    hue = np.degrees(np.arctan2(lab[:, 2], lab[:, 1]))
+    neutral = [i for i in range(len(colors)) if chroma[i] < _NEUTRAL_CHROMA]
+
+    # 背景
+    background_index = next((i for i in neutral
+                             if (lightness[i] >= 85 or lightness[i] <= 20)
+                             and palette.weights[i] >= _MIN_BACKGROUND_WEIGHT), None)
+    background = colors[background_index] if background_index is not None else (255, 255, 255)
+
+    # 文字
+    text_candidates = [i for i in neutral if i != background_index]
+    text_index = max(text_candidates, key=lambda i: contrast_ratio(colors[i], background),
+                     default=None)
+    if text_index is not None and \
+            contrast_ratio(colors[text_index], background) >= _TEXT_MIN_CONTRAST:
+        text = colors[text_index]
+    else:
+        text_index = None
+        text = _DARK_TEXT if _luminance(background) > 0.18 else _LIGHT_TEXT
+
+    # 主色、輔色、強調色
+    chromatic = sorted((i for i in range(len(colors))
+                        if chroma[i] >= _NEUTRAL_CHROMA and i not in (background_index, text_index)),
+                       key=lambda i: palette.weights[i] * chroma[i], reverse=True)
+    if chromatic:
+        primary_index = chromatic[0]
+    else:
+        others = [i for i in range(len(colors)) if i not in (background_index, text_index)]
+        primary_index = max(others, key=lambda i: contrast_ratio(colors[i], background),
+                            default=None)
+    primary = colors[primary_index] if primary_index is not None else text
+    remaining = [i for i in chromatic if i != primary_index]
+
+    def delta_e(i: int) -> float:
+        return float(np.linalg.norm(lab[i] - lab[primary_index]))
+
+    secondary_index = next((i for i in remaining if delta_e(i) >= _DISTINCT_DELTA_E), None)
+    secondary = colors[secondary_index] if secondary_index is not None \
+        else _mix(primary, background, 0.4)
+
+    def hue_distance(i: int) -> float:
+        return abs((hue[i] - hue[primary_index] + 180) % 360 - 180)
+
+    accent_candidates = [i for i in remaining if i != secondary_index
+                         and palette.weights[i] >= _MIN_ACCENT_WEIGHT]
+    accent_index = max(accent_candidates, key=hue_distance, default=None)
+    accent = colors[accent_index] if accent_index is not None else _rotate_hue(primary, 180)
+
+    title_font, body_font = palette.fonts
+    template = STYLE_PRESETS[base]
+    return replace(
+        template,
+        name=name,
+        description=description or f"由 {palette.source} 擷取的品牌色盤",
+        primary_color=primary,
+        secondary_color=secondary,
+        accent_color=accent,
+        background_color=background,
+        text_color=text,
+        title_font=title_font or template.title_font,
+        body_font=body_font or template.body_font,
+    )
+
+
+def _swatch(rgb: RGB) -> str:
+    """終端機色塊 (24 位元色彩)"""
+    return f"\033[48;2;{rgb[0]};{rgb[1]};{rgb[2]}m    \033[0m #{rgb[0]:02X}{rgb[1]:02X}{rgb[2]:02X}"
+
+
+def main():
+    """命令行介面"""
+    parser = argparse.ArgumentParser(description='由參考簡報或標誌擷取品牌色盤並產生風格')
+    parser.add_argument('reference', help='參考 .pptx 或圖片')
+    parser.add_argument('--key', required=True, help='風格代號 (例如 acme)')
+    parser.add_argument('--name', help='風格名稱 (預設與代號相同)')
+    parser.add_argument('--description', help='風格描述')
+    parser.add_argument('--base', choices=BUILTIN_STYLES, default='modern',
+                        help='提供字級與其他設定的內建風格')
+    parser.add_argument('--colors', type=int, default=DEFAULT_COLORS, help='色盤色彩數')
+    parser.add_argument('--sample-pixels', type=int, default=DEFAULT_SAMPLE_PIXELS,
+                        help='所有圖片合計取樣的像素數')
+    parser.add_argument('--workers', type=int, default=1, help='解碼圖片的行程數 (預設 1)')
+    parser.add_argument('--save', action='store_true',
+                        help=f'存入自訂風格檔 (預設 {CUSTOM_STYLES_PATH.name}，'
+                             f'可用環境變數 PPT_CUSTOM_STYLES 指定)')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    try:
+        palette = extract_palette(args.reference, colors=args.colors,
+                                  sample_pixels=args.sample_pixels, workers=args.workers)
+    except (OSError, ValueError) as e:
+        print(f"✗ 錯誤: {e}")
+        sys.exit(1)
+    print(f"🎨 {palette.describe()}")
+    print(f"  耗時 {time.perf_counter() - start:.2f} 秒")
+    for color, weight in zip(palette.colors, palette.weights):
+        print(f"  {_swatch(color)} {weight:6.1%}")
+
+    preset = preset_from_palette(palette, args.name or args.key, args.description, args.base)
+    print(f"\n✨ 風格 {args.key}: {preset.name}")
+    for field in ('primary_color', 'secondary_color', 'accent_color',
+                  'background_color', 'text_color'):
+        print(f"  {field:<17} {_swatch(getattr(preset, field))}")
+    print(f"  字型: {preset.title_font} / {preset.body_font}")
+    print(f"  文字對比: {contrast_ratio(preset.text_color, preset.background_color):.1f}:1")
+
+    if args.save:
+        try:
+            path = save_preset(args.key, preset)
+        except ValueError as e:
+            print(f"✗ 錯誤: {e}")
+            sys.exit(1)
+        print(f"\n✓ 已存入 {path}，使用: python ppt_style_converter.py input.pptx "
+              f"--styles {args.key}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,582 @@
+# PPT 轉換 HTTP 服務 (Conversion Service)
+# 提供給上游系統呼叫的 WSGI 端點: 上傳簡報與風格名稱，回傳套用風格後的簡報。
+# 轉換在預先啟動並暖機的行程池中執行 (每個請求不需重新啟動直譯器與載入 pptx)；
+# 排隊中的請求數有上限，滿載時立即回傳 429，並提供 /health 與 /metrics
+
+"""
+使用方法:
+    # 本機執行 (內建多執行緒 WSGI 伺服器)
+    python ppt_service.py --port 8000 --workers 4 --max-queue 8
+
+    # 以 gunicorn 執行 (只能使用 1 個 gunicorn 行程，行程池與排隊上限屬於該行程；
+    # 以 --threads 決定可同時等待的連線數)
+    gunicorn -w 1 --threads 16 --timeout 300 -b 0.0.0.0:8000 \\
+        "ppt_service:create_app(workers=4, max_queue=8)"
+
+    # 呼叫
+    curl -X POST --data-binary @input.pptx -o styled.pptx \\
+        "http://localhost:8000/convert?styles=modern&name=input.pptx"
+    curl -X POST --data-binary @input.pptx -o styled.zip \\
+        "http://localhost:8000/convert?styles=modern,minimal"    # 多種風格回傳 zip
+    curl http://localhost:8000/health
+    curl http://localhost:8000/metrics
+
+回應:
+    200  單一風格為 .pptx，多種風格為 zip (部分風格失敗時附 errors.json，
+         並在 X-Failed-Styles 標頭列出失敗的風格)
+    400  參數錯誤或不是 .pptx；411 缺少 Content-Length；413 檔案過大
+    429  排隊已滿 (Retry-After 標頭為建議的重試秒數)
+    500  轉換失敗；503 行程池無法使用；504 等待轉換逾時
+"""
+
+import argparse
+import contextlib
+import json
+import multiprocessing
+import os
+import threading
+import time
+import zipfile
+from concurrent.futures import Future, ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from io import BytesIO
+from pathlib import Path
+from socketserver import ThreadingMixIn
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, quote
+from wsgiref.simple_server import WSGIServer, make_server
+
+from pptx import Presentation
+
+from ppt_style_converter import (PPTStyleConverter, STYLE_PRESETS, ENGINES, DEFAULT_ENGINE)
+from ppt_style_program import compile_style
+from ppt_store import ConversionCache
+
+DEFAULT_WORKERS = 2
+DEFAULT_MAX_QUEUE = 8
+DEFAULT_TIMEOUT = 300.0
+DEFAULT_MAX_UPLOAD_BYTES = 200 * 1024 * 1024
+DEFAULT_RETRY_AFTER = 5
+
+_BODY_READ = 'ppt_service.body_read'  # environ 中標記上傳內容已讀取
+PPTX_CONTENT_TYPE = 'application/vnd.openxmlformats-officedocument.presentationml.presentation'
+_STATUS_TEXT = {
+    200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+    411: 'Length Required', 413: 'Payload Too Large', 429: 'Too Many Requests',
+    500: 'Internal Server Error', 503: 'Service Unavailable', 504: 'Gateway Timeout',
+}
+
+
+# ==================== 工作行程 ====================
+# 行程池的每個行程只載入一次模組並先執行一次小型轉換，之後處理所有分配到的請求
+_service_options: Dict = {}
+_ready_barrier = None
+_WARM_UP_TIMEOUT = 120  # 等待所有行程完成暖機的秒數
+
+
+def _init_service_worker(options: Dict, ready_barrier=None):
+    """工作行程初始化: 記錄轉換器設定並暖機"""
+    global _service_options, _ready_barrier
+    _service_options = options
+    _ready_barrier = ready_barrier
+    _warm_up()
+
+
+def _warm_up():
+    """編譯所有風格並轉換一份小型簡報 (載入 pptx 的 XML 類別與 XPath)"""
+    prs = Presentation()
+    slide = prs.slides.add_slide(prs.slide_layouts[1])
+    slide.shapes.title.text = 'warm-up'
+    buffer = BytesIO()
+    prs.save(buffer)
+    for style in STYLE_PRESETS.values():
+        compile_style(style)
+    with open(os.devnull, 'w', encoding='utf-8') as devnull, \
+            contextlib.redirect_stdout(devnull):
+        converter = PPTStyleConverter.from_buffer(buffer.getvalue(), incremental=False,
+                                                  index_outputs=False, **_service_options)
+        converter.redesign_to_bytes(next(iter(STYLE_PRESETS)))
+
+
+def _worker_ready() -> int:
+    """確認工作行程已完成初始化
+
+    所有行程都到達屏障後才返回: 每個行程同時只執行一個工作，因此 workers 個確認工作
+    必定分散到 workers 個不同的行程 (已暖機的行程無法搶走還在初始化的行程的確認工作)。
+    """
+    if _ready_barrier is not None:
+        _ready_barrier.wait(timeout=_WARM_UP_TIMEOUT)
+    return os.getpid()
+
+
+def _convert(data: bytes, name: str, styles: List[str], engine: str
+             ) -> Tuple[Dict[str, bytes], Dict[str, str]]:
+    """在工作行程中轉換一份簡報的多種風格
+
+    Returns:
+        ({風格名稱: 輸出檔案內容}, {風格名稱: 錯誤訊息})
+    """
+    with open(os.devnull, 'w', encoding='utf-8') as devnull, \
+            contextlib.redirect_stdout(devnull):
+        converter = PPTStyleConverter.from_buffer(data, name=name, engine=engine,
+                                                  incremental=False, index_outputs=False,
+                                                  **_service_options)
+        outputs = converter.batch_redesign_to_bytes(styles)
+    errors = {entry['style']: entry['error'] for entry in converter.last_batch_report
+              if entry['error'] is not None}
+    return outputs, errors
+
+
+# ==================== WSGI 應用程式 ====================
+
+class ServiceError(Exception):
+    """以指定 HTTP 狀態回應的錯誤"""
+
+    def __init__(self, status: int, message: str, headers: List[Tuple[str, str]] = None):
+        super().__init__(message)
+        self.status = status
+        self.headers = headers or []
+
+
+class ConversionService:
+    """轉換服務 (WSGI 應用程式)
+
+    同時接受的轉換請求數 = workers (執行中) + max_queue (排隊中)，超過時回傳 429；
+    請求被接受後，即使用戶端斷線或逾時，名額也要等轉換實際結束才會釋放。
+    """
+
+    def __init__(self, workers: int = DEFAULT_WORKERS, max_queue: int = DEFAULT_MAX_QUEUE,
+                 engine: str = DEFAULT_ENGINE, cache: ConversionCache = None,
+                 timeout: float = DEFAULT_TIMEOUT,
+                 max_upload_bytes: int = DEFAULT_MAX_UPLOAD_BYTES,
+                 retry_after: int = DEFAULT_RETRY_AFTER, optimize_media: bool = False):
+        """初始化服務並啟動、暖機行程池
+
+        Args:
+            workers: 轉換行程數
+            max_queue: 所有行程忙碌時最多排隊的請求數
+            engine: 預設轉換引擎 (請求可用 engine 參數指定)
+            cache: 轉換結果快取 (只在主行程讀寫，None 表示不使用快取)
+            timeout: 等待單一請求轉換完成的秒數
+            max_upload_bytes: 上傳檔案大小上限
+            retry_after: 429 回應建議的重試秒數
+            optimize_media: 輸出時縮小過大的圖片並合併重複圖片
+        """
+        if engine not in ENGINES:
+            raise ValueError(f"未知引擎: {engine}")
+        self.workers = workers
+        self.max_queue = max_queue
+        self.engine = engine
+        self.cache = cache
+        self.timeout = timeout
+        self.max_upload_bytes = max_upload_bytes
+        self.retry_after = retry_after
+        self.options = {'optimize_media': optimize_media}
+
+        self._slots = threading.BoundedSemaphore(workers + max_queue)
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._responses: Dict[int, int] = {}
+        self._cache_hits = 0
+        self._conversions = 0
+        self._conversion_seconds = 0.0
+        self._started = time.time()
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._pool_error: Optional[str] = None  # 上次重建行程池失敗的原因
+        self._restart_lock = threading.Lock()
+        self._start_pool()
+
+    def _start_pool(self):
+        """建立行程池並等待所有行程完成暖機 (失敗時關閉新的行程池並拋出例外)"""
+        start = time.perf_counter()
+        barrier = multiprocessing.Barrier(self.workers)
+        executor = ProcessPoolExecutor(max_workers=self.workers,
+                                       initializer=_init_service_worker,
+                                       initargs=(self.options, barrier))
+        try:
+            for future in [executor.submit(_worker_ready) for _ in range(self.workers)]:
+                future.result()
+        except BaseException:
+            executor.shutdown(wait=False, cancel_futures=True)
+            raise
+        self._executor = executor
+        self._pool_error = None
+        print(f"✓ 轉換行程池已就緒: {self.workers} 個行程 "
+              f"(暖機 {time.perf_counter() - start:.2f} 秒)")
+
+    def close(self):
+        """關閉行程池"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+    # ---------- 狀態 ----------
+
+    @property
+    def pending(self) -> int:
+        """已接受但尚未完成的轉換請求數"""
+        return self._pending
+
+    @property
+    def queue_depth(self) -> int:
+        """等待空閒行程的請求數"""
+        return max(0, self._pending - self.workers)
+
+    @property
+    def healthy(self) -> bool:
+        return self._executor is not None and self._pool_error is None
+
+    def health(self) -> Dict:
+        """健康狀態 (/health)"""
+        return {
+            'status': 'ok' if self.healthy else 'unavailable',
+            'workers': self.workers,
+            'pending': self.pending,
+            'queue_depth': self.queue_depth,
+            'capacity': self.workers + self.max_queue,
+            'uptime_seconds': round(time.time() - self._started, 1),
+        }
+
+    def metrics_text(self) -> str:
+        """Prometheus 文字格式的指標 (/metrics)"""
+        with self._lock:
+            responses = dict(self._responses)
+            values = [
+                ('ppt_service_up', 'gauge', '行程池是否可用', int(self.healthy)),
+                ('ppt_service_workers', 'gauge', '轉換行程數', self.workers),
+                ('ppt_service_capacity', 'gauge', '可同時接受的請求數 (執行中 + 排隊)',
+                 self.workers + self.max_queue),
+                ('ppt_service_in_flight', 'gauge', '已接受但尚未完成的請求數', self._pending),
+                ('ppt_service_queue_depth', 'gauge', '等待空閒行程的請求數', self.queue_depth),
+                ('ppt_service_cache_hits_total', 'counter', '由快取直接回應的風格數',
+                 self._cache_hits),
+                ('ppt_service_conversion_seconds_count', 'counter', '完成的轉換請求數',
+                 self._conversions),
+                ('ppt_service_conversion_seconds_sum', 'counter', '轉換請求耗時總和 (秒)',
+                 round(self._conversion_seconds, 6)),
+            ]
+        lines = []
+        for name, kind, help_text, value in values:
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}", f"{name} {value}"]
+        lines += ['# HELP ppt_service_responses_total 依狀態碼統計的回應數',
+                  '# TYPE ppt_service_responses_total counter']
+        lines += [f'ppt_service_responses_total{{code="{code}"}} {count}'
+                  for code, count in sorted(responses.items())]
+        return '\n'.join(lines) + '\n'
+
+    # ---------- 請求處理 ----------
+
+    def __call__(self, environ, start_response):
+        try:
+            status, headers, body = self._route(environ)
+        except ServiceError as e:
+            status, headers, body = e.status, e.headers, _json_body({'error': str(e)})
+            headers = headers + [('Content-Type', 'application/json; charset=utf-8')]
+            self._discard_body(environ, headers)
+        except Exception as e:
+            status, headers = 500, [('Content-Type', 'application/json; charset=utf-8')]
+            body = _json_body({'error': str(e)})
+        with self._lock:
+            self._responses[status] = self._responses.get(status, 0) + 1
+        start_response(f"{status} {_STATUS_TEXT.get(status, '')}",
+                       headers + [('Content-Length', str(len(body)))])
+        return [body]
+
+    def _route(self, environ) -> Tuple[int, List[Tuple[str, str]], bytes]:
+        path = environ.get('PATH_INFO', '') or '/'
+        method = environ.get('REQUEST_METHOD', 'GET')
+        routes = {'/health': 'GET', '/metrics': 'GET', '/convert': 'POST'}
+        if path not in routes:
+            raise ServiceError(404, f"找不到路徑: {path}")
+        if method != routes[path]:
+            raise ServiceError(405, f"{path} 只接受 {routes[path]}", [('Allow', routes[path])])
+
+        if path == '/health':
+            return (200 if self.healthy else 503,
+                    [('Content-Type', 'application/json; charset=utf-8')],
+                    _json_body(self.health()))
+        if path == '/metrics':
+            query = parse_qs(environ.get('QUERY_STRING', ''))
+            if query.get('format') == ['json']:
+                return 200, [('Content-Type', 'application/json; charset=utf-8')], \
+                    _json_body(self.health())
+            return 200, [('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')], \
+                self.metrics_text().encode('utf-8')
+        return self._handle_convert(environ)
+
+    def _parse_request(self, environ) -> Tuple[List[str], str, str]:
+        """檢查查詢參數，回傳 (風格列表, 引擎, 檔案名稱)"""
+        query = parse_qs(environ.get('QUERY_STRING', ''))
+        styles = [name.strip() for value in query.get('styles', []) + query.get('style', [])
+                  for name in value.split(',') if name.strip()]
+        if styles == ['all']:
+            styles = list(STYLE_PRESETS)
+        if not styles:
+            raise ServiceError(400, "請以 styles 參數指定風格 (逗號分隔，或 all)")
+        unknown = [name for name in styles if name not in STYLE_PRESETS]
+        if unknown:
+            raise ServiceError(400, f"未知風格: {', '.join(unknown)}")
+        styles = list(dict.fromkeys(styles))
+        engine = query.get('engine', [self.engine])[0]
+        if engine not in ENGINES:
+            raise ServiceError(400, f"未知引擎: {engine}")
+        name = Path(query.get('name', ['presentation.pptx'])[0]).name or 'presentation.pptx'
+        return styles, engine, name
+
+    def _discard_body(self, environ, headers: List[Tuple[str, str]]):
+        """提早回應錯誤時讀掉尚未讀取的上傳內容 (用戶端仍在傳送時直接回應會中斷連線)；
+        超過上限的上傳不讀取，改為要求關閉連線"""
+        if environ.get(_BODY_READ):
+            return
+        try:
+            remaining = int(environ.get('CONTENT_LENGTH') or 0)
+        except ValueError:
+            remaining = 0
+        if remaining > self.max_upload_bytes:
+            headers.append(('Connection', 'close'))
+            return
+        stream = environ['wsgi.input']
+        while remaining > 0:
+            chunk = stream.read(min(remaining, 64 * 1024))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+
+    def _read_body(self, environ) -> bytes:
+        """讀取上傳的簡報 (檢查大小與格式)"""
+        try:
+            length = int(environ.get('CONTENT_LENGTH') or -1)
+        except ValueError:
+            length = -1
+        if length < 0:
+            raise ServiceError(411, "缺少 Content-Length")
+        if length > self.max_upload_bytes:
+            raise ServiceError(413, f"檔案超過上限 {self.max_upload_bytes // (1024 * 1024)} MB")
+        data = environ['wsgi.input'].read(length)
+        environ[_BODY_READ] = True
+        if len(data) != length or not zipfile.is_zipfile(BytesIO(data)):
+            raise ServiceError(400, "上傳內容不是有效的 .pptx 檔案")
+        return data
+
+    def _release(self):
+        """釋放名額 (請求未送出轉換或轉換已結束)"""
+        with self._lock:
+            self._pending -= 1
+        self._slots.release()
+
+    def _finish(self, start: float):
+        """轉換結束 (成功、失敗或被取消) 時記錄耗時並釋放名額"""
+        with self._lock:
+            self._conversions += 1
+            self._conversion_seconds += time.perf_counter() - start
+        self._release()
+
+    def _handle_convert(self, environ) -> Tuple[int, List[Tuple[str, str]], bytes]:
+        styles, engine, name = self._parse_request(environ)
+        # 行程池重建失敗時仍接受請求: 提交前會再次嘗試重建
+        if self._executor is None:
+            raise ServiceError(503, "轉換行程池無法使用")
+        # 滿載時在讀取上傳內容之前就拒絕
+        if not self._slots.acquire(blocking=False):
+            raise ServiceError(429, "轉換佇列已滿，請稍後再試",
+                               [('Retry-After', str(self.retry_after))])
+        start = time.perf_counter()
+        with self._lock:
+            self._pending += 1
+        started, deferred = False, False
+        try:
+            data = self._read_body(environ)
+            probe = PPTStyleConverter.from_buffer(data, name=name, engine=engine,
+                                                  index_outputs=False, **self.options)
+            outputs = self._cached_outputs(probe, styles, engine)
+            missing = [style_name for style_name in styles if style_name not in outputs]
+            errors: Dict[str, str] = {}
+            if missing:
+                # 工作行程異常結束時重建行程池並重新提交一次 (再次失敗才回傳 503)
+                for attempt in range(2):
+                    executor, future = self._submit(data, name, missing, engine)
+                    started = True
+                    try:
+                        converted, errors = future.result(timeout=self.timeout)
+                        break
+                    except FutureTimeoutError:
+                        # 逾時的轉換仍在執行並佔用名額，完成後才釋放
+                        deferred = True
+                        future.add_done_callback(lambda _: self._finish(start))
+                        raise ServiceError(504, f"轉換超過 {self.timeout:.0f} 秒")
+                    except BrokenProcessPool:
+                        self._restart_pool(executor)
+                        if attempt:
+                            raise ServiceError(503, "轉換行程連續異常結束，請稍後再試")
+                        print("↻ 轉換行程異常結束，重新提交轉換")
+                self._store_outputs(probe, converted, engine)
+                outputs.update(converted)
+        finally:
+            if not deferred:
+                if started:
+                    self._finish(start)
+                else:
+                    self._release()
+        return self._response(probe, styles, outputs, errors)
+
+    def _submit(self, data: bytes, name: str, styles: List[str], engine: str
+                ) -> Tuple[ProcessPoolExecutor, Future]:
+        """將轉換交給行程池 (行程池已損壞或上次重建失敗時重建一次)
+
+        Returns:
+            (使用的行程池, 轉換的 Future)；行程池之後損壞時只重建這一個，不影響已重建的新行程池
+        """
+        for _ in range(2):
+            executor = self._executor
+            if executor is None:
+                break
+            if self._pool_error is not None:
+                self._restart_pool(executor)
+                continue
+            try:
+                return executor, executor.submit(_convert, data, name, styles, engine)
+            except BrokenProcessPool:
+                self._restart_pool(executor)
+        raise ServiceError(503, "轉換行程池無法使用")
+
+    def _restart_pool(self, broken: Optional[ProcessPoolExecutor]):
+        """工作行程異常結束 (例如記憶體不足) 後重建行程池
+
+        多個請求同時發現時只重建一次 (其他請求等待後使用新的行程池)。新的行程池啟動失敗時
+        保留損壞的行程池並記錄原因，下一個請求提交時再次嘗試重建。
+        """
+        with self._restart_lock:
+            if broken is None or self._executor is not broken:
+                return
+            if self._pool_error is None:
+                print("✗ 轉換行程異常結束，重建行程池")
+                broken.shutdown(wait=False, cancel_futures=True)
+            try:
+                self._start_pool()
+            except Exception as e:
+                self._pool_error = f"{type(e).__name__}: {e}"
+                print(f"✗ 重建行程池失敗 ({self._pool_error})，下一個請求會再次嘗試")
+
+    def _cached_outputs(self, probe: PPTStyleConverter, styles: List[str],
+                        engine: str) -> Dict[str, bytes]:
+        """從快取取得已轉換過的風格"""
+        if self.cache is None:
+            return {}
+        outputs = {}
+        for style_name in styles:
+            data = self.cache.get_bytes(probe._cache_key(STYLE_PRESETS[style_name], engine))
+            if data is not None:
+                outputs[style_name] = data
+        with self._lock:
+            self._cache_hits += len(outputs)
+        return outputs
+
+    def _store_outputs(self, probe: PPTStyleConverter, outputs: Dict[str, bytes], engine: str):
+        """將工作行程的結果寫入快取 (快取只由主行程寫入)"""
+        if self.cache is None:
+            return
+        for style_name, data in outputs.items():
+            self.cache.put_bytes(probe._cache_key(STYLE_PRESETS[style_name], engine), data)
+
+    def _response(self, probe: PPTStyleConverter, styles: List[str],
+                  outputs: Dict[str, bytes], errors: Dict[str, str]
+                  ) -> Tuple[int, List[Tuple[str, str]], bytes]:
+        """單一風格回傳 .pptx；多種風格回傳 zip (依請求順序)"""
+        if not outputs:
+            raise ServiceError(500, '; '.join(f"{style_name}: {error}"
+                                              for style_name, error in errors.items())
+                               or "轉換失敗")
+        headers = []
+        if errors:
+            headers.append(('X-Failed-Styles', ','.join(errors)))
+        if len(styles) == 1:
+            style_name = styles[0]
+            return 200, headers + [
+                ('Content-Type', PPTX_CONTENT_TYPE),
+                ('Content-Disposition', _attachment(probe.output_name(style_name))),
+            ], outputs[style_name]
+
+        bundle = BytesIO()
+        with zipfile.ZipFile(bundle, 'w', compression=zipfile.ZIP_STORED) as zf:
+            for style_name in styles:
+                if style_name in outputs:
+                    zf.writestr(probe.output_name(style_name), outputs[style_name])
+            if errors:
+                zf.writestr('errors.json', json.dumps(errors, ensure_ascii=False, indent=2))
+        return 200, headers + [
+            ('Content-Type', 'application/zip'),
+            ('Content-Disposition', _attachment(f"{Path(probe.input_file).stem}_styles.zip")),
+        ], bundle.getvalue()
+
+
+def _json_body(payload: Dict) -> bytes:
+    return json.dumps(payload, ensure_ascii=False).encode('utf-8')
+
+
+def _attachment(filename: str) -> str:
+    """Content-Disposition 標頭 (檔名可能含中文，以 RFC 5987 編碼)"""
+    fallback = filename.encode('ascii', 'replace').decode('ascii').replace('"', '')
+    return f"attachment; filename=\"{fallback}\"; filename*=UTF-8''{quote(filename)}"
+
+
+def create_app(workers: int = DEFAULT_WORKERS, max_queue: int = DEFAULT_MAX_QUEUE,
+               engine: str = DEFAULT_ENGINE, cache_dir: str = None, **kwargs
+               ) -> ConversionService:
+    """建立轉換服務 (gunicorn 的應用程式工廠)
+
+    Args:
+        workers: 轉換行程數
+        max_queue: 最多排隊的請求數
+        engine: 預設轉換引擎
+        cache_dir: 轉換結果快取目錄 (None 表示不使用快取)
+        **kwargs: 其他 ConversionService 參數
+    """
+    cache = ConversionCache(cache_dir) if cache_dir else None
+    return ConversionService(workers=workers, max_queue=max_queue, engine=engine,
+                             cache=cache, **kwargs)
+
+
+class ThreadingWSGIServer(ThreadingMixIn, WSGIServer):
+    """每個連線一個執行緒 (等待轉換時不阻塞 /health 與 /metrics)"""
+    daemon_threads = True
+
+
+def main():
+    """命令行介面"""
+    parser = argparse.ArgumentParser(description='PPT 風格轉換 HTTP 服務')
+    parser.add_argument('--host', default='127.0.0.1', help='監聽位址 (預設 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=8000, help='監聽埠 (預設 8000)')
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS,
+                        help=f'轉換行程數 (預設 {DEFAULT_WORKERS})')
+    parser.add_argument('--max-queue', type=int, default=DEFAULT_MAX_QUEUE,
+                        help=f'所有行程忙碌時最多排隊的請求數 (預設 {DEFAULT_MAX_QUEUE})')
+    parser.add_argument('--engine', choices=ENGINES, default=DEFAULT_ENGINE,
+                        help=f'預設轉換引擎 (預設 {DEFAULT_ENGINE})')
+    parser.add_argument('--cache-dir', help='啟用轉換快取並指定快取目錄')
+    parser.add_argument('--timeout', type=float, default=DEFAULT_TIMEOUT,
+                        help=f'單一請求等待轉換的秒數 (預設 {DEFAULT_TIMEOUT:.0f})')
+    parser.add_argument('--max-upload-mb', type=int,
+                        default=DEFAULT_MAX_UPLOAD_BYTES // (1024 * 1024),
+                        help='上傳檔案大小上限 (MB)')
+    parser.add_argument('--optimize-media', action='store_true',
+                        help='縮小解析度超過顯示尺寸所需的圖片並合併重複圖片')
+    args = parser.parse_args()
+
+    app = create_app(workers=args.workers, max_queue=args.max_queue, engine=args.engine,
+                     cache_dir=args.cache_dir, timeout=args.timeout,
+                     max_upload_bytes=args.max_upload_mb * 1024 * 1024,
+                     optimize_media=args.optimize_media)
+    server = make_server(args.host, args.port, app, server_class=ThreadingWSGIServer)
+    print(f"🚀 轉換服務: http://{args.host}:{args.port} "
+          f"(行程 {args.workers} 個，排隊上限 {args.max_queue})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n停止服務")
+    finally:
+        server.server_close()
+        app.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,466 @@
+# PPT 轉換快取 (Conversion Cache)
+# 以「輸入檔案內容雜湊 + 風格指紋 + 引擎版本」為鍵，重複轉換同一份簡報時直接取用先前的結果；
+# 輸出目錄另有索引 (OutputStore)，記錄每個輸出檔案並依大小/保留天數淘汰最久未使用的檔案
+
+"""
+使用方法:
+    from ppt_store import ConversionCache
+
+    cache = ConversionCache('./redesigned_ppts/.cache', max_bytes=500 * 1024 * 1024)
+    converter = PPTStyleConverter('input.pptx', cache=cache)
+
+    store = OutputStore('./redesigned_ppts', max_bytes=2 * 1024 ** 3, max_age_days=30)
+    converter = PPTStyleConverter('input.pptx', store=store)
+    for entry in store.entries(limit=20):   # 讀取索引，不掃描目錄
+        print(entry['file'], entry['style'], entry['size'])
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from ppt_incremental import sidecar_path
+
+DEFAULT_CACHE_DIR = './redesigned_ppts/.cache'
+DEFAULT_MAX_ENTRIES = 200
+DEFAULT_MAX_BYTES = 1024 * 1024 * 1024  # 1 GB
+DEFAULT_OUTPUT_DIR = './redesigned_ppts'
+DEFAULT_OUTPUT_MAX_BYTES = None  # 輸出目錄預設不限制大小 (淘汰需明確啟用)
+
+
+def make_key(*parts: str) -> str:
+    """將多個字串組合為快取鍵 (SHA-256)"""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part.encode('utf-8'))
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+def copy_replace(src: Path, dst: Path):
+    """複製檔案到暫存名稱後再替換目的地
+
+    不使用硬連結: 快取項目與輸出檔案若共用同一個 inode，之後就地修改輸出會一併改壞快取。
+    目的地已存在 (例如同一秒內的兩次轉換產生相同檔名) 或與來源是同一個檔案時也能正確完成。
+    """
+    dst = Path(dst)
+    tmp = dst.with_name(f".{dst.name}.{os.getpid()}-{threading.get_ident()}.tmp")
+    try:
+        shutil.copyfile(src, tmp)
+        os.replace(tmp, dst)
+    finally:
+        tmp.unlink(missing_ok=True)
+
+
+class ConversionCache:
+    """內容定址的轉換結果快取 (LRU 淘汰)
+
+    每個項目是快取目錄中的一個 <鍵>.pptx 檔案；index.json 依最近使用順序記錄
+    各項目的大小與最後使用時間。
+    """
+
+    INDEX_NAME = 'index.json'
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR,
+                 max_entries: int = DEFAULT_MAX_ENTRIES,
+                 max_bytes: int = DEFAULT_MAX_BYTES):
+        """初始化快取
+
+        Args:
+            cache_dir: 快取目錄
+            max_entries: 最多保留的項目數
+            max_bytes: 快取檔案總大小上限 (位元組)
+        """
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries: 'OrderedDict[str, Dict]' = self._load_index()
+
+    def _index_path(self) -> Path:
+        return self.cache_dir / self.INDEX_NAME
+
+    def _entry_path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.pptx"
+
+    def _load_index(self) -> 'OrderedDict[str, Dict]':
+        """讀取索引 (最久未使用的項目在前)"""
+        try:
+            data = json.loads(self._index_path().read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            return OrderedDict()
+        entries = sorted(data.items(), key=lambda item: item[1]['last_access'])
+        return OrderedDict(entries)
+
+    def _save_index(self):
+        """以暫存檔加替換的方式寫入索引，避免中斷時留下不完整的檔案"""
+        tmp_path = self._index_path().with_suffix('.tmp')
+        tmp_path.write_text(json.dumps(self._entries), encoding='utf-8')
+        os.replace(tmp_path, self._index_path())
+
+    @property
+    def total_bytes(self) -> int:
+        """目前快取檔案總大小"""
+        return sum(entry['size'] for entry in self._entries.values())
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[Path]:
+        """查詢快取
+
+        Args:
+            key: 快取鍵
+
+        Returns:
+            快取檔案路徑；未命中時回傳 None
+        """
+        with self._lock:
+            if key not in self._entries:
+                return None
+            path = self._entry_path(key)
+            if not path.exists():
+                # 檔案被外部刪除，移除失效的索引項目
+                del self._entries[key]
+                self._save_index()
+                return None
+            self._entries[key]['last_access'] = time.time()
+            self._entries.move_to_end(key)
+            self._save_index()
+            return path
+
+    def get_bytes(self, key: str) -> Optional[bytes]:
+        """查詢快取並讀取內容
+
+        Args:
+            key: 快取鍵
+
+        Returns:
+            快取檔案內容；未命中時回傳 None
+        """
+        path = self.get(key)
+        if path is None:
+            return None
+        try:
+            return path.read_bytes()
+        except OSError:
+            return None
+
+    def put(self, key: str, source_file: str) -> Path:
+        """將轉換結果加入快取
+
+        Args:
+            key: 快取鍵
+            source_file: 轉換完成的檔案路徑
+
+        Returns:
+            快取檔案路徑
+        """
+        with self._lock:
+            path = self._entry_path(key)
+            copy_replace(Path(source_file), path)
+            self._entries[key] = {'size': path.stat().st_size, 'last_access': time.time()}
+            self._entries.move_to_end(key)
+            self._evict()
+            self._save_index()
+            return path
+
+    def put_bytes(self, key: str, data: bytes) -> Path:
+        """將記憶體中的轉換結果加入快取
+
+        Args:
+            key: 快取鍵
+            data: 轉換完成的檔案內容
+
+        Returns:
+            快取檔案路徑
+        """
+        with self._lock:
+            path = self._entry_path(key)
+            tmp_path = path.with_suffix('.tmp')
+            tmp_path.write_bytes(data)
+            os.replace(tmp_path, path)
+            self._entries[key] = {'size': len(data), 'last_access': time.time()}
+            self._entries.move_to_end(key)
+            self._evict()
+            self._save_index()
+            return path
+
+    def _evict(self):
+        """依 LRU 順序淘汰項目，直到符合數量與大小限制"""
+        total = self.total_bytes
+        while self._entries and (len(self._entries) > self.max_entries
+                                 or total > self.max_bytes):
+            key, entry = self._entries.popitem(last=False)
+            total -= entry['size']
+            self._entry_path(key).unlink(missing_ok=True)
+
+    def clear(self):
+        """清除所有快取項目"""
+        with self._lock:
+            for key in list(self._entries):
+                self._entry_path(key).unlink(missing_ok=True)
+            self._entries.clear()
+            self._save_index()
+
+
+class OutputStore:
+    """輸出目錄索引 (依大小與保留天數淘汰最久未使用的輸出)
+
+    索引是輸出目錄中的 .index.jsonl，每行一筆操作 (新增 / 使用 / 刪除)，
+    新增輸出只需附加一行；讀取時依序重播，其他行程附加的內容以檔案位移增量讀取。
+    過期的行數過多時重寫為只含現存項目的版本。
+
+    同一個輸出目錄的索引應只由一個行程寫入 (批次轉換由主行程代替工作行程記錄)。
+    """
+
+    INDEX_NAME = '.index.jsonl'
+    COMPACT_MIN_LINES = 1000
+
+    def __init__(self, root: str = DEFAULT_OUTPUT_DIR,
+                 max_bytes: Optional[int] = DEFAULT_OUTPUT_MAX_BYTES,
+                 max_age_days: Optional[float] = None):
+        """初始化輸出索引
+
+        Args:
+            root: 輸出目錄 (索引中的檔案以相對於此目錄的路徑記錄)
+            max_bytes: 輸出檔案總大小上限 (None 表示不限制)
+            max_age_days: 超過此天數未使用的輸出會被刪除 (None 表示不限制)
+        """
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.max_age_days = max_age_days
+        self._lock = threading.Lock()
+        self._entries: 'OrderedDict[str, Dict]' = OrderedDict()
+        self._lines = 0
+        self._offset = 0
+        self._inode = None
+        with self._lock:
+            if not self._index_path().exists():
+                self._rebuild()
+            self._refresh()
+
+    def _index_path(self) -> Path:
+        return self.root / self.INDEX_NAME
+
+    def _relative(self, output) -> str:
+        """輸出檔案在索引中的名稱 (輸出目錄外的檔案使用絕對路徑)"""
+        path = Path(output).resolve()
+        try:
+            return path.relative_to(self.root.resolve()).as_posix()
+        except ValueError:
+            return str(path)
+
+    def path(self, name: str) -> Path:
+        """索引中的檔案名稱對應的路徑"""
+        return self.root / name
+
+    # ---------- 索引讀寫 ----------
+
+    def _rebuild(self):
+        """索引不存在時掃描一次既有的輸出檔案 (從舊版輸出目錄遷移)"""
+        if not self.root.exists():
+            return
+        entries = []
+        for path in self.root.rglob('*.pptx'):
+            if any(part.startswith('.') for part in path.relative_to(self.root).parts):
+                continue  # 略過轉換快取等隱藏目錄
+            stat = path.stat()
+            entries.append({'op': 'put', 'file': path.relative_to(self.root).as_posix(),
+                            'source': None, 'source_hash': None, 'style': None,
+                            'engine': None, 'size': stat.st_size, 'seconds': None,
+                            'created': stat.st_mtime, 'last_access': stat.st_mtime})
+        entries.sort(key=lambda entry: entry['last_access'])
+        self._write_index(entries)
+
+    def _write_index(self, records: Iterable[Dict]):
+        """以暫存檔加替換的方式重寫索引"""
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp_path = self._index_path().with_suffix('.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            for record in records:
+                f.write(json.dumps(record, ensure_ascii=False) + '\n')
+        os.replace(tmp_path, self._index_path())
+
+    def _refresh(self):
+        """讀取索引中新附加的行 (索引被重寫時重新讀取全部)"""
+        try:
+            stat = self._index_path().stat()
+        except OSError:
+            self._entries.clear()
+            self._lines = self._offset = 0
+            self._inode = None
+            return
+        if stat.st_ino != self._inode or stat.st_size < self._offset:
+            self._entries.clear()
+            self._lines = self._offset = 0
+            self._inode = stat.st_ino
+        if stat.st_size == self._offset:
+            return
+        with open(self._index_path(), 'rb') as f:
+            f.seek(self._offset)
+            data = f.read()
+        # 只處理完整的行 (另一個行程可能正在寫入最後一行)
+        complete = data[:data.rfind(b'\n') + 1]
+        self._offset += len(complete)
+        for line in complete.splitlines():
+            try:
+                self._apply(json.loads(line))
+            except (ValueError, KeyError):
+                continue
+            self._lines += 1
+
+    def _apply(self, record: Dict):
+        """重播一筆索引操作"""
+        name = record['file']
+        if record['op'] == 'put':
+            entry = {key: value for key, value in record.items() if key != 'op'}
+            self._entries.pop(name, None)
+            self._entries[name] = entry
+        elif record['op'] == 'touch':
+            if name in self._entries:
+                self._entries[name]['last_access'] = record['last_access']
+                self._entries.move_to_end(name)
+        elif record['op'] == 'del':
+            self._entries.pop(name, None)
+
+    def _append(self, records: List[Dict]):
+        """附加索引操作並套用到記憶體中的索引"""
+        self._refresh()
+        self.root.mkdir(parents=True, exist_ok=True)
+        with open(self._index_path(), 'a', encoding='utf-8') as f:
+            f.write(''.join(json.dumps(record, ensure_ascii=False) + '\n'
+                            for record in records))
+        self._refresh()
+        if self._lines > max(self.COMPACT_MIN_LINES, 2 * len(self._entries)):
+            self._compact()
+
+    def _compact(self):
+        """重寫索引，只保留現存項目 (依最近使用順序)"""
+        self._write_index({'op': 'put', **entry} for entry in self._entries.values())
+        self._inode = None
+        self._refresh()
+
+    # ---------- 查詢 ----------
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._refresh()
+            return len(self._entries)
+
+    @property
+    def total_bytes(self) -> int:
+        """索引中輸出檔案的總大小"""
+        with self._lock:
+            self._refresh()
+            return sum(entry['size'] for entry in self._entries.values())
+
+    @property
+    def version(self) -> Tuple:
+        """索引的版本 (索引有任何變動時改變，可作為由索引衍生資料的快取鍵)"""
+        with self._lock:
+            self._refresh()
+            return self._inode, self._offset
+
+    def entries(self, limit: Optional[int] = None) -> List[Dict]:
+        """索引中的輸出 (最新建立的在前)
+
+        Args:
+            limit: 最多回傳的項目數 (None 表示全部)
+
+        Returns:
+            項目列表，每項包含 file、source、source_hash、style、engine、size、seconds、
+            created 與 last_access
+        """
+        with self._lock:
+            self._refresh()
+            entries = sorted(self._entries.values(), key=lambda entry: entry['created'],
+                             reverse=True)
+        return [dict(entry) for entry in entries[:limit]]
+
+    # ---------- 更新 ----------
+
+    def record(self, output, source_name: Optional[str] = None,
+               source_hash: Optional[str] = None, style: Optional[str] = None,
+               engine: Optional[str] = None, seconds: Optional[float] = None,
+               keep: Iterable = ()) -> List[str]:
+        """記錄新的輸出檔案並淘汰超出限制的舊輸出
+
+        Args:
+            output: 輸出檔案路徑
+            source_name: 原始檔案名稱
+            source_hash: 原始檔案內容雜湊
+            style: 風格名稱
+            engine: 轉換引擎
+            seconds: 轉換耗時
+            keep: 不可淘汰的其他輸出檔案路徑 (例如同一次執行中已寫入的輸出)
+
+        Returns:
+            被淘汰 (已刪除) 的檔案名稱
+        """
+        now = time.time()
+        name = self._relative(output)
+        entry = {'op': 'put', 'file': name,
+                 'source': Path(source_name).name if source_name else None,
+                 'source_hash': source_hash, 'style': style, 'engine': engine,
+                 'size': Path(output).stat().st_size,
+                 'seconds': round(seconds, 4) if seconds is not None else None,
+                 'created': now, 'last_access': now}
+        with self._lock:
+            self._append([entry])
+            return self._evict(keep={name, *(self._relative(path) for path in keep)})
+
+    def touch(self, output):
+        """標記輸出檔案被使用 (例如做為增量轉換的基礎)，延後淘汰"""
+        name = self._relative(output)
+        with self._lock:
+            self._refresh()
+            if name in self._entries:
+                self._append([{'op': 'touch', 'file': name, 'last_access': time.time()}])
+
+    def remove(self, output):
+        """刪除輸出檔案 (含增量轉換記錄檔) 並從索引移除"""
+        with self._lock:
+            self._refresh()
+            self._remove([self._relative(output)])
+
+    def evict(self) -> List[str]:
+        """依目前的限制淘汰輸出，回傳被刪除的檔案名稱"""
+        with self._lock:
+            self._refresh()
+            return self._evict()
+
+    def _remove(self, names: List[str]):
+        for name in names:
+            self.path(name).unlink(missing_ok=True)
+            sidecar_path(self.path(name)).unlink(missing_ok=True)
+        if names:
+            self._append([{'op': 'del', 'file': name} for name in names])
+
+    def _evict(self, keep: Iterable[str] = ()) -> List[str]:
+        """依 LRU 順序淘汰超過保留天數或總大小上限的輸出 (keep 中的檔案不淘汰)"""
+        keep = set(keep)
+        evicted = {}  # 依淘汰順序保存檔案名稱
+        if self.max_age_days is not None:
+            cutoff = time.time() - self.max_age_days * 86400
+            evicted.update((name, None) for name, entry in self._entries.items()
+                           if entry['last_access'] < cutoff and name not in keep)
+        if self.max_bytes is not None:
+            total = sum(entry['size'] for name, entry in self._entries.items()
+                        if name not in evicted)
+            for name, entry in self._entries.items():
+                if total <= self.max_bytes:
+                    break
+                if name in keep or name in evicted:
+                    continue
+                evicted[name] = None
+                total -= entry['size']
+        self._remove(list(evicted))
+        return list(evicted)
@@ -0,0 +1,112 @@
+# PPT 串流轉換 (Streaming Restyling)
+# 不建立 Presentation: 只讀取 .rels 與 presentation.xml 規劃部件關係，之後依 zip 順序
+# 逐一讀取投影片部件、套用風格並立即寫入輸出，記憶體中同時只保留一張投影片的 XML
+
+"""
+使用方法:
+    converter = PPTStyleConverter('training_deck.pptx', streaming=True)
+    converter.redesign_with_style('modern')   # 記憶體峰值與投影片數無關
+
+    # 直接使用
+    with zipfile.ZipFile('input.pptx') as zin:
+        plan = plan_stream(zin)
+        print(len(plan.slides), plan.charts)
+"""
+
+import posixpath
+import zipfile
+from typing import Dict, List, NamedTuple, Tuple
+
+from lxml import etree
+from pptx.opc.constants import RELATIONSHIP_TYPE as RT
+from pptx.oxml.ns import qn
+
+from ppt_package_writer import _rels_member
+
+_PACKAGE_RELS = '_rels/.rels'
+
+
+class StreamPlan(NamedTuple):
+    """串流轉換前由關聯檔規劃出的部件關係"""
+    slides: List[str]                     # 投影片部件名稱 (依簡報中的順序)
+    charts: Dict[str, Dict[str, str]]     # {投影片部件名稱: {關聯 ID: 圖表部件名稱}}
+    masters: List[str]                    # 母片部件名稱
+    layouts: List[str]                    # 母片使用的版面配置部件名稱
+    themes: List[str]                     # 母片使用的佈景主題部件名稱
+
+    def chart_owners(self) -> Dict[str, int]:
+        """{圖表部件名稱: 連結該圖表的投影片數}"""
+        owners: Dict[str, int] = {}
+        for charts in self.charts.values():
+            for chart in set(charts.values()):
+                owners[chart] = owners.get(chart, 0) + 1
+        return owners
+
+
+def read_relationships(zin: zipfile.ZipFile, partname: str) -> Dict[str, Tuple[str, str]]:
+    """讀取部件的內部關聯
+
+    Args:
+        zin: 來源 zip
+        partname: 部件名稱 (例如 '/ppt/slides/slide1.xml')；'/' 表示套件本身
+
+    Returns:
+        {關聯 ID: (關聯類型, 目標部件名稱)}；沒有關聯檔時回傳空字典
+    """
+    member = _PACKAGE_RELS if partname == '/' else _rels_member(partname)
+    try:
+        rels = etree.fromstring(zin.read(member))
+    except KeyError:
+        return {}
+    base = posixpath.dirname(partname)
+    return {
+        rel.get('Id'): (rel.get('Type'),
+                        posixpath.normpath(posixpath.join(base, rel.get('Target'))))
+        for rel in rels if rel.get('TargetMode') != 'External'
+    }
+
+
+def _targets(rels: Dict[str, Tuple[str, str]], reltype: str) -> List[str]:
+    """關聯中指定類型的目標部件 (依關聯檔順序，不重複)"""
+    targets = []
+    for rel_type, target in rels.values():
+        if rel_type == reltype and target not in targets:
+            targets.append(target)
+    return targets
+
+
+def plan_stream(zin: zipfile.ZipFile) -> StreamPlan:
+    """由 presentation.xml 與各部件的關聯檔規劃串流轉換
+
+    Args:
+        zin: 來源 zip
+
+    Returns:
+        部件關係；找不到主文件時引發 KeyError
+    """
+    presentation = _targets(read_relationships(zin, '/'), RT.OFFICE_DOCUMENT)[0]
+    presentation_rels = read_relationships(zin, presentation)
+
+    # 投影片順序以 p:sldIdLst 為準 (與 prs.slides 相同)
+    root = etree.fromstring(zin.read(presentation.lstrip('/')))
+    slides = []
+    sld_id_lst = root.find(qn('p:sldIdLst'))
+    for sld_id in (sld_id_lst if sld_id_lst is not None else ()):
+        rel = presentation_rels.get(sld_id.get(qn('r:id')))
+        if rel is not None and rel[0] == RT.SLIDE:
+            slides.append(rel[1])
+
+    charts = {}
+    for slide in slides:
+        slide_charts = {r_id: target for r_id, (rel_type, target)
+                        in read_relationships(zin, slide).items() if rel_type == RT.CHART}
+        if slide_charts:
+            charts[slide] = slide_charts
+
+    masters = _targets(presentation_rels, RT.SLIDE_MASTER)
+    layouts, themes = [], []
+    for master in masters:
+        master_rels = read_relationships(zin, master)
+        layouts.extend(_targets(master_rels, RT.SLIDE_LAYOUT))
+        themes.extend(_targets(master_rels, RT.THEME))
+    return StreamPlan(slides, charts, masters, layouts, themes)
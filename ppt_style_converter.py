@@ -12,275 +12,1222 @@
 
 import os
 import sys
+import copy
+import time
+import hashlib
+import zipfile
+from io import BytesIO
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from pptx import Presentation
-from pptx.util import Inches, Pt
+from pptx.util import Inches
 from pptx.enum.text import PP_ALIGN
-from pptx.dml.color import RGBColor
 from pptx.enum.shapes import MSO_SHAPE
+from pptx.oxml.ns import nsmap, qn
+from pptx.opc.constants import RELATIONSHIP_TYPE as RT
+from pptx.opc.oxml import serialize_part_xml
+from pptx.oxml import parse_xml
+from pptx.parts.chart import ChartPart
+from pptx.shapes.shapetree import SlideShapeFactory
+from pptx.slide import Slide
+from pptx.text.text import TextFrame
+from lxml import etree
 import argparse
-from typing import List, Dict, Tuple
-from dataclasses import dataclass
+from typing import Callable, Generator, Iterator, List, Dict, Optional, Tuple
 from datetime import datetime
+from functools import partial
 
+from ppt_fanout import FanoutIndex, rule_layout
+from ppt_events import (ConversionEvent, EVENT_STYLE_STARTED, EVENT_SLIDE_STARTED,
+                        EVENT_SLIDE_FINISHED, EVENT_WARNING, EVENT_OUTPUT_READY)
+from ppt_media import DEFAULT_MEDIA_DPI, optimize_media
+from ppt_incremental import (chart_partnames, find_previous, member_hashes, plan_incremental,
+                             save_incremental, write_sidecar)
+from ppt_metrics import ConversionMetrics, trace_peak_memory
+from ppt_package_writer import copy_raw_member, save_passthrough
+from ppt_style_program import (ChartResolver, StyleProgram, StyleRule, compile_style,
+                               style_fingerprint, visit_shapes, TAG_SP)
+from ppt_streaming import plan_stream
+from ppt_styles import StylePreset, STYLE_PRESETS
+from ppt_store import (ConversionCache, OutputStore, make_key, copy_replace,
+                       DEFAULT_MAX_BYTES, DEFAULT_MAX_ENTRIES)
 
-@dataclass
-class StylePreset:
-    """設計風格預設配置"""
-    name: str
-    description: str
-    # 色彩方案
-    primary_color: Tuple[int, int, int]      # RGB
-    secondary_color: Tuple[int, int, int]
-    accent_color: Tuple[int, int, int]
-    background_color: Tuple[int, int, int]
-    text_color: Tuple[int, int, int]
-    
-    # 字體設定
-    title_font: str
-    body_font: str
-    title_size: int
-    body_size: int
-    
-    # 其他設定
-    use_background_image: bool
-    gradient_style: str  # 'none', 'horizontal', 'vertical'
-    shadow_enabled: bool
-
-
-# ==================== 風格預設 ====================
-STYLE_PRESETS = {
-    # 1. 現代科技風 (Modern Tech)
-    'modern': StylePreset(
-        name='Modern Tech',
-        description='深藍色主題，簡潔現代感',
-        primary_color=(30, 90, 160),        # 深藍
-        secondary_color=(70, 130, 200),    # 淺藍
-        accent_color=(0, 210, 200),        # 青綠
-        background_color=(245, 245, 245),  # 淺灰
-        text_color=(30, 30, 30),           # 深灰
-        title_font='Arial',
-        body_font='Arial',
-        title_size=44,
-        body_size=18,
-        use_background_image=False,
-        gradient_style='horizontal',
-        shadow_enabled=True,
-    ),
-    
-    # 2. 極簡風格 (Minimal Clean)
-    'minimal': StylePreset(
-        name='Minimal Clean',
-        description='黑白灰色系，極簡設計',
-        primary_color=(0, 0, 0),            # 黑
-        secondary_color=(100, 100, 100),   # 灰
-        accent_color=(255, 100, 0),        # 橙色點綴
-        background_color=(255, 255, 255),  # 白
-        text_color=(50, 50, 50),           # 深灰
-        title_font='Arial',
-        body_font='Arial',
-        title_size=48,
-        body_size=16,
-        use_background_image=False,
-        gradient_style='none',
-        shadow_enabled=False,
-    ),
-    
-    # 3. 企業正式風 (Corporate Professional)
-    'corporate': StylePreset(
-        name='Corporate Professional',
-        description='深紅色主題，專業正式感',
-        primary_color=(200, 40, 40),       # 深紅
-        secondary_color=(240, 100, 100),  # 淺紅
-        accent_color=(200, 150, 50),      # 金色
-        background_color=(250, 250, 250), # 淺灰白
-        text_color=(40, 40, 40),          # 深灰
-        title_font='Calibri',
-        body_font='Calibri',
-        title_size=42,
-        body_size=18,
-        use_background_image=False,
-        gradient_style='vertical',
-        shadow_enabled=True,
-    ),
-    
-    # 4. 創意藝術風 (Creative Artistic)
-    'creative': StylePreset(
-        name='Creative Artistic',
-        description='紫色漸變，創意設計感',
-        primary_color=(150, 80, 200),      # 紫色
-        secondary_color=(100, 150, 255),  # 藍紫
-        accent_color=(255, 200, 100),     # 溫暖黃
-        background_color=(240, 235, 250), # 淺紫灰
-        text_color=(60, 30, 80),          # 深紫灰
-        title_font='Arial',
-        body_font='Arial',
-        title_size=44,
-        body_size=18,
-        use_background_image=False,
-        gradient_style='horizontal',
-        shadow_enabled=True,
-    ),
-    
-    # 5. 清爽自然風 (Fresh Natural)
-    'natural': StylePreset(
-        name='Fresh Natural',
-        description='綠色系主題，清爽自然',
-        primary_color=(50, 140, 80),       # 深綠
-        secondary_color=(100, 180, 120),  # 淺綠
-        accent_color=(240, 150, 50),      # 溫暖橙
-        background_color=(245, 250, 245), # 淺綠灰
-        text_color=(30, 60, 30),          # 深綠灰
-        title_font='Arial',
-        body_font='Arial',
-        title_size=42,
-        body_size=18,
-        use_background_image=False,
-        gradient_style='vertical',
-        shadow_enabled=False,
-    ),
-}
+
+# ==================== 轉換引擎 ====================
+# 'proxy': 透過 python-pptx 物件逐一設定 (參考實作)
+# 'lxml':  直接以預先編譯的 XPath 操作 a:r/a:rPr 元素，輸出與 'proxy' 完全相同
+# 'theme': 只改寫佈景主題與母片/版面配置，投影片僅移除明確覆寫的格式以繼承風格
+# 'fanout': 每份簡報只分析一次需要套用風格的元素，之後每種風格直接依位置寫入，輸出與 'lxml' 相同
+ENGINES = ('proxy', 'lxml', 'theme', 'fanout')
+DEFAULT_ENGINE = 'lxml'
+# 轉換輸出格式有變動時遞增，讓舊的快取結果失效
+ENGINE_VERSION = '3'
+
+_XPATH_NS = nsmap('a', 'p')
+_XP_RUNS = etree.XPath('./a:p/a:r', namespaces=_XPATH_NS)
+
+# 佈景主題色彩配置: (色彩槽, StylePreset 欄位)
+_THEME_COLOR_SLOTS = (
+    ('dk1', 'text_color'),
+    ('lt1', 'background_color'),
+    ('dk2', 'primary_color'),
+    ('lt2', 'secondary_color'),
+    ('accent1', 'primary_color'),
+    ('accent2', 'secondary_color'),
+    ('accent3', 'accent_color'),
+)
+_XP_CLR_SCHEME = etree.XPath('./a:themeElements/a:clrScheme', namespaces=_XPATH_NS)
+_XP_MAJOR_LATIN = etree.XPath('./a:themeElements/a:fontScheme/a:majorFont/a:latin',
+                              namespaces=_XPATH_NS)
+_XP_MINOR_LATIN = etree.XPath('./a:themeElements/a:fontScheme/a:minorFont/a:latin',
+                              namespaces=_XPATH_NS)
+_XP_TITLE_STYLE = etree.XPath('./p:txStyles/p:titleStyle', namespaces=_XPATH_NS)
+_XP_BODY_STYLE = etree.XPath('./p:txStyles/p:bodyStyle', namespaces=_XPATH_NS)
+# 明確覆寫字型、大小或顏色的文字屬性
+_XP_TEXT_OVERRIDES = etree.XPath(
+    './/*[self::a:rPr or self::a:defRPr or self::a:endParaRPr][@sz or a:latin or a:solidFill]',
+    namespaces=_XPATH_NS)
+
+
+def _chart_resolver(slide) -> Optional[ChartResolver]:
+    """以關聯 ID 取得投影片所連結的圖表部件根元素 (未連結簡報的投影片無法取得圖表)"""
+    if slide.part is None:
+        return None
+    
+    def resolve(r_id: str):
+        part = slide.part.related_part(r_id)
+        return part._element if isinstance(part, ChartPart) else None
+    return resolve
+
+
+def _file_hash(path: str, chunk_size: int = 1024 * 1024) -> str:
+    """分段計算檔案的 SHA-256 (不將整個檔案讀入記憶體)"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _as_program(style) -> StyleProgram:
+    """StylePreset 轉為已編譯 (並快取) 的 StyleProgram"""
+    return style if isinstance(style, StyleProgram) else compile_style(style)
+
+
+def _apply_text_rule(rPr, rule: StyleRule):
+    """將文字規則寫入 a:rPr (設定順序與 python-pptx 物件路徑相同)"""
+    if rule.color_hex is not None:
+        _set_solid_fill(rPr, rule.color_hex)
+    if rule.font is not None:
+        rPr.get_or_add_latin().set('typeface', rule.font)
+    if rule.size_sz is not None:
+        rPr.set('sz', rule.size_sz)
+    if rule.bold is not None:
+        rPr.set('b', '1' if rule.bold else '0')
+
+
+def _apply_shape_rule(shape_elm, rule: StyleRule):
+    """將形狀規則寫入外框與填滿 (只有 p:sp 會設定填滿)"""
+    spPr = shape_elm.spPr
+    if rule.line_hex is not None:
+        _set_solid_fill(spPr.get_or_add_ln(), rule.line_hex)
+    if rule.line_width is not None:
+        spPr.get_or_add_ln().set('w', str(rule.line_width))
+    if rule.fill_hex is not None and shape_elm.tag == TAG_SP:
+        _set_solid_fill(spPr, rule.fill_hex)
+
+
+def _hex_color(rgb: Tuple[int, int, int]) -> str:
+    """RGB 轉為 srgbClr 使用的十六進位字串 (與 str(RGBColor) 相同)"""
+    return '%02X%02X%02X' % rgb
+
+
+def _set_solid_fill(parent, hex_color: str):
+    """將 parent (rPr / spPr / ln / bgPr) 的填滿設為單色"""
+    parent.get_or_change_to_solidFill().get_or_change_to_srgbClr().set('val', hex_color)
+
+
+def _set_scheme_fill(parent, scheme_color: str):
+    """將 parent 的填滿設為佈景主題色彩 (例如 'tx1'、'bg1')"""
+    parent.get_or_change_to_solidFill().get_or_change_to_schemeClr().set('val', scheme_color)
+
+
+def _get_or_add_def_rpr(level_ppr):
+    """取得 a:lvlNpPr 下的 a:defRPr，不存在時依 schema 順序建立 (位於 a:extLst 之前)"""
+    def_rpr = level_ppr.find(qn('a:defRPr'))
+    if def_rpr is None:
+        def_rpr = etree.SubElement(level_ppr, qn('a:defRPr'))
+        ext_lst = level_ppr.find(qn('a:extLst'))
+        if ext_lst is not None:
+            ext_lst.addprevious(def_rpr)
+    return def_rpr
+
+
+def _restyle_theme_blob(blob: bytes, style: StylePreset) -> bytes:
+    """改寫佈景主題 XML 的色彩配置與主要/次要字型"""
+    theme = etree.fromstring(blob)
+    for clr_scheme in _XP_CLR_SCHEME(theme):
+        for slot, field in _THEME_COLOR_SLOTS:
+            slot_elm = clr_scheme.find(qn(f'a:{slot}'))
+            if slot_elm is None:
+                continue
+            for child in list(slot_elm):
+                slot_elm.remove(child)
+            etree.SubElement(slot_elm, qn('a:srgbClr'), val=_hex_color(getattr(style, field)))
+    for latin in _XP_MAJOR_LATIN(theme):
+        latin.set('typeface', style.title_font)
+    for latin in _XP_MINOR_LATIN(theme):
+        latin.set('typeface', style.body_font)
+    return etree.tostring(theme, xml_declaration=True, encoding='UTF-8', standalone=True)
+
+
+def _strip_text_overrides(root) -> int:
+    """移除 root 下明確指定的字型、大小、顏色與背景，讓它們改為繼承母片
+
+    Returns:
+        被清除覆寫的文字屬性 (a:rPr / a:defRPr / a:endParaRPr) 數
+    """
+    bg = root.cSld.bg
+    if bg is not None:
+        root.cSld.remove(bg)
+    overrides = _XP_TEXT_OVERRIDES(root)
+    for rpr in overrides:
+        rpr.attrib.pop('sz', None)
+        for child in rpr.findall(qn('a:latin')) + rpr.findall(qn('a:solidFill')):
+            rpr.remove(child)
+    return len(overrides)
+
+
+def _restyle_master(master_elm, style: StylePreset):
+    """母片背景改用 bg1，標題/正文樣式改用主題字型與色彩並設定字級"""
+    title_sz = str(style.title_size * 100)
+    body_sz = str(style.body_size * 100)
+    _set_scheme_fill(master_elm.cSld.get_or_add_bgPr(), 'bg1')
+    
+    for title_style in _XP_TITLE_STYLE(master_elm):
+        lvl1 = title_style.find(qn('a:lvl1pPr'))
+        if lvl1 is None:
+            lvl1 = etree.SubElement(title_style, qn('a:lvl1pPr'))
+            title_style.insert(0, lvl1)
+        def_rpr = _get_or_add_def_rpr(lvl1)
+        _set_scheme_fill(def_rpr, 'tx2')
+        def_rpr.get_or_add_latin().set('typeface', '+mj-lt')
+        def_rpr.set('sz', title_sz)
+        def_rpr.set('b', '1')
+    
+    for body_style in _XP_BODY_STYLE(master_elm):
+        for level in range(1, 10):
+            level_ppr = body_style.find(qn(f'a:lvl{level}pPr'))
+            if level_ppr is None:
+                continue
+            def_rpr = _get_or_add_def_rpr(level_ppr)
+            _set_scheme_fill(def_rpr, 'tx1')
+            def_rpr.get_or_add_latin().set('typeface', '+mn-lt')
+            def_rpr.set('sz', body_sz)
 
 
 class PPTStyleConverter:
     """PPT 風格轉換器"""
     
-    def __init__(self, input_file: str):
+    def __init__(self, input_file: str, source_bytes: bytes = None,
+                 engine: str = DEFAULT_ENGINE, passthrough: bool = True,
+                 cache: ConversionCache = None, profile: bool = False,
+                 on_metrics: Callable[[ConversionMetrics], None] = None,
+                 incremental: bool = True,
+                 on_progress: Callable[[str, int, int], None] = None,
+                 store: OutputStore = None, index_outputs: bool = True,
+                 streaming: bool = False, optimize_media: bool = False,
+                 media_dpi: int = DEFAULT_MEDIA_DPI, media_workers: int = 1,
+                 audit_contrast: bool = False, fix_contrast: bool = False):
         """初始化轉換器
         
         Args:
             input_file: 輸入 PPT 檔案路徑
+            source_bytes: 已讀入的檔案內容 (提供時不再讀取磁碟)
+            engine: 轉換引擎 ('proxy'、'lxml'、'theme' 或 'fanout')
+            passthrough: 儲存時直接複製未修改的 zip 項目 (不重新壓縮圖片與影片)
+            cache: 轉換結果快取 (None 表示不使用快取)
+            profile: 以 tracemalloc 記錄每次轉換的記憶體峰值 (會使轉換變慢)
+            on_metrics: 每次轉換完成後以 ConversionMetrics 呼叫的回呼函數
+            incremental: 輸出到目錄時重用上次輸出中內容未變的投影片 (需要 passthrough)
+            on_progress: 每處理完一張投影片以 (風格名稱, 已完成張數, 總張數) 呼叫的回呼函數
+            store: 輸出目錄索引 (None 表示在第一次寫入時以預設限制建立)
+            index_outputs: 是否將輸出記錄到輸出目錄索引並淘汰超出限制的舊輸出
+            streaming: 不載入整份簡報，逐張讀取投影片部件、套用風格並立即寫入輸出
+                (記憶體峰值與投影片數無關；fanout 引擎改用 lxml 路徑)
+            optimize_media: 輸出後縮小解析度超過顯示尺寸所需的圖片並合併重複圖片
+            media_dpi: 圖片在顯示尺寸下保留的解析度 (每吋像素)
+            media_workers: 縮小圖片使用的行程數
+            audit_contrast: 輸出後檢查文字與背景的 WCAG 對比，結果記錄於 metrics.contrast
+            fix_contrast: 檢查對比並將不足的文字色調整到符合 WCAG AA (包含 audit_contrast)
         """
+        if engine not in ENGINES:
+            raise ValueError(f"未知引擎: {engine}")
         self.input_file = input_file
+        self.engine = engine
+        self.passthrough = passthrough
+        self.cache = cache
+        self.profile = profile
+        self.on_metrics = on_metrics
+        self.incremental = incremental
+        self.on_progress = on_progress
+        self.store = store
+        self.index_outputs = index_outputs
+        self.streaming = streaming
+        self.optimize_media = optimize_media
+        self.media_dpi = media_dpi
+        self.media_workers = media_workers
+        self.audit_contrast = audit_contrast or fix_contrast
+        self.fix_contrast = fix_contrast
+        self._slide_warnings: Optional[List[str]] = None
         self.output_dir = Path('./redesigned_ppts')
-        self.output_dir.mkdir(exist_ok=True)
+        self.last_batch_report: List[Dict] = []
+        self.last_metrics: Optional[ConversionMetrics] = None
+        self._written_outputs: List[str] = []  # 本轉換器寫入的輸出 (淘汰時保留)
         
-        try:
-            self.prs = Presentation(input_file)
-            print(f"✓ 成功加載 PPT: {input_file}")
-            print(f"  - 投影片數: {len(self.prs.slides)}")
-            print(f"  - 幻燈片尺寸: {self.prs.slide_width} x {self.prs.slide_height}")
-        except Exception as e:
-            print(f"✗ 無法加載 PPT: {e}")
-            raise
+        # 只讀取一次；解析延後到第一次需要轉換時 (快取命中時完全不解析)。
+        # 串流模式只分段計算雜湊，轉換時直接從磁碟讀取 zip 項目
+        if source_bytes is None and streaming:
+            self.source_hash = _file_hash(input_file)
+        else:
+            if source_bytes is None:
+                source_bytes = Path(input_file).read_bytes()
+            self.source_hash = hashlib.sha256(source_bytes).hexdigest()
+        self._source_bytes = source_bytes
+        self._prs = None
+        self._fanout: Optional[FanoutIndex] = None
     
-    def apply_style_to_slide(self, slide, style: StylePreset):
+    @classmethod
+    def from_buffer(cls, buffer, name: str = 'presentation.pptx', **kwargs) -> 'PPTStyleConverter':
+        """從記憶體中的資料建立轉換器 (不需要暫存檔)
+        
+        Args:
+            buffer: bytes、memoryview 或可讀取的檔案物件 (例如上傳的檔案)
+            name: 原始檔案名稱 (用於輸出檔名)
+            **kwargs: 其他 PPTStyleConverter 參數
+        """
+        data = buffer.read() if hasattr(buffer, 'read') else bytes(buffer)
+        return cls(name, source_bytes=data, **kwargs)
+    
+    @property
+    def source_bytes(self) -> bytes:
+        """原始檔案內容 (串流模式下第一次需要時才讀入)"""
+        if self._source_bytes is None:
+            self._source_bytes = Path(self.input_file).read_bytes()
+        return self._source_bytes
+    
+    def _open_source(self):
+        """開啟原始檔案 (已讀入時使用記憶體中的內容，否則從磁碟讀取)"""
+        if self._source_bytes is not None:
+            return BytesIO(self._source_bytes)
+        return open(self.input_file, 'rb')
+    
+    @property
+    def prs(self):
+        """已解析的模板簡報 (第一次存取時解析，之後每種風格都從這份模板複製)"""
+        if self._prs is None:
+            try:
+                self._prs = Presentation(BytesIO(self.source_bytes))
+                print(f"✓ 成功加載 PPT: {self.input_file}")
+                print(f"  - 投影片數: {len(self._prs.slides)}")
+                print(f"  - 幻燈片尺寸: {self._prs.slide_width} x {self._prs.slide_height}")
+            except Exception as e:
+                print(f"✗ 無法加載 PPT: {e}")
+                raise
+        return self._prs
+    
+    def _clone_template(self, engine: str = None):
+        """複製已解析的模板簡報 (記憶體內深層複製，不重新讀檔與解析)
+        
+        Args:
+            engine: 'fanout' 時複製分析用的模板 (需先呼叫 _fanout_index)
+        
+        Returns:
+            可獨立修改的 Presentation 副本
+        """
+        if engine == 'fanout':
+            return copy.deepcopy(self._fanout.template)
+        return copy.deepcopy(self.prs)
+    
+    def _fanout_index(self, program: StyleProgram) -> FanoutIndex:
+        """取得多風格展開的目標索引 (規則順序相同的風格共用，每份簡報只分析一次)"""
+        if self._fanout is None or self._fanout.layout != rule_layout(program):
+            self._fanout = FanoutIndex.build(self.prs, program, self.apply_style_to_slide_lxml,
+                                             _chart_resolver)
+        return self._fanout
+    
+    def _warn(self, error: Exception):
+        """顯示處理投影片時的警告 (iter_redesign 執行中時也會產生 warning 事件)"""
+        print(f"  ! 在處理形狀時出現警告: {error}")
+        if self._slide_warnings is not None:
+            self._slide_warnings.append(str(error))
+    
+    def apply_style_to_slide(self, slide, style, chart_resolver: ChartResolver = None):
         """將風格應用到單個投影片
         
         Args:
             slide: 投影片物件
-            style: 風格預設
+            style: 風格預設或已編譯的風格程式
+            chart_resolver: 圖表解析函數 (None 表示由投影片所屬的簡報取得)
+            
+        Returns:
+            (套用規則的形狀數, 修改的文字 run 數)
         """
+        program = _as_program(style)
+        shape_count = run_count = 0
         try:
             # 設定投影片背景
             background = slide.background
             fill = background.fill
             fill.solid()
-            fill.fore_color.rgb = RGBColor(*style.background_color)
+            fill.fore_color.rgb = program.background
             
-            # 遍歷投影片中的所有形狀
-            for shape in slide.shapes:
-                if shape.has_text_frame:
-                    text_frame = shape.text_frame
-                    
-                    # 設定文字顏色
-                    for paragraph in text_frame.paragraphs:
+            # 單次走訪所有形狀 (含群組內的形狀、表格儲存格與圖表文字)
+            parent = slide.shapes
+            resolve = chart_resolver or _chart_resolver(slide)
+            for styled in visit_shapes(program, slide.shapes._spTree, resolve):
+                shape_count += 1
+                text_rule, shape_rule = styled.text_rule, styled.shape_rule
+                
+                # 文字: 標題、正文、表格儲存格或圖表文字
+                for tx_body in styled.text_bodies:
+                    for paragraph in TextFrame(tx_body, None).paragraphs:
                         for run in paragraph.runs:
-                            run.font.color.rgb = RGBColor(*style.text_color)
-                        
-                        # 標題處理
-                        if hasattr(shape, 'name') and 'Title' in shape.name:
-                            for run in paragraph.runs:
-                                run.font.name = style.title_font
-                                run.font.size = Pt(style.title_size)
-                                run.font.bold = True
-                                run.font.color.rgb = RGBColor(*style.primary_color)
-                        # 正文處理
-                        else:
-                            for run in paragraph.runs:
-                                run.font.name = style.body_font
-                                run.font.size = Pt(style.body_size)
+                            run_count += 1
+                            font = run.font
+                            if text_rule.color is not None:
+                                font.color.rgb = text_rule.color
+                            if text_rule.font is not None:
+                                font.name = text_rule.font
+                            if text_rule.size is not None:
+                                font.size = text_rule.size
+                            if text_rule.bold is not None:
+                                font.bold = text_rule.bold
                 
-                # 設定形狀邊框和填充
-                if shape.shape_type == 14:  # 文字框
-                    if hasattr(shape, 'line'):
-                        shape.line.color.rgb = RGBColor(*style.secondary_color)
-                        shape.line.width = Pt(1)
-                    
-                    if hasattr(shape, 'fill'):
+                # 佔位符邊框和填充 (圖片佔位符沒有填充)
+                if shape_rule is not None:
+                    shape = SlideShapeFactory(styled.element, parent)
+                    if shape_rule.line_color is not None:
+                        shape.line.color.rgb = shape_rule.line_color
+                    if shape_rule.line_width is not None:
+                        shape.line.width = shape_rule.line_width
+                    if shape_rule.fill_color is not None and hasattr(shape, 'fill'):
                         shape.fill.solid()
-                        shape.fill.fore_color.rgb = RGBColor(*style.accent_color)
-                        shape.fill.transparency = 0.9  # 99% 透明
+                        shape.fill.fore_color.rgb = shape_rule.fill_color
         
         except Exception as e:
-            print(f"  ! 在處理形狀時出現警告: {e}")
+            self._warn(e)
+        return shape_count, run_count
     
-    def redesign_with_style(self, style_name: str) -> str:
-        """使用指定風格重新設計 PPT
+    def apply_style_to_slide_lxml(self, slide, style, chart_resolver: ChartResolver = None):
+        """將風格應用到單個投影片 (lxml 快速路徑)
+        
+        直接操作投影片 XML，結果與 apply_style_to_slide 完全相同。
         
         Args:
-            style_name: 風格名稱 (必須在 STYLE_PRESETS 中)
+            slide: 投影片物件
+            style: 風格預設或已編譯的風格程式
+            chart_resolver: 圖表解析函數 (None 表示由投影片所屬的簡報取得)
             
         Returns:
-            輸出檔案路徑
+            (套用規則的形狀數, 修改的文字 run 數)
+        """
+        program = _as_program(style)
+        shape_count = run_count = 0
+        try:
+            # 設定投影片背景
+            slide_elm = slide._element
+            _set_solid_fill(slide_elm.cSld.get_or_add_bgPr(), program.background_hex)
+            
+            resolve = chart_resolver or _chart_resolver(slide)
+            for styled in visit_shapes(program, slide_elm.cSld.spTree, resolve):
+                shape_count += 1
+                shape_elm, text_rule, shape_rule = styled.element, styled.text_rule, styled.shape_rule
+                
+                for tx_body in styled.text_bodies:
+                    runs = _XP_RUNS(tx_body)
+                    run_count += len(runs)
+                    for r in runs:
+                        _apply_text_rule(r.get_or_add_rPr(), text_rule)
+                
+                if shape_rule is not None:
+                    _apply_shape_rule(shape_elm, shape_rule)
+        
+        except Exception as e:
+            self._warn(e)
+        return shape_count, run_count
+    
+    def apply_style_to_slide_fanout(self, slide, style):
+        """將風格應用到單個投影片 (依 _fanout_index 的分析結果只改寫屬性值)
+        
+        投影片必須來自 _clone_template('fanout')；不在索引中的投影片 (例如增量轉換
+        時單獨解析的投影片) 改用 lxml 路徑，結果相同。
+        
+        Args:
+            slide: 投影片物件
+            style: 風格預設或已編譯的風格程式
+            
+        Returns:
+            (套用規則的形狀數, 修改的文字 run 數)
+        """
+        program = _as_program(style)
+        counts = self._fanout.stamp(slide, program) if self._fanout is not None else None
+        if counts is None:
+            return self.apply_style_to_slide_lxml(slide, program)
+        return counts
+    
+    def apply_style_to_theme(self, prs, style: StylePreset):
+        """將風格寫入佈景主題與母片/版面配置 (每份簡報只需執行一次)
+        
+        標題使用主題的主要字型與 tx2 (= 主色)，正文使用次要字型與 tx1 (= 文字色)，
+        母片背景使用 bg1 (= 背景色)；版面配置的明確覆寫會被移除以繼承母片。
+        
+        Args:
+            prs: 簡報物件
+            style: 風格預設
         """
+        for master in prs.slide_masters:
+            theme_part = master.part.part_related_by(RT.THEME)
+            theme_part.blob = _restyle_theme_blob(theme_part.blob, style)
+            _restyle_master(master._element, style)
+            for layout in master.slide_layouts:
+                _strip_text_overrides(layout._element)
+    
+    def apply_style_to_slide_theme(self, slide, style: StylePreset):
+        """主題模式下處理單個投影片: 只移除明確覆寫，樣式由母片繼承
+        
+        Args:
+            slide: 投影片物件
+            style: 風格預設 (樣式已在 apply_style_to_theme 寫入)
+            
+        Returns:
+            (0, 被清除覆寫的文字屬性數)；主題模式不直接修改形狀
+        """
+        try:
+            return 0, _strip_text_overrides(slide._element)
+        except Exception as e:
+            self._warn(e)
+            return 0, 0
+    
+    def _resolve(self, style_name: str, engine: str = None) -> Tuple[StylePreset, str]:
+        """檢查並取得風格預設與轉換引擎"""
         if style_name not in STYLE_PRESETS:
             raise ValueError(f"未知風格: {style_name}")
+        engine = engine or self.engine
+        if engine not in ENGINES:
+            raise ValueError(f"未知引擎: {engine}")
+        return STYLE_PRESETS[style_name], engine
+    
+    def _slide_engine(self, engine: str) -> Callable:
+        """引擎對應的單張投影片處理函數"""
+        return {
+            'proxy': self.apply_style_to_slide,
+            'lxml': self.apply_style_to_slide_lxml,
+            'theme': self.apply_style_to_slide_theme,
+            'fanout': self.apply_style_to_slide_fanout,
+        }[engine]
+    
+    def _iter_slides(self, style_name: str, slides: List[Tuple[int, str, Slide]],
+                     program: StyleProgram, engine: str, metrics: ConversionMetrics
+                     ) -> Iterator[ConversionEvent]:
+        """逐張套用風格並產生投影片事件
         
-        style = STYLE_PRESETS[style_name]
+        Args:
+            style_name: 風格名稱
+            slides: 需要處理的投影片 [(在簡報中的位置, 部件名稱, 投影片物件)]
+            program: 已編譯的風格程式
+            engine: 轉換引擎
+            metrics: 記錄每張投影片處理結果
+        """
+        apply_style = self._slide_engine(engine)
+        total = len(slides)
+        for completed, (idx, partname, slide) in enumerate(slides, 1):
+            yield from self._iter_slide(style_name, idx, partname, slide, program,
+                                        apply_style, completed, total, metrics)
+    
+    def _iter_slide(self, style_name: str, idx: int, partname: str, slide, program: StyleProgram,
+                    apply_style: Callable, completed: int, total: int,
+                    metrics: ConversionMetrics) -> Iterator[ConversionEvent]:
+        """套用風格到一張投影片並產生 slide_started / warning / slide_finished 事件"""
+        yield ConversionEvent(EVENT_SLIDE_STARTED, style_name, index=idx, partname=partname,
+                              completed=completed - 1, total=total)
+        print(f"   處理投影片 {completed}/{total}...", end='\r')
         
-        print(f"\n📝 應用風格: {style.name}")
-        print(f"   描述: {style.description}")
+        self._slide_warnings = []
+        start = time.perf_counter()
+        with metrics.stage('apply'):
+            shapes, runs = apply_style(slide, program)
+        seconds = time.perf_counter() - start
+        warnings, self._slide_warnings = self._slide_warnings, None
+        metrics.add_slide(idx, partname, shapes, runs, seconds)
+        
+        for message in warnings:
+            yield ConversionEvent(EVENT_WARNING, style_name, index=idx, partname=partname,
+                                  message=message)
+        yield ConversionEvent(EVENT_SLIDE_FINISHED, style_name, index=idx, partname=partname,
+                              completed=completed, total=total, shapes=shapes, runs=runs,
+                              seconds=seconds)
+    
+    def _iter_render(self, style_name: str, style: StylePreset, engine: str, output,
+                     metrics: ConversionMetrics) -> Generator[ConversionEvent, None, bool]:
+        """複製模板、套用風格並寫入 output
+        
+        Args:
+            style_name: 風格名稱
+            style: 風格預設
+            engine: 轉換引擎
+            output: 輸出檔案路徑或可寫入的檔案物件
+            metrics: 記錄各階段耗時與每張投影片處理結果
+            
+        Returns:
+            (產生器回傳值) 是否以直通方式寫入 (輸出的部件名稱與原始檔案相同)
+        """
+        if self._prs is None:
+            with metrics.stage('parse'):
+                self.prs
+        
+        # 風格只編譯一次；fanout 引擎的分析結果由之後的每種風格共用
+        program = compile_style(style)
+        if engine == 'fanout':
+            with metrics.stage('analyze'):
+                self._fanout_index(program)
         
         # 建立輸出演示文稿副本
-        output_prs = Presentation(self.input_file)
+        with metrics.stage('clone'):
+            output_prs = self._clone_template(engine)
         
-        # 應用風格到所有投影片
-        for idx, slide in enumerate(output_prs.slides):
-            print(f"   處理投影片 {idx + 1}/{len(output_prs.slides)}...", end='\r')
-            self.apply_style_to_slide(slide, style)
+        print(f"\n📝 應用風格: {style.name}")
+        print(f"   描述: {style.description}")
+        if engine == 'theme':
+            with metrics.stage('theme'):
+                self.apply_style_to_theme(output_prs, style)
         
-        # 生成輸出檔案名
-        input_name = Path(self.input_file).stem
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        output_file = self.output_dir / f"{input_name}_{style_name}_{timestamp}.pptx"
+        # 應用風格到所有投影片
+        slides = [(idx, str(slide.part.partname), slide)
+                  for idx, slide in enumerate(output_prs.slides)]
+        yield from self._iter_slides(style_name, slides, program, engine, metrics)
         
         # 儲存檔案
-        output_prs.save(str(output_file))
-        print(f"\n✓ 完成: {style_name}")
-        print(f"  儲存位置: {output_file}")
+        with metrics.stage('save'):
+            return self._save_output(output_prs, output, engine)
+    
+    def _iter_stream(self, style_name: str, style: StylePreset, engine: str, output,
+                     metrics: ConversionMetrics
+                     ) -> Generator[ConversionEvent, None, Tuple[Dict[str, str], List[str]]]:
+        """不建立 Presentation，依 zip 順序逐一讀取、套用風格並寫入部件
         
+        投影片 (與其圖表) 在讀入後立即處理並寫入輸出，之後即可釋放；未修改的項目
+        直接複製壓縮資料。輸出的部件與 zip 項目順序與直通寫入的完整轉換相同
+        (圖表位於其投影片之前時例外，改寫在最後)。
+        
+        Args:
+            style_name: 風格名稱
+            style: 風格預設
+            engine: 轉換引擎 (fanout 需要整份簡報的模板，改用結果相同的 lxml 路徑)
+            output: 輸出檔案路徑或可寫入的檔案物件
+            metrics: 記錄各階段耗時與每張投影片處理結果
+            
+        Returns:
+            (產生器回傳值) ({投影片部件名稱: 原始內容雜湊}, 其他會被修改的部件名稱)
+        """
+        program = compile_style(style)
+        if engine == 'fanout':
+            engine = 'lxml'
+        apply_style = self._slide_engine(engine)
+        
+        print(f"\n📝 應用風格: {style.name} (串流)")
+        print(f"   描述: {style.description}")
+        with self._open_source() as source, zipfile.ZipFile(source) as zin, \
+                zipfile.ZipFile(output, 'w', compression=zipfile.ZIP_DEFLATED,
+                                strict_timestamps=False) as zout:
+            with metrics.stage('parse'):
+                plan = plan_stream(zin)
+            slide_index = {partname: idx for idx, partname in enumerate(plan.slides)}
+            if engine == 'theme':
+                # 主題模式不修改圖表
+                masters, layouts, themes = set(plan.masters), set(plan.layouts), set(plan.themes)
+                charts, chart_owners = {}, {}
+                shared = plan.masters + plan.themes + plan.layouts
+            else:
+                masters = layouts = themes = set()
+                # 圖表在所有連結它的投影片處理完之後才能寫入
+                charts, chart_owners = plan.charts, plan.chart_owners()
+                shared = list(chart_owners)
+            styled_charts: Dict[str, object] = {}   # 已套用風格、尚未寫入的圖表
+            deferred: Dict[str, zipfile.ZipInfo] = {}  # zip 位置已經過、等待投影片的圖表
+            slide_hashes: Dict[str, str] = {}
+            
+            def write_chart(partname: str, info: zipfile.ZipInfo):
+                chart_space = styled_charts.pop(partname, None)
+                if chart_space is None:
+                    copy_raw_member(zin, zout, info)
+                else:
+                    zout.writestr(info.filename, serialize_part_xml(chart_space))
+            
+            for info in zin.infolist():
+                partname = '/' + info.filename
+                if partname in slide_index:
+                    with metrics.stage('parse'):
+                        blob = zin.read(info)
+                        slide_hashes[partname] = hashlib.sha256(blob).hexdigest()
+                        slide = Slide(parse_xml(blob), None)
+                    
+                    slide_charts = charts.get(partname, {})
+                    
+                    def resolve_chart(r_id: str, slide_charts=slide_charts):
+                        chart = slide_charts.get(r_id)
+                        if chart is None:
+                            return None
+                        if chart not in styled_charts:
+                            styled_charts[chart] = parse_xml(zin.read(chart.lstrip('/')))
+                        return styled_charts[chart]
+                    
+                    slide_apply = apply_style if engine == 'theme' \
+                        else partial(apply_style, chart_resolver=resolve_chart)
+                    yield from self._iter_slide(style_name, slide_index[partname], partname,
+                                                slide, program, slide_apply,
+                                                len(slide_hashes), len(plan.slides), metrics)
+                    
+                    with metrics.stage('save'):
+                        zout.writestr(info.filename, serialize_part_xml(slide._element))
+                        for chart in set(slide_charts.values()):
+                            chart_owners[chart] -= 1
+                            if not chart_owners[chart] and chart in deferred:
+                                write_chart(chart, deferred.pop(chart))
+                elif chart_owners.get(partname):
+                    deferred[partname] = info
+                elif partname in chart_owners:
+                    with metrics.stage('save'):
+                        write_chart(partname, info)
+                elif partname in masters or partname in layouts:
+                    with metrics.stage('theme'):
+                        root = parse_xml(zin.read(info))
+                        if partname in masters:
+                            _restyle_master(root, style)
+                        else:
+                            _strip_text_overrides(root)
+                        zout.writestr(info.filename, serialize_part_xml(root))
+                elif partname in themes:
+                    with metrics.stage('theme'):
+                        zout.writestr(info.filename, _restyle_theme_blob(zin.read(info), style))
+                else:
+                    copy_raw_member(zin, zout, info)
+            
+            # 所屬投影片不在 zip 中的圖表 (損壞的檔案) 保持原樣
+            with metrics.stage('save'):
+                for partname, info in deferred.items():
+                    write_chart(partname, info)
+        return slide_hashes, shared
+    
+    def _iter_incremental(self, style_name: str, style: StylePreset, engine: str,
+                          output_file: Path, metrics: ConversionMetrics
+                          ) -> Generator[ConversionEvent, None, bool]:
+        """以上次的輸出為基礎，只重新處理新增或修改的投影片
+        
+        投影片 XML 直接從 zip 讀取並解析，不載入整份簡報。
+        
+        Args:
+            style_name: 風格名稱
+            style: 風格預設
+            engine: 轉換引擎
+            output_file: 輸出檔案路徑
+            metrics: 記錄各階段耗時與每張投影片處理結果
+            
+        Returns:
+            (產生器回傳值) 是否完成增量轉換 (找不到可用的上次輸出時回傳 False)
+        """
+        render_key = self._render_key(style, engine)
+        previous = find_previous(self.output_dir, self.input_file, style_name, render_key)
+        if previous is None:
+            return False
+        previous_output, record = previous
+        
+        with metrics.stage('diff'):
+            with self._open_source() as source, zipfile.ZipFile(source) as zin:
+                # 新增的圖表需要透過簡報的關聯才能套用風格，改為完整轉換
+                if engine != 'theme' and not set(chart_partnames(zin)) <= set(record['shared']):
+                    return False
+                plan = plan_incremental(zin, record)
+                if plan is None:
+                    return False
+                slide_hashes, reused, changed = plan
+                blobs = {partname: zin.read(partname.lstrip('/')) for partname in changed}
+        
+        print(f"\n📝 應用風格: {style.name} (增量)")
+        print(f"   重用 {len(slide_hashes) - len(changed)} 張投影片，"
+              f"重新處理 {len(changed)} 張")
+        
+        # 投影片樣式只取決於投影片本身的 XML，不需要所屬的簡報
+        slide_index = {partname: idx for idx, partname in enumerate(slide_hashes)}
+        slides = [(slide_index[partname], partname, Slide(parse_xml(blobs[partname]), None))
+                  for partname in changed]
+        program = compile_style(style)
+        yield from self._iter_slides(style_name, slides, program, engine, metrics)
+        metrics.reused_slides = len(slide_hashes) - len(changed)
+        
+        with metrics.stage('save'):
+            restyled = {partname: serialize_part_xml(slide._element)
+                        for _, partname, slide in slides}
+            # 上次的輸出可能與本次同名 (同一秒內轉換)，先寫入暫存檔再替換
+            tmp_file = output_file.with_suffix('.tmp')
+            with self._open_source() as source:
+                save_incremental(source, previous_output, tmp_file, reused, restyled)
+            os.replace(tmp_file, output_file)
+            write_sidecar(output_file, self.input_file, style_name, render_key,
+                          slide_hashes, record['shared'])
+        store = self._output_store()
+        if store is not None:
+            store.touch(previous_output)
+        return True
+    
+    def _write_sidecar(self, style_name: str, style: StylePreset, engine: str,
+                       output_file: Path):
+        """完整轉換後記錄各部件的原始內容雜湊 (供下次增量轉換使用)"""
+        slides = [str(slide.part.partname) for slide in self.prs.slides]
+        shared = [partname for partname in self._dirty_partnames(self.prs, engine)
+                  if partname not in slides]
+        with self._open_source() as source, zipfile.ZipFile(source) as zin:
+            write_sidecar(output_file, self.input_file, style_name,
+                          self._render_key(style, engine),
+                          member_hashes(zin, slides), member_hashes(zin, shared))
+    
+    def _iter_to_file(self, style_name: str, style: StylePreset, engine: str,
+                      metrics: ConversionMetrics) -> Generator[ConversionEvent, None, str]:
+        """轉換並寫入輸出目錄 (快取、增量轉換或完整轉換)，回傳輸出檔案路徑"""
+        output_file = self._output_path(style_name)
+        
+        with metrics.stage('cache'):
+            cache_key = self._cache_key(style, engine)
+            cached_file = self.cache.get(cache_key) if self.cache is not None else None
+            if cached_file is not None:
+                copy_replace(cached_file, output_file)
+        if cached_file is not None:
+            metrics.cached = True
+            if self.audit_contrast:
+                self._check_contrast(str(output_file), None, metrics)
+            return str(output_file)
+        
+        incremental = self.incremental and (self.passthrough or self.streaming)
+        done = incremental and (yield from self._iter_incremental(
+            style_name, style, engine, output_file, metrics))
+        if not done and self.streaming:
+            yield from self._iter_stream_to_file(style_name, style, engine, output_file,
+                                                 metrics, incremental)
+        elif not done:
+            passthrough = yield from self._iter_render(
+                style_name, style, engine, str(output_file), metrics)
+            # 輸出的部件名稱與原始檔案相同時才能做為下次增量轉換的基礎
+            if incremental and passthrough:
+                self._write_sidecar(style_name, style, engine, output_file)
+        if self.fix_contrast:
+            tmp_file = output_file.with_suffix('.contrast.tmp')
+            self._check_contrast(str(output_file), str(tmp_file), metrics)
+            os.replace(tmp_file, output_file)
+        elif self.audit_contrast:
+            self._check_contrast(str(output_file), None, metrics)
+        if self.optimize_media:
+            tmp_file = output_file.with_suffix('.media.tmp')
+            self._optimize_media(str(output_file), str(tmp_file), metrics)
+            os.replace(tmp_file, output_file)
+        if self.cache is not None:
+            self.cache.put(cache_key, str(output_file))
         return str(output_file)
     
-    def batch_redesign(self, styles: List[str] = None) -> List[str]:
+    def _iter_stream_to_file(self, style_name: str, style: StylePreset, engine: str,
+                             output_file: Path, metrics: ConversionMetrics, sidecar: bool
+                             ) -> Iterator[ConversionEvent]:
+        """串流寫入暫存檔，完成後才替換為輸出檔案 (呼叫端停止迭代時不留下不完整的輸出)"""
+        tmp_file = output_file.with_suffix('.tmp')
+        try:
+            slide_hashes, shared = yield from self._iter_stream(
+                style_name, style, engine, str(tmp_file), metrics)
+            os.replace(tmp_file, output_file)
+        finally:
+            if tmp_file.exists():
+                tmp_file.unlink()
+        if sidecar:
+            with self._open_source() as source, zipfile.ZipFile(source) as zin:
+                write_sidecar(output_file, self.input_file, style_name,
+                              self._render_key(style, engine),
+                              slide_hashes, member_hashes(zin, shared))
+    
+    def _optimize_media(self, source, output, metrics: ConversionMetrics):
+        """縮小過大的圖片並合併重複圖片，結果記錄於 metrics.media"""
+        with metrics.stage('media'):
+            metrics.media = optimize_media(source, output, dpi=self.media_dpi,
+                                           workers=self.media_workers)
+        print(f"\n🖼️ {metrics.media.describe()}")
+    
+    def _check_contrast(self, source, output, metrics: ConversionMetrics):
+        """檢查文字對比 (output 不為 None 時寫入調整後的簡報)，結果記錄於 metrics.contrast"""
+        from ppt_contrast import audit_contrast, fix_contrast  # NumPy 只在啟用時載入
+        with metrics.stage('contrast'):
+            metrics.contrast = (fix_contrast(source, output) if output is not None
+                                else audit_contrast(source))
+        print(f"\n🔍 {metrics.contrast.describe()}")
+    
+    def _iter_to_bytes(self, style_name: str, style: StylePreset, engine: str,
+                       metrics: ConversionMetrics) -> Generator[ConversionEvent, None, bytes]:
+        """轉換並保留在記憶體中 (快取或完整轉換)，回傳輸出檔案內容"""
+        with metrics.stage('cache'):
+            cache_key = self._cache_key(style, engine)
+            data = self.cache.get_bytes(cache_key) if self.cache is not None else None
+        if data is not None:
+            metrics.cached = True
+            if self.audit_contrast:
+                self._check_contrast(BytesIO(data), None, metrics)
+            return data
+        
+        buffer = BytesIO()
+        render = self._iter_stream if self.streaming else self._iter_render
+        yield from render(style_name, style, engine, buffer, metrics)
+        if self.fix_contrast:
+            fixed = BytesIO()
+            self._check_contrast(BytesIO(buffer.getvalue()), fixed, metrics)
+            buffer = fixed
+        elif self.audit_contrast:
+            self._check_contrast(BytesIO(buffer.getvalue()), None, metrics)
+        if self.optimize_media:
+            optimized = BytesIO()
+            self._optimize_media(BytesIO(buffer.getvalue()), optimized, metrics)
+            buffer = optimized
+        data = buffer.getvalue()
+        if self.cache is not None:
+            self.cache.put_bytes(cache_key, data)
+        return data
+    
+    def iter_redesign(self, style_name: str, engine: str = None,
+                      to_bytes: bool = False) -> Iterator[ConversionEvent]:
+        """使用指定風格重新設計 PPT，逐步產生轉換事件
+        
+        依序產生 style_started、每張投影片的 slide_started / warning / slide_finished，
+        最後是 output_ready (output 為檔案路徑或內容，metrics 為效能指標)。
+        快取命中時直接產生 output_ready。呼叫端停止迭代時不會寫入輸出。
+        
+        Args:
+            style_name: 風格名稱 (必須在 STYLE_PRESETS 中)
+            engine: 轉換引擎 (None 表示使用初始化時的設定)
+            to_bytes: True 時結果保留在記憶體中，否則寫入輸出目錄
+            
+        Yields:
+            ConversionEvent
+        """
+        style, engine = self._resolve(style_name, engine)
+        self.last_metrics = None
+        metrics = ConversionMetrics(style_name, engine)
+        yield ConversionEvent(EVENT_STYLE_STARTED, style_name)
+        
+        with trace_peak_memory(metrics, self.profile):
+            if to_bytes:
+                output = yield from self._iter_to_bytes(style_name, style, engine, metrics)
+            else:
+                output = yield from self._iter_to_file(style_name, style, engine, metrics)
+        
+        self._finish_metrics(metrics)
+        print(f"\n♻️ 使用快取結果: {style_name}" if metrics.cached else f"\n✓ 完成: {style_name}")
+        if not to_bytes:
+            print(f"  儲存位置: {output}")
+            self._record_output(style_name, engine, output, metrics.total_seconds)
+        yield ConversionEvent(EVENT_OUTPUT_READY, style_name, output=output, metrics=metrics)
+    
+    def _output_store(self) -> Optional[OutputStore]:
+        """輸出目錄的索引 (輸出目錄變更時重新建立；不記錄時回傳 None)"""
+        if not self.index_outputs:
+            return None
+        if self.store is None or self.store.root.resolve() != self.output_dir.resolve():
+            self.store = OutputStore(self.output_dir)
+        return self.store
+    
+    def _record_output(self, style_name: str, engine: str, output_file: str, seconds: float):
+        """將輸出檔案記錄到輸出目錄索引，並淘汰超出大小或保留天數限制的舊輸出"""
+        store = self._output_store()
+        if store is None:
+            return
+        evicted = store.record(output_file, self.input_file, self.source_hash,
+                               style_name, engine, seconds, keep=self._written_outputs)
+        self._written_outputs.append(output_file)
+        if evicted:
+            print(f"  🗑️ 已淘汰 {len(evicted)} 個舊輸出 (超出輸出目錄限制)")
+    
+    def _finish_metrics(self, metrics: ConversionMetrics):
+        """記錄最近一次轉換的指標並通知回呼函數"""
+        self.last_metrics = metrics
+        if self.on_metrics is not None:
+            self.on_metrics(metrics)
+    
+    def _consume(self, events: Iterator[ConversionEvent]):
+        """執行轉換直到完成 (投影片完成時呼叫 on_progress)，回傳輸出"""
+        output = None
+        for event in events:
+            if event.kind == EVENT_SLIDE_FINISHED and self.on_progress is not None:
+                self.on_progress(event.style, event.completed, event.total)
+            elif event.kind == EVENT_OUTPUT_READY:
+                output = event.output
+        return output
+    
+    def redesign_with_style(self, style_name: str, engine: str = None) -> str:
+        """使用指定風格重新設計 PPT
+        
+        Args:
+            style_name: 風格名稱 (必須在 STYLE_PRESETS 中)
+            engine: 轉換引擎 (None 表示使用初始化時的設定)
+            
+        Returns:
+            輸出檔案路徑
+        """
+        return self._consume(self.iter_redesign(style_name, engine))
+    
+    def redesign_to_bytes(self, style_name: str, engine: str = None) -> bytes:
+        """使用指定風格重新設計 PPT，結果保留在記憶體中 (不寫入輸出目錄)
+        
+        Args:
+            style_name: 風格名稱 (必須在 STYLE_PRESETS 中)
+            engine: 轉換引擎 (None 表示使用初始化時的設定)
+            
+        Returns:
+            輸出 .pptx 檔案內容
+        """
+        return self._consume(self.iter_redesign(style_name, engine, to_bytes=True))
+    
+    def batch_redesign_to_bytes(self, styles: List[str] = None) -> Dict[str, bytes]:
+        """批量重新設計 PPT，結果保留在記憶體中
+        
+        Args:
+            styles: 風格列表 (None 表示使用所有風格)
+            
+        Returns:
+            {風格名稱: 輸出檔案內容}，依風格順序排列；失敗的風格記錄於 last_batch_report
+        """
+        if styles is None:
+            styles = list(STYLE_PRESETS.keys())
+        
+        outputs = {}
+        self.last_batch_report = []
+        for style_name in styles:
+            start = time.perf_counter()
+            cpu_start = time.process_time()
+            error = None
+            try:
+                outputs[style_name] = self.redesign_to_bytes(style_name)
+            except Exception as e:
+                error = str(e)
+                print(f"✗ 處理風格 {style_name} 失敗: {e}")
+            self.last_batch_report.append({
+                'style': style_name, 'output': None, 'error': error,
+                'seconds': time.perf_counter() - start,
+                'cpu_seconds': time.process_time() - cpu_start,
+                'metrics': self.last_metrics,
+            })
+        
+        return outputs
+    
+    def write_bundle(self, dest, styles: List[str] = None) -> List[str]:
+        """將多種風格的轉換結果逐一寫入單一 zip 壓縮檔
+        
+        每種風格完成後立即寫入並釋放，記憶體中同時只保留一份輸出簡報；
+        .pptx 本身已經壓縮，因此以 ZIP_STORED 存放不再重新壓縮。
+        
+        Args:
+            dest: 輸出 zip 檔案路徑或可寫入的檔案物件
+            styles: 風格列表 (None 表示使用所有風格)
+            
+        Returns:
+            壓縮檔中的檔案名稱列表 (依風格順序)；失敗的風格記錄於 last_batch_report
+        """
+        if styles is None:
+            styles = list(STYLE_PRESETS.keys())
+        
+        members = []
+        self.last_batch_report = []
+        with zipfile.ZipFile(dest, 'w', compression=zipfile.ZIP_STORED) as bundle:
+            for style_name in styles:
+                start = time.perf_counter()
+                cpu_start = time.process_time()
+                error, member = None, None
+                try:
+                    data = self.redesign_to_bytes(style_name)
+                    member = self.output_name(style_name)
+                    bundle.writestr(member, data)
+                    members.append(member)
+                    del data
+                except Exception as e:
+                    error = str(e)
+                    print(f"✗ 處理風格 {style_name} 失敗: {e}")
+                self.last_batch_report.append({
+                    'style': style_name, 'output': member, 'error': error,
+                    'seconds': time.perf_counter() - start,
+                    'cpu_seconds': time.process_time() - cpu_start,
+                    'metrics': self.last_metrics,
+                })
+        
+        return members
+    
+    def output_name(self, style_name: str) -> str:
+        """記憶體輸出建議使用的檔案名稱"""
+        return f"{Path(self.input_file).stem}_{style_name}.pptx"
+    
+    def _output_path(self, style_name: str) -> Path:
+        """生成輸出檔案名 (輸出目錄在第一次寫入檔案時才建立)"""
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        input_name = Path(self.input_file).stem
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        return self.output_dir / f"{input_name}_{style_name}_{timestamp}.pptx"
+    
+    def _cache_key(self, style: StylePreset, engine: str) -> str:
+        """快取鍵: 輸入內容雜湊 + 風格指紋 + 引擎與版本 (+ 媒體最佳化解析度、對比調整)"""
+        media = (f'media{self.media_dpi}',) if self.optimize_media else ()
+        contrast = ('contrastfix',) if self.fix_contrast else ()
+        return make_key(self.source_hash, style_fingerprint(style), engine, ENGINE_VERSION,
+                        *media, *contrast)
+    
+    def _render_key(self, style: StylePreset, engine: str) -> str:
+        """套用結果只取決於風格指紋、引擎與引擎版本 (增量轉換用來判斷能否重用)
+
+        對比調整會改寫投影片中的文字色，調整過的輸出不能做為未調整輸出的基礎 (反之亦然)。
+        """
+        contrast = ('contrastfix',) if self.fix_contrast else ()
+        return make_key(style_fingerprint(style), engine, ENGINE_VERSION, *contrast)
+    
+    def _is_cached(self, style_name: str) -> bool:
+        """指定風格是否已有快取結果"""
+        if self.cache is None or style_name not in STYLE_PRESETS:
+            return False
+        key = self._cache_key(STYLE_PRESETS[style_name], self.engine)
+        return self.cache.get(key) is not None
+    
+    def _dirty_partnames(self, prs, engine: str) -> List[str]:
+        """列出指定引擎會修改的部件名稱"""
+        partnames = [str(slide.part.partname) for slide in prs.slides]
+        if engine != 'theme':
+            # 圖表文字位於投影片連結的圖表部件中
+            for slide in prs.slides:
+                partnames.extend(str(rel.target_part.partname)
+                                 for rel in slide.part.rels.values()
+                                 if not rel.is_external and rel.reltype == RT.CHART)
+        else:
+            for master in prs.slide_masters:
+                partnames.append(str(master.part.partname))
+                partnames.append(str(master.part.part_related_by(RT.THEME).partname))
+                partnames.extend(str(layout.part.partname) for layout in master.slide_layouts)
+        return partnames
+    
+    def _save_output(self, prs, output, engine: str):
+        """儲存輸出簡報 (優先使用直通寫入，部件集合有變動時退回完整儲存)
+        
+        Args:
+            prs: 已套用風格的簡報
+            output: 輸出檔案路徑或檔案物件
+            engine: 使用的轉換引擎
+            
+        Returns:
+            是否以直通方式寫入
+        """
+        if self.passthrough and save_passthrough(
+                prs, self.source_bytes, output, self._dirty_partnames(prs, engine)):
+            return True
+        prs.save(output)
+        return False
+    
+    def _worker_options(self) -> Dict:
+        """傳給工作行程的轉換器設定"""
+        return {'engine': self.engine, 'passthrough': self.passthrough, 'profile': self.profile,
+                'incremental': self.incremental, 'index_outputs': False,
+                'streaming': self.streaming, 'optimize_media': self.optimize_media,
+                'media_dpi': self.media_dpi, 'audit_contrast': self.audit_contrast,
+                'fix_contrast': self.fix_contrast}
+    
+    def batch_redesign(self, styles: List[str] = None, workers: int = 1) -> List[str]:
         """批量重新設計 PPT
         
         Args:
             styles: 風格列表 (None 表示使用所有風格)
+            workers: 平行處理的行程數 (1 表示依序處理)
             
         Returns:
-            輸出檔案列表
+            輸出檔案列表 (依風格順序；每種風格的結果與錯誤記錄於 last_batch_report)
         """
         if styles is None:
             styles = list(STYLE_PRESETS.keys())
         
-        output_files = []
+        workers = max(1, min(workers, len(styles)))
         print(f"\n🎨 開始批量重新設計...")
         print(f"   總計 {len(styles)} 種風格")
+        if workers > 1:
+            print(f"   平行處理: {workers} 個行程")
         print("-" * 60)
         
-        for style_name in styles:
-            try:
-                output_file = self.redesign_with_style(style_name)
-                output_files.append(output_file)
-            except Exception as e:
-                print(f"✗ 處理風格 {style_name} 失敗: {e}")
+        start = time.perf_counter()
+        # 已有快取結果的風格直接在主行程取用，只將其餘風格交給工作行程
+        pending = [name for name in styles if not self._is_cached(name)] if workers > 1 else []
+        if pending:
+            with ProcessPoolExecutor(
+                max_workers=min(workers, len(pending)),
+                initializer=_init_batch_worker,
+                initargs=(self.input_file, self._source_bytes, str(self.output_dir),
+                          self._worker_options()),
+            ) as executor:
+                futures = {name: executor.submit(_run_batch_worker, name) for name in pending}
+                # 依請求順序收集結果，而非完成順序
+                results = []
+                for style_name in styles:
+                    if style_name not in futures:
+                        results.append(self._run_style(style_name))
+                        continue
+                    result = futures[style_name].result()
+                    if result[2] is None:
+                        if self.cache is not None:
+                            key = self._cache_key(STYLE_PRESETS[style_name], self.engine)
+                            self.cache.put(key, result[1])
+                        # 工作行程不寫入索引，由主行程依序記錄
+                        self._record_output(style_name, self.engine, result[1], result[3])
+                    # 回呼函數無法傳給工作行程，改由主行程在收到結果時呼叫
+                    if result[5] is not None and self.on_metrics is not None:
+                        self.on_metrics(result[5])
+                    results.append(result)
+        else:
+            results = [self._run_style(style_name) for style_name in styles]
+        wall_time = time.perf_counter() - start
+        
+        self.last_batch_report = [
+            {'style': style_name, 'output': output_file, 'error': error,
+             'seconds': seconds, 'cpu_seconds': cpu_seconds, 'metrics': metrics}
+            for style_name, output_file, error, seconds, cpu_seconds, metrics in results
+        ]
+        output_files = []
+        for entry in self.last_batch_report:
+            if entry['error'] is None:
+                output_files.append(entry['output'])
+            else:
+                print(f"✗ 處理風格 {entry['style']} 失敗: {entry['error']}")
         
         print("-" * 60)
         print(f"✓ 完成所有轉換！共產生 {len(output_files)} 個檔案")
+        # 以各風格的 CPU 時間總和估計依序處理所需時間，不受行程間競爭影響
+        cpu_time = sum(entry['cpu_seconds'] for entry in self.last_batch_report)
+        print(f"  總耗時: {wall_time:.2f} 秒 (各風格 CPU 時間累計 {cpu_time:.2f} 秒)")
+        if pending and wall_time > 0:
+            print(f"  加速比: {cpu_time / wall_time:.2f}x")
         
         return output_files
     
+    def _run_style(self, style_name: str) -> Tuple[str, str, str, float, float,
+                                                    Optional[ConversionMetrics]]:
+        """轉換單一風格並捕捉錯誤 (供批量處理使用)
+        
+        Returns:
+            (風格名稱, 輸出檔案路徑, 錯誤訊息, 耗時秒數, CPU 秒數, 效能指標)
+        """
+        start = time.perf_counter()
+        cpu_start = time.process_time()
+        output_file, error = None, None
+        try:
+            output_file = self.redesign_with_style(style_name)
+        except Exception as e:
+            error = str(e)
+        return (style_name, output_file, error,
+                time.perf_counter() - start, time.process_time() - cpu_start,
+                self.last_metrics)
+    
     def list_available_styles(self):
         """列出所有可用的風格"""
         print("\n📚 可用風格列表:")
@@ -294,8 +1241,31 @@ class PPTStyleConverter:
         print("-" * 60)
 
 
+# ==================== 平行處理 ====================
+# 每個工作行程只解析一次輸入檔案，之後處理分配到的所有風格
+_batch_converter = None
+
+
+def _init_batch_worker(input_file: str, source_bytes: Optional[bytes], output_dir: str,
+                       options: Dict):
+    """工作行程初始化: 建立該行程專用的轉換器"""
+    global _batch_converter
+    _batch_converter = PPTStyleConverter(input_file, source_bytes=source_bytes, **options)
+    _batch_converter.output_dir = Path(output_dir)
+
+
+def _run_batch_worker(style_name: str) -> Tuple[str, str, str, float, float,
+                                                Optional[ConversionMetrics]]:
+    """在工作行程中轉換單一風格"""
+    return _batch_converter._run_style(style_name)
+
+
 def main():
     """命令行介面"""
+    # 批次模式在函數內匯入 (ppt_batch 依賴本模組)
+    from ppt_batch import (add_batch_arguments, add_contrast_arguments, add_media_arguments,
+                           is_batch_pattern, output_limit_bytes, run_batch)
+    
     parser = argparse.ArgumentParser(
         description='PPT 風格自動重新設計工具',
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -307,15 +1277,53 @@ def main():
   # 使用所有風格
   python ppt_style_converter.py input.pptx --all
   
+  # 以 4 個行程平行轉換
+  python ppt_style_converter.py input.pptx --all --workers 4
+  
+  # 顯示各階段耗時、最慢的投影片與記憶體峰值
+  python ppt_style_converter.py input.pptx --styles modern --profile
+  
+  # 大型簡報: 逐張串流轉換，不載入整份簡報
+  python ppt_style_converter.py training_deck.pptx --all --streaming
+  
+  # 縮小過大的圖片並合併重複圖片 (4 個行程)
+  python ppt_style_converter.py input.pptx --all --optimize-media --media-workers 4
+  
+  # 檢查文字對比，並將不足的文字色調整到符合 WCAG AA
+  python ppt_style_converter.py input.pptx --all --fix-contrast
+  
+  # 批次轉換整個目錄 (中斷後加上 --resume 繼續)
+  python ppt_style_converter.py decks/ --recursive --all --workers 4
+  
   # 列出所有可用風格
   python ppt_style_converter.py --list
         '''
     )
     
-    parser.add_argument('input', nargs='?', help='輸入 PPT 檔案路徑')
+    parser.add_argument('input', nargs='*',
+                        help='輸入 PPT 檔案路徑 (多個檔案、目錄或萬用字元時使用批次模式)')
     parser.add_argument('--styles', nargs='+', help='指定風格 (空格分隔)')
     parser.add_argument('--all', action='store_true', help='使用所有風格')
     parser.add_argument('--list', action='store_true', help='列出所有可用風格')
+    parser.add_argument('--workers', type=int, default=1, help='平行處理的行程數 (預設 1)')
+    parser.add_argument('--engine', choices=ENGINES, default=DEFAULT_ENGINE,
+                        help=f'轉換引擎 (預設 {DEFAULT_ENGINE})')
+    parser.add_argument('--no-passthrough', action='store_true',
+                        help='儲存時重新壓縮整個檔案 (不直接複製未修改的項目)')
+    parser.add_argument('--cache-dir', help='啟用轉換快取並指定快取目錄')
+    parser.add_argument('--cache-max-mb', type=int, default=DEFAULT_MAX_BYTES // (1024 * 1024),
+                        help='快取大小上限 (MB)')
+    parser.add_argument('--cache-max-entries', type=int, default=DEFAULT_MAX_ENTRIES,
+                        help='快取項目數上限')
+    parser.add_argument('--no-incremental', action='store_true',
+                        help='每次都完整轉換 (不重用上次輸出中未修改的投影片)')
+    parser.add_argument('--streaming', action='store_true',
+                        help='逐張讀取、轉換並寫入投影片，記憶體峰值與投影片數無關 (大型簡報)')
+    parser.add_argument('--profile', action='store_true',
+                        help='顯示各階段耗時、最慢的投影片與記憶體峰值')
+    add_media_arguments(parser)
+    add_contrast_arguments(parser)
+    add_batch_arguments(parser)
     
     args = parser.parse_args()
     
@@ -336,22 +1344,61 @@ def main():
         print("\n✗ 錯誤: 請指定輸入 PPT 檔案")
         sys.exit(1)
     
-    if not os.path.exists(args.input):
-        print(f"✗ 錯誤: 檔案不存在 - {args.input}")
+    if args.all:
+        styles = list(STYLE_PRESETS.keys())
+    elif args.styles:
+        styles = args.styles
+    else:
+        # 預設: 使用前 2 種風格
+        styles = ['modern', 'minimal']
+    
+    # 多個檔案、目錄或萬用字元: 以 (檔案 × 風格) 工作批次轉換
+    if len(args.input) > 1 or is_batch_pattern(args.input[0]) or args.resume:
+        # 快取索引不支援多個行程同時寫入；批次的工作行程不回傳逐張投影片的效能指標
+        unsupported = [flag for flag, value in (('--cache-dir', args.cache_dir),
+                                                ('--profile', args.profile)) if value]
+        if unsupported:
+            parser.error(f"批次模式 (多個檔案、目錄、萬用字元或 --resume) 不支援 "
+                         f"{' / '.join(unsupported)}")
+        counts = run_batch(args.input, styles, output_root=args.output_dir,
+                           workers=args.workers, engine=args.engine,
+                           passthrough=not args.no_passthrough,
+                           incremental=not args.no_incremental, recursive=args.recursive,
+                           resume=args.resume, manifest_path=args.manifest,
+                           output_max_bytes=output_limit_bytes(args),
+                           output_max_age_days=args.output_max_age_days,
+                           streaming=args.streaming, optimize_media=args.optimize_media,
+                           media_dpi=args.media_dpi, media_workers=args.media_workers,
+                           audit_contrast=args.audit_contrast, fix_contrast=args.fix_contrast)
+        sys.exit(1 if counts['failed'] else 0)
+    
+    input_file = args.input[0]
+    if not os.path.exists(input_file):
+        print(f"✗ 錯誤: 檔案不存在 - {input_file}")
         sys.exit(1)
     
     # 初始化轉換器
-    converter = PPTStyleConverter(args.input)
+    cache = None
+    if args.cache_dir:
+        cache = ConversionCache(args.cache_dir, max_entries=args.cache_max_entries,
+                                max_bytes=args.cache_max_mb * 1024 * 1024)
+    on_metrics = (lambda metrics: print('\n' + metrics.format_report())) if args.profile else None
+    store = OutputStore(args.output_dir, max_bytes=output_limit_bytes(args),
+                        max_age_days=args.output_max_age_days)
+    converter = PPTStyleConverter(input_file, engine=args.engine,
+                                  passthrough=not args.no_passthrough, cache=cache,
+                                  profile=args.profile, on_metrics=on_metrics,
+                                  incremental=not args.no_incremental, store=store,
+                                  streaming=args.streaming,
+                                  optimize_media=args.optimize_media, media_dpi=args.media_dpi,
+                                  media_workers=args.media_workers,
+                                  audit_contrast=args.audit_contrast,
+                                  fix_contrast=args.fix_contrast)
+    converter.output_dir = Path(args.output_dir)
     converter.list_available_styles()
     
     # 執行轉換
-    if args.all:
-        converter.batch_redesign()
-    elif args.styles:
-        converter.batch_redesign(args.styles)
-    else:
-        # 預設: 使用前 2 種風格
-        converter.batch_redesign(['modern', 'minimal'])
+    converter.batch_redesign(styles, workers=args.workers)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,254 @@
+# 風格程式 (Style Program)
+# 將 StylePreset 預先編譯為不可變的規則集合: 色彩與字級先換算好，
+# 選擇器規則 (標題、正文、表格儲存格、圖表文字、佔位符外框/填滿) 每個形狀只比對一次；
+# visit_shapes 單次走訪形狀樹 (含巢狀群組)，依序產生每個符合規則的形狀與其文字
+
+"""
+使用方法:
+    from ppt_style_program import compile_style
+
+    program = compile_style(STYLE_PRESETS['modern'])
+    text_rule, shape_rule = program.match(shape_element)
+
+    for styled in visit_shapes(program, slide.shapes._spTree):
+        for tx_body in styled.text_bodies:
+            ...
+"""
+
+import json
+from dataclasses import asdict
+from typing import Callable, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from lxml import etree
+from pptx.dml.color import RGBColor
+from pptx.oxml.ns import nsmap, qn
+from pptx.util import Pt
+
+from ppt_store import make_key
+
+_XPATH_NS = nsmap('a', 'c', 'p', 'r')
+_XP_SHAPE_NAME = etree.XPath('string(./*[1]/p:cNvPr/@name)', namespaces=_XPATH_NS)
+_XP_PH = etree.XPath('./*[1]/p:nvPr/p:ph', namespaces=_XPATH_NS)
+_XP_HAS_TABLE = etree.XPath('boolean(./a:graphic/a:graphicData/a:tbl)', namespaces=_XPATH_NS)
+_XP_CHART_RID = etree.XPath('string(./a:graphic/a:graphicData/c:chart/@r:id)',
+                            namespaces=_XPATH_NS)
+_XP_CHILD_SHAPES = etree.XPath(
+    './*[self::p:sp or self::p:pic or self::p:graphicFrame or self::p:grpSp]',
+    namespaces=_XPATH_NS)
+_XP_TABLE_CELLS = etree.XPath('./a:graphic/a:graphicData/a:tbl/a:tr/a:tc',
+                              namespaces=_XPATH_NS)
+_XP_CHART_TEXT = etree.XPath('.//c:rich', namespaces=_XPATH_NS)
+
+TAG_SP = qn('p:sp')
+TAG_PIC = qn('p:pic')
+TAG_GRAPHIC_FRAME = qn('p:graphicFrame')
+TAG_GROUP = qn('p:grpSp')
+
+_TITLE_PH_TYPES = ('title', 'ctrTitle')
+
+
+class ShapeFacts(NamedTuple):
+    """選擇器比對所需的形狀資訊 (每個形狀只讀取一次)"""
+    tag: str
+    name: str
+    ph_type: Optional[str]  # 非佔位符為 None；未指定 type 的佔位符為 'obj'
+
+
+def shape_facts(shape_elm) -> ShapeFacts:
+    """讀取形狀元素的標籤、名稱與佔位符類型"""
+    ph = _XP_PH(shape_elm)
+    ph_type = ph[0].get('type', 'obj') if ph else None
+    return ShapeFacts(shape_elm.tag, _XP_SHAPE_NAME(shape_elm), ph_type)
+
+
+# ==================== 選擇器 ====================
+# 每個選擇器接收 ShapeFacts 與形狀元素，回傳是否符合
+
+def _select_title(facts: ShapeFacts, shape_elm) -> bool:
+    return facts.tag == TAG_SP and (facts.ph_type in _TITLE_PH_TYPES or 'Title' in facts.name)
+
+
+def _select_body(facts: ShapeFacts, shape_elm) -> bool:
+    return facts.tag == TAG_SP
+
+
+def _select_table_cell(facts: ShapeFacts, shape_elm) -> bool:
+    return facts.tag == TAG_GRAPHIC_FRAME and _XP_HAS_TABLE(shape_elm)
+
+
+def _select_chart_text(facts: ShapeFacts, shape_elm) -> bool:
+    return facts.tag == TAG_GRAPHIC_FRAME and bool(_XP_CHART_RID(shape_elm))
+
+
+def _select_shape_fill(facts: ShapeFacts, shape_elm) -> bool:
+    return facts.ph_type is not None and facts.tag in (TAG_SP, TAG_PIC)
+
+
+SELECTORS: Dict[str, Callable[[ShapeFacts, object], bool]] = {
+    'title': _select_title,
+    'body': _select_body,
+    'table_cell': _select_table_cell,
+    'chart_text': _select_chart_text,
+    'shape_fill': _select_shape_fill,
+}
+
+
+class StyleRule(NamedTuple):
+    """單一選擇器規則與其預先換算好的值
+
+    文字規則 (target='text') 套用於形狀內所有文字；形狀規則 (target='shape')
+    套用於外框與填滿。值為 None 的欄位不會被修改。
+    """
+    selector: str
+    target: str  # 'text' 或 'shape'
+    # 文字
+    color: Optional[RGBColor] = None
+    color_hex: Optional[str] = None
+    font: Optional[str] = None
+    size: Optional[Pt] = None
+    size_sz: Optional[str] = None  # a:rPr/@sz (百分之一點)
+    bold: Optional[bool] = None
+    # 形狀
+    line_color: Optional[RGBColor] = None
+    line_hex: Optional[str] = None
+    line_width: Optional[Pt] = None
+    fill_color: Optional[RGBColor] = None
+    fill_hex: Optional[str] = None
+
+    def matches(self, facts: ShapeFacts, shape_elm) -> bool:
+        return SELECTORS[self.selector](facts, shape_elm)
+
+
+class StyleProgram(NamedTuple):
+    """編譯後的風格: 背景色與依序比對的規則"""
+    name: str
+    fingerprint: str
+    background: RGBColor
+    background_hex: str
+    rules: Tuple[StyleRule, ...]
+
+    def match(self, shape_elm) -> Tuple[Optional[StyleRule], Optional[StyleRule]]:
+        """比對形狀，回傳 (第一個符合的文字規則, 第一個符合的形狀規則)"""
+        facts = shape_facts(shape_elm)
+        text_match = shape_match = None
+        for rule in self.rules:
+            if rule.target == 'text':
+                if text_match is None and rule.matches(facts, shape_elm):
+                    text_match = rule
+            elif shape_match is None and rule.matches(facts, shape_elm):
+                shape_match = rule
+        return text_match, shape_match
+
+
+class StyledShape(NamedTuple):
+    """visit_shapes 產生的項目: 符合規則的形狀與需要套用文字規則的文字本體"""
+    element: object
+    text_rule: Optional[StyleRule]
+    shape_rule: Optional[StyleRule]
+    text_bodies: Tuple  # p:txBody / a:txBody / c:rich (沒有文字規則時為空)
+
+
+# 取得圖表部件的根元素: 接收圖表的關聯 ID，無法取得時回傳 None
+ChartResolver = Callable[[str], Optional[object]]
+
+
+def _text_bodies(shape_elm, chart_resolver: Optional[ChartResolver]) -> List:
+    """形狀中需要套用文字規則的文字本體"""
+    if shape_elm.tag == TAG_SP:
+        return [shape_elm.get_or_add_txBody()]
+    if _XP_HAS_TABLE(shape_elm):
+        return [tc.get_or_add_txBody() for tc in _XP_TABLE_CELLS(shape_elm)]
+    chart_space = chart_resolver(_XP_CHART_RID(shape_elm)) if chart_resolver else None
+    return _XP_CHART_TEXT(chart_space) if chart_space is not None else []
+
+
+def visit_shapes(program: StyleProgram, shape_tree,
+                 chart_resolver: Optional[ChartResolver] = None) -> Iterator[StyledShape]:
+    """單次走訪形狀樹，依文件順序產生每個符合規則的形狀
+
+    群組 (p:grpSp) 本身不套用規則，但其中的形狀 (含巢狀群組) 會和最上層形狀一樣比對；
+    表格產生所有儲存格的文字本體，圖表產生圖表部件中的 c:rich 文字 (標題、座標軸標題等)。
+
+    Args:
+        program: 已編譯的風格程式
+        shape_tree: p:spTree 或 p:grpSp 元素
+        chart_resolver: 以關聯 ID 取得圖表部件根元素的函數 (None 表示略過圖表文字)
+
+    Yields:
+        StyledShape
+    """
+    stack = list(reversed(_XP_CHILD_SHAPES(shape_tree)))
+    while stack:
+        shape_elm = stack.pop()
+        if shape_elm.tag == TAG_GROUP:
+            stack.extend(reversed(_XP_CHILD_SHAPES(shape_elm)))
+            continue
+        text_rule, shape_rule = program.match(shape_elm)
+        if text_rule is None and shape_rule is None:
+            continue
+        text_bodies = tuple(_text_bodies(shape_elm, chart_resolver)) if text_rule else ()
+        yield StyledShape(shape_elm, text_rule, shape_rule, text_bodies)
+
+
+def style_fingerprint(style) -> str:
+    """風格預設的指紋 (所有欄位內容的雜湊)"""
+    return make_key(json.dumps(asdict(style), sort_keys=True, ensure_ascii=False))
+
+
+def _color(rgb: Tuple[int, int, int]) -> Tuple[RGBColor, str]:
+    """RGB 轉為 RGBColor 與 srgbClr 使用的十六進位字串"""
+    color = RGBColor(*rgb)
+    return color, str(color)
+
+
+def text_rule(selector: str, rgb: Tuple[int, int, int], font: str, size: Optional[int],
+              bold: Optional[bool] = None) -> StyleRule:
+    """建立文字規則 (size 以點為單位，None 表示不修改字級)"""
+    color, color_hex = _color(rgb)
+    if size is None:
+        return StyleRule(selector, 'text', color=color, color_hex=color_hex, font=font,
+                         bold=bold)
+    return StyleRule(selector, 'text', color=color, color_hex=color_hex, font=font,
+                     size=Pt(size), size_sz=str(size * 100), bold=bold)
+
+
+def shape_rule(selector: str, line_rgb: Tuple[int, int, int],
+               fill_rgb: Tuple[int, int, int], line_width: float = 1) -> StyleRule:
+    """建立形狀外框/填滿規則 (line_width 以點為單位)"""
+    line_color, line_hex = _color(line_rgb)
+    fill_color, fill_hex = _color(fill_rgb)
+    return StyleRule(selector, 'shape', line_color=line_color, line_hex=line_hex,
+                     line_width=Pt(line_width), fill_color=fill_color, fill_hex=fill_hex)
+
+
+_programs: Dict[str, StyleProgram] = {}
+
+
+def compile_style(style, extra_rules: Tuple[StyleRule, ...] = ()) -> StyleProgram:
+    """將 StylePreset 編譯為 StyleProgram (依指紋快取)
+
+    Args:
+        style: 風格預設
+        extra_rules: 額外規則 (例如品牌規則)，排在內建規則之前因此優先套用
+
+    Returns:
+        編譯後的風格程式
+    """
+    fingerprint = style_fingerprint(style)
+    if extra_rules:
+        fingerprint = make_key(fingerprint, repr(extra_rules))
+    program = _programs.get(fingerprint)
+    if program is None:
+        background, background_hex = _color(style.background_color)
+        rules = tuple(extra_rules) + (
+            text_rule('title', style.primary_color, style.title_font, style.title_size,
+                      bold=True),
+            text_rule('table_cell', style.text_color, style.body_font, style.body_size),
+            # 圖表文字保留原本的字級 (座標軸標題等通常比正文小)
+            text_rule('chart_text', style.text_color, style.body_font, None),
+            text_rule('body', style.text_color, style.body_font, style.body_size),
+            shape_rule('shape_fill', style.secondary_color, style.accent_color),
+        )
+        program = StyleProgram(style.name, fingerprint, background, background_hex, rules)
+        _programs[fingerprint] = program
+    return program
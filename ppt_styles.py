@@ -0,0 +1,227 @@
+# PPT 風格預設 (Style Presets)
+# 風格只包含色彩、字型與字級等純資料，不依賴 python-pptx；
+# 網頁介面只需列出風格時不必載入轉換器。自訂風格 (例如 ppt_palette.py 產生的品牌風格)
+# 存放於 JSON 檔，載入本模組時合併到 STYLE_PRESETS，所有行程都能使用
+
+"""
+使用方法:
+    from ppt_styles import STYLE_PRESETS
+
+    for name, style in STYLE_PRESETS.items():
+        print(name, style.name, style.primary_color)
+
+    # 新增自訂風格 (下次載入時生效)
+    save_preset('acme', replace(STYLE_PRESETS['modern'], name='Acme Brand'))
+"""
+
+import json
+import os
+import sys
+from dataclasses import asdict, dataclass, fields
+from pathlib import Path
+from typing import Dict, Tuple
+
+# 自訂風格檔 (可用環境變數 PPT_CUSTOM_STYLES 指定其他路徑)
+CUSTOM_STYLES_PATH = Path(os.environ.get('PPT_CUSTOM_STYLES')
+                          or Path(__file__).with_name('custom_styles.json'))
+
+
+@dataclass
+class StylePreset:
+    """設計風格預設配置"""
+    name: str
+    description: str
+    # 色彩方案
+    primary_color: Tuple[int, int, int]      # RGB
+    secondary_color: Tuple[int, int, int]
+    accent_color: Tuple[int, int, int]
+    background_color: Tuple[int, int, int]
+    text_color: Tuple[int, int, int]
+    
+    # 字體設定
+    title_font: str
+    body_font: str
+    title_size: int
+    body_size: int
+    
+    # 其他設定
+    use_background_image: bool
+    gradient_style: str  # 'none', 'horizontal', 'vertical'
+    shadow_enabled: bool
+
+
+# ==================== 風格預設 ====================
+STYLE_PRESETS = {
+    # 1. 現代科技風 (Modern Tech)
+    'modern': StylePreset(
+        name='Modern Tech',
+        description='深藍色主題，簡潔現代感',
+        primary_color=(30, 90, 160),        # 深藍
+        secondary_color=(70, 130, 200),    # 淺藍
+        accent_color=(0, 210, 200),        # 青綠
+        background_color=(245, 245, 245),  # 淺灰
+        text_color=(30, 30, 30),           # 深灰
+        title_font='Arial',
+        body_font='Arial',
+        title_size=44,
+        body_size=18,
+        use_background_image=False,
+        gradient_style='horizontal',
+        shadow_enabled=True,
+    ),
+    
+    # 2. 極簡風格 (Minimal Clean)
+    'minimal': StylePreset(
+        name='Minimal Clean',
+        description='黑白灰色系，極簡設計',
+        primary_color=(0, 0, 0),            # 黑
+        secondary_color=(100, 100, 100),   # 灰
+        accent_color=(255, 100, 0),        # 橙色點綴
+        background_color=(255, 255, 255),  # 白
+        text_color=(50, 50, 50),           # 深灰
+        title_font='Arial',
+        body_font='Arial',
+        title_size=48,
+        body_size=16,
+        use_background_image=False,
+        gradient_style='none',
+        shadow_enabled=False,
+    ),
+    
+    # 3. 企業正式風 (Corporate Professional)
+    'corporate': StylePreset(
+        name='Corporate Professional',
+        description='深紅色主題，專業正式感',
+        primary_color=(200, 40, 40),       # 深紅
+        secondary_color=(240, 100, 100),  # 淺紅
+        accent_color=(200, 150, 50),      # 金色
+        background_color=(250, 250, 250), # 淺灰白
+        text_color=(40, 40, 40),          # 深灰
+        title_font='Calibri',
+        body_font='Calibri',
+        title_size=42,
+        body_size=18,
+        use_background_image=False,
+        gradient_style='vertical',
+        shadow_enabled=True,
+    ),
+    
+    # 4. 創意藝術風 (Creative Artistic)
+    'creative': StylePreset(
+        name='Creative Artistic',
+        description='紫色漸變，創意設計感',
+        primary_color=(150, 80, 200),      # 紫色
+        secondary_color=(100, 150, 255),  # 藍紫
+        accent_color=(255, 200, 100),     # 溫暖黃
+        background_color=(240, 235, 250), # 淺紫灰
+        text_color=(60, 30, 80),          # 深紫灰
+        title_font='Arial',
+        body_font='Arial',
+        title_size=44,
+        body_size=18,
+        use_background_image=False,
+        gradient_style='horizontal',
+        shadow_enabled=True,
+    ),
+    
+    # 5. 清爽自然風 (Fresh Natural)
+    'natural': StylePreset(
+        name='Fresh Natural',
+        description='綠色系主題，清爽自然',
+        primary_color=(50, 140, 80),       # 深綠
+        secondary_color=(100, 180, 120),  # 淺綠
+        accent_color=(240, 150, 50),      # 溫暖橙
+        background_color=(245, 250, 245), # 淺綠灰
+        text_color=(30, 60, 30),          # 深綠灰
+        title_font='Arial',
+        body_font='Arial',
+        title_size=42,
+        body_size=18,
+        use_background_image=False,
+        gradient_style='vertical',
+        shadow_enabled=False,
+    ),
+}
+
+BUILTIN_STYLES = tuple(STYLE_PRESETS)
+
+
+# ==================== 自訂風格 ====================
+
+def _read_custom(path) -> Dict[str, dict]:
+    """讀取自訂風格檔的原始內容 (檔案不存在時回傳空字典；格式錯誤時拋出 ValueError)"""
+    try:
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)  # JSONDecodeError / UnicodeDecodeError 都是 ValueError
+    except FileNotFoundError:
+        return {}
+    if not isinstance(data, dict):
+        raise ValueError("最外層必須是 {風格代號: 風格欄位} 物件")
+    return data
+
+
+def _preset_from_dict(values: dict) -> StylePreset:
+    """由 JSON 欄位建立風格 (缺少欄位拋出 KeyError，型別或色彩值錯誤拋出 TypeError / ValueError)"""
+    values = {field.name: values[field.name] for field in fields(StylePreset)}
+    for name, value in values.items():
+        if name.endswith('_color'):
+            value = tuple(value)
+            if len(value) != 3 or not all(isinstance(c, int) and 0 <= c <= 255 for c in value):
+                raise ValueError(f"{name} 必須是 3 個 0-255 的整數")
+            values[name] = value
+    return StylePreset(**values)
+
+
+def load_presets(path) -> Dict[str, StylePreset]:
+    """讀取自訂風格檔
+
+    檔案或單一風格格式錯誤時只顯示警告並略過，不影響內建風格與其他自訂風格的載入。
+
+    Args:
+        path: JSON 檔案 ({風格代號: StylePreset 欄位})
+
+    Returns:
+        {風格代號: 風格預設}；檔案不存在或無法解析時回傳空字典
+    """
+    try:
+        data = _read_custom(path)
+    except (OSError, ValueError) as e:
+        print(f"⚠️ 無法讀取自訂風格檔 {path}: {e}", file=sys.stderr)
+        return {}
+    presets = {}
+    for key, values in data.items():
+        try:
+            presets[key] = _preset_from_dict(values)
+        except (KeyError, TypeError, ValueError) as e:
+            detail = f"缺少欄位 {e}" if isinstance(e, KeyError) else e
+            print(f"⚠️ 略過自訂風格 {key} ({path}): {detail}", file=sys.stderr)
+    return presets
+
+
+def save_preset(key: str, preset: StylePreset, path=CUSTOM_STYLES_PATH) -> Path:
+    """新增或更新自訂風格 (以暫存檔加替換的方式寫入)
+
+    Args:
+        key: 風格代號 (不可與內建風格相同)
+        preset: 風格預設
+        path: 自訂風格檔
+
+    Returns:
+        寫入的檔案路徑 (風格代號與內建風格相同或現有檔案無法解析時拋出 ValueError)
+    """
+    if key in BUILTIN_STYLES:
+        raise ValueError(f"不可覆寫內建風格: {key}")
+    path = Path(path)
+    # 保留檔案中的其他項目原樣 (包含載入時被略過的項目)；整個檔案無法解析時拋出 ValueError，
+    # 避免覆寫掉使用者的內容
+    presets = _read_custom(path)
+    presets[key] = asdict(preset)
+    tmp_path = path.with_suffix('.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(presets, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+    return path
+
+
+STYLE_PRESETS.update({key: preset for key, preset in load_presets(CUSTOM_STYLES_PATH).items()
+                      if key not in BUILTIN_STYLES})
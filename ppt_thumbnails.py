@@ -0,0 +1,245 @@
+# PPT 投影片縮圖 (Slide Thumbnails)
+# 以 Pillow 依形狀位置、文字框與風格的色彩/字型繪製近似的投影片縮圖，
+# 不需要完整轉換；縮圖依「投影片內容雜湊 + 風格指紋 + 尺寸」存放於 LRU 快取
+
+"""
+使用方法:
+    from ppt_thumbnails import ThumbnailCache
+
+    thumbnails = ThumbnailCache(max_entries=256)
+    png = thumbnails.get_or_render(prs.slides[0], STYLE_PRESETS['modern'],
+                                   prs.slide_width, prs.slide_height)
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from io import BytesIO
+from typing import List, Optional, Tuple
+
+from lxml import etree
+from PIL import Image, ImageDraw, ImageFont
+from pptx.enum.shapes import MSO_SHAPE_TYPE
+from pptx.oxml.ns import qn
+
+from ppt_style_program import StyleProgram, StyleRule, compile_style
+
+DEFAULT_WIDTH = 320
+DEFAULT_MAX_ENTRIES = 256
+
+_TEXT_INSET = 91440  # 文字框內距 0.1 吋 (EMU)
+_EMU_PER_POINT = 12700
+_DEFAULT_TEXT_SIZE = 18  # 點 (未套用風格且未指定大小的文字)
+_DEFAULT_TEXT_COLOR = (64, 64, 64)
+_PLACEHOLDER_COLOR = (200, 200, 200)
+# 風格字型不存在時依序嘗試的字型 (含中文字型)
+_FALLBACK_FONTS = (
+    'NotoSansCJK-Regular.ttc', 'NotoSansTC-Regular.otf', 'msjh.ttc', 'PingFang.ttc',
+    'wqy-microhei.ttc', 'Arial.ttf', 'DejaVuSans.ttf',
+)
+
+# (x 位移, y 位移, x 比例, y 比例)：EMU 座標轉換為縮圖像素
+Transform = Tuple[float, float, float, float]
+
+
+def slide_hash(slide) -> str:
+    """投影片 XML 內容的雜湊 (內容不變時縮圖可以重用)"""
+    return hashlib.sha256(etree.tostring(slide._element)).hexdigest()
+
+
+@lru_cache(maxsize=128)
+def _load_font(name: Optional[str], size: int) -> ImageFont.ImageFont:
+    """依名稱載入字型，找不到時使用備用字型"""
+    candidates = (name, f"{name}.ttf", f"{name}.ttc") if name else ()
+    for candidate in candidates + _FALLBACK_FONTS:
+        try:
+            return ImageFont.truetype(candidate, size)
+        except OSError:
+            continue
+    return ImageFont.load_default(size)
+
+
+def _wrap(text: str, font, max_width: float) -> List[str]:
+    """依寬度逐字換行 (中文沒有空白可斷行)"""
+    lines, line = [], ''
+    for char in text:
+        if line and font.getlength(line + char) > max_width:
+            lines.append(line)
+            line = char
+        else:
+            line += char
+    if line:
+        lines.append(line)
+    return lines
+
+
+def _group_transform(group, outer: Transform) -> Transform:
+    """群組內形狀使用子座標系 (chOff / chExt)，換算為縮圖座標"""
+    xfrm = group._element.grpSpPr.find(qn('a:xfrm'))
+    ch_off = xfrm.find(qn('a:chOff')) if xfrm is not None else None
+    ch_ext = xfrm.find(qn('a:chExt')) if xfrm is not None else None
+    if ch_off is None or ch_ext is None or not int(ch_ext.get('cx')) or not int(ch_ext.get('cy')):
+        return outer
+    ox, oy, sx, sy = outer
+    scale_x = group.width / int(ch_ext.get('cx'))
+    scale_y = group.height / int(ch_ext.get('cy'))
+    return (ox + (group.left - int(ch_off.get('x')) * scale_x) * sx,
+            oy + (group.top - int(ch_off.get('y')) * scale_y) * sy,
+            sx * scale_x, sy * scale_y)
+
+
+def _box(shape, transform: Transform) -> Optional[Tuple[float, float, float, float]]:
+    """形狀在縮圖中的範圍 (左, 上, 右, 下)；沒有位置資訊時回傳 None"""
+    if shape.left is None or shape.width is None:
+        return None
+    ox, oy, sx, sy = transform
+    left, top = ox + shape.left * sx, oy + shape.top * sy
+    return left, top, left + shape.width * sx, top + shape.height * sy
+
+
+def _draw_text(draw: ImageDraw.ImageDraw, box, paragraphs: List[str],
+               rule: Optional[StyleRule], scale: float):
+    """在範圍內繪製文字 (超出範圍的行不繪製)"""
+    size_pt = rule.size.pt if rule is not None and rule.size is not None else _DEFAULT_TEXT_SIZE
+    font_px = max(6, int(size_pt * _EMU_PER_POINT * scale))
+    font = _load_font(rule.font if rule is not None else None, font_px)
+    color = tuple(rule.color) if rule is not None and rule.color is not None \
+        else _DEFAULT_TEXT_COLOR
+    stroke = 1 if rule is not None and rule.bold and font_px >= 16 else 0
+
+    inset = _TEXT_INSET * scale
+    left, top, right, bottom = box
+    y = top + inset
+    line_height = font_px * 1.2
+    for paragraph in paragraphs:
+        for line in _wrap(paragraph, font, max(1.0, right - left - 2 * inset)) or ['']:
+            if y + line_height > bottom + line_height / 2:
+                return
+            draw.text((left + inset, y), line, fill=color, font=font,
+                      stroke_width=stroke, stroke_fill=color)
+            y += line_height
+
+
+def _draw_picture(canvas: Image.Image, shape, box):
+    """將圖片縮小後貼上 (無法讀取時以灰色方塊代替)"""
+    left, top, right, bottom = (int(round(value)) for value in box)
+    size = (max(1, right - left), max(1, bottom - top))
+    try:
+        image = Image.open(BytesIO(shape.image.blob))
+        image.draft('RGB', size)  # JPEG 直接以較低解析度解碼
+        canvas.paste(image.convert('RGB').resize(size), (left, top))
+    except Exception:
+        ImageDraw.Draw(canvas).rectangle((left, top, right, bottom), fill=_PLACEHOLDER_COLOR)
+
+
+def _draw_shapes(canvas: Image.Image, shapes, program: StyleProgram, transform: Transform):
+    """依序繪製形狀 (群組內的形狀和最上層形狀一樣套用風格規則)"""
+    draw = ImageDraw.Draw(canvas)
+    scale = transform[2]
+    for shape in shapes:
+        if shape.shape_type == MSO_SHAPE_TYPE.GROUP:
+            _draw_shapes(canvas, shape.shapes, program, _group_transform(shape, transform))
+            continue
+
+        box = _box(shape, transform)
+        if box is None:
+            continue
+        text_rule, shape_rule = program.match(shape._element)
+
+        if shape.shape_type == MSO_SHAPE_TYPE.PICTURE:
+            _draw_picture(canvas, shape, box)
+        elif shape_rule is not None:
+            fill = tuple(shape_rule.fill_color) if shape_rule.fill_color is not None else None
+            outline = tuple(shape_rule.line_color) if shape_rule.line_color is not None else None
+            draw.rectangle(box, fill=fill, outline=outline)
+
+        if shape.has_text_frame:
+            paragraphs = [paragraph.text for paragraph in shape.text_frame.paragraphs]
+            _draw_text(draw, box, paragraphs, text_rule, scale)
+        elif getattr(shape, 'has_table', False) and shape.has_table:
+            _draw_table(draw, shape.table, box, text_rule, scale)
+
+
+def _draw_table(draw: ImageDraw.ImageDraw, table, box, rule: Optional[StyleRule],
+                scale: float):
+    """以格線與儲存格文字近似表格"""
+    left, top, right, bottom = box
+    rows, cols = len(table.rows), len(table.columns)
+    if not rows or not cols:
+        return
+    cell_w, cell_h = (right - left) / cols, (bottom - top) / rows
+    line_color = tuple(rule.color) if rule is not None and rule.color is not None \
+        else _DEFAULT_TEXT_COLOR
+    for row_idx in range(rows):
+        for col_idx in range(cols):
+            cell_box = (left + col_idx * cell_w, top + row_idx * cell_h,
+                        left + (col_idx + 1) * cell_w, top + (row_idx + 1) * cell_h)
+            draw.rectangle(cell_box, outline=line_color)
+            _draw_text(draw, cell_box, [table.cell(row_idx, col_idx).text], rule, scale)
+
+
+def render_thumbnail(slide, style, slide_width: int, slide_height: int,
+                     width: int = DEFAULT_WIDTH) -> Image.Image:
+    """繪製套用風格後的近似縮圖
+
+    Args:
+        slide: 原始投影片 (不會被修改)
+        style: 風格預設或已編譯的風格程式
+        slide_width: 投影片寬度 (EMU)
+        slide_height: 投影片高度 (EMU)
+        width: 縮圖寬度 (像素)
+
+    Returns:
+        縮圖影像
+    """
+    program = style if isinstance(style, StyleProgram) else compile_style(style)
+    scale = width / slide_width
+    canvas = Image.new('RGB', (width, max(1, int(round(slide_height * scale)))),
+                       tuple(program.background))
+    _draw_shapes(canvas, slide.shapes, program, (0.0, 0.0, scale, scale))
+    return canvas
+
+
+class ThumbnailCache:
+    """縮圖 LRU 快取 (PNG 位元組)，鍵為投影片內容雜湊、風格指紋與尺寸"""
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: 'OrderedDict[Tuple, bytes]' = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_or_render(self, slide, style, slide_width: int, slide_height: int,
+                      width: int = DEFAULT_WIDTH) -> bytes:
+        """取得縮圖，未快取時繪製
+
+        Args:
+            slide: 原始投影片
+            style: 風格預設或已編譯的風格程式
+            slide_width: 投影片寬度 (EMU)
+            slide_height: 投影片高度 (EMU)
+            width: 縮圖寬度 (像素)
+
+        Returns:
+            PNG 檔案內容
+        """
+        program = style if isinstance(style, StyleProgram) else compile_style(style)
+        key = (slide_hash(slide), program.fingerprint, slide_width, slide_height, width)
+        with self._lock:
+            png = self._entries.get(key)
+            if png is not None:
+                self._entries.move_to_end(key)
+                return png
+
+        buffer = BytesIO()
+        render_thumbnail(slide, program, slide_width, slide_height, width).save(buffer, 'PNG')
+        png = buffer.getvalue()
+        with self._lock:
+            self._entries[key] = png
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return png
@@ -6,16 +6,25 @@ PPT 風格轉換工具 - Streamlit 版本
 現代化 Web UI，支援實時轉換、進度顯示、檔案下載
 
 使用: streamlit run streamlit_ppt_converter.py
+
+每次操作元件都會重新執行整個腳本，因此:
+- 衍生資料 (風格列表、輸出檔案表) 以 st.cache_data 快取，鍵包含其來源的版本
+- 分頁只在開啟時執行內容
+- python-pptx 與 pandas 只在需要時才載入 (效能預算見 ppt_benchmark.py --app)
 """
 
+import time
+_RUN_STARTED = time.perf_counter()
+
 import streamlit as st
 import os
 import sys
 from pathlib import Path
 from datetime import datetime
-import tempfile
+from importlib.util import find_spec
+import zipfile
 from io import BytesIO
-import pandas as pd
+from typing import Dict, List, Tuple
 
 # 頁面配置
 st.set_page_config(
@@ -52,351 +61,555 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+OUTPUT_LIST_LIMIT = 200  # 統計頁最多列出的輸出檔案數
+DEFAULT_STYLES = ['modern', 'minimal']
+REQUIRED_MODULES = {'pptx': 'python-pptx', 'PIL': 'pillow', 'lxml': 'lxml'}
+
 # ==================== 初始化 Session State ====================
 if 'converted_files' not in st.session_state:
     st.session_state.converted_files = []
 
+if 'converted_bundle' not in st.session_state:
+    st.session_state.converted_bundle = None
+
 if 'conversion_complete' not in st.session_state:
     st.session_state.conversion_complete = False
 
 if 'current_styles' not in st.session_state:
-    st.session_state.current_styles = []
+    st.session_state.current_styles = list(DEFAULT_STYLES)
+
+if 'conversion_metrics' not in st.session_state:
+    st.session_state.conversion_metrics = []
+
+if 'current_job_id' not in st.session_state:
+    st.session_state.current_job_id = None
+
+if 'result_job_id' not in st.session_state:
+    st.session_state.result_job_id = None
+
+# 上傳的檔案 (上傳元件所在分頁未開啟時元件狀態會被清除，檔案另外保留)
+if 'uploaded_deck' not in st.session_state:
+    st.session_state.uploaded_deck = None
 
 # ==================== 檢查依賴 ====================
 @st.cache_resource
 def check_dependencies():
-    """檢查並載入必要的依賴"""
-    try:
-        from ppt_style_converter import PPTStyleConverter, STYLE_PRESETS
-        return True, PPTStyleConverter, STYLE_PRESETS
-    except ImportError as e:
-        return False, None, None
+    """檢查必要的依賴 (只確認套件存在，不載入轉換器)，回傳 (是否齊全, 缺少的套件, 風格預設)"""
+    missing = [package for module, package in REQUIRED_MODULES.items()
+               if find_spec(module) is None]
+    from ppt_styles import STYLE_PRESETS
+    return not missing, missing, STYLE_PRESETS
+
+
+@st.cache_resource
+def get_conversion_cache():
+    """取得所有使用者共用的轉換快取 (相同檔案與風格直接回傳先前結果)"""
+    from ppt_store import ConversionCache
+    return ConversionCache()
+
+
+@st.cache_resource
+def get_job_manager():
+    """取得所有使用者共用的背景轉換工作管理 (頁面重新執行後工作仍然存在)"""
+    from ppt_jobs import JobManager
+    return JobManager(cache=get_conversion_cache())
+
+
+@st.cache_resource
+def get_output_store():
+    """取得輸出目錄索引 (統計頁讀取索引，不掃描目錄；其他行程新增的輸出以增量方式讀入)"""
+    from ppt_store import OutputStore
+    return OutputStore('./redesigned_ppts')
+
+
+@st.cache_resource
+def get_thumbnail_cache():
+    """取得所有使用者共用的縮圖快取 (相同投影片與風格的縮圖只繪製一次)"""
+    from ppt_thumbnails import ThumbnailCache
+    return ThumbnailCache()
+
+
+@st.cache_resource(max_entries=4)
+def load_preview_deck(file_id: str, _data: bytes):
+    """解析預覽用的簡報 (以上傳檔案 ID 為鍵，重新執行頁面時不重複解析)"""
+    from pptx import Presentation
+    return Presentation(BytesIO(_data))
+
+# ==================== 衍生資料 (快取) ====================
+@st.cache_data
+def styles_table(signature: Tuple[Tuple, ...]) -> str:
+    """側邊欄的風格列表 (Markdown 表格，不需載入 pandas)
+
+    Args:
+        signature: 每種風格的 (代號, 名稱, 描述, 主色)；風格預設變動時快取失效
+    """
+    lines = ['| 風格 | 名稱 | 描述 | 主色 |', '| --- | --- | --- | --- |']
+    for style_name, name, description, primary_color in signature:
+        lines.append(f"| {style_name.upper()} | {name} | {description} | RGB{primary_color} |")
+    return '\n'.join(lines)
+
+
+def styles_signature(presets) -> Tuple[Tuple, ...]:
+    """風格列表的快取鍵"""
+    return tuple((style_name, style.name, style.description, tuple(style.primary_color))
+                 for style_name, style in presets.items())
+
+
+@st.cache_data(max_entries=8)
+def output_table(_store, version: Tuple, limit: int) -> Tuple[List[Dict], int, int]:
+    """統計頁的輸出檔案表 (索引版本不變時不重新讀取與排序)
+
+    Args:
+        _store: 輸出目錄索引 (不參與快取鍵)
+        version: 索引的版本
+        limit: 最多列出的檔案數
+
+    Returns:
+        (表格資料, 檔案總數, 總大小)
+    """
+    rows = []
+    for entry in _store.entries(limit=limit):
+        rows.append({
+            '檔案名': entry['file'],
+            '風格': entry['style'] or '—',
+            '大小 (KB)': f"{entry['size'] / 1024:.1f}",
+            '耗時 (秒)': f"{entry['seconds']:.2f}" if entry['seconds'] is not None else '—',
+            '建立時間': datetime.fromtimestamp(entry['created']).strftime("%Y-%m-%d %H:%M")
+        })
+    return rows, len(_store), _store.total_bytes
 
 # ==================== 主應用 ====================
 def main():
     # 標題
     col1, col2, col3 = st.columns([1, 2, 1])
     with col2:
-        st.markdown("<div class='main-header'>🎨 PPT 風格轉換工具</div>", 
+        st.markdown("<div class='main-header'>🎨 PPT 風格轉換工具</div>",
                    unsafe_allow_html=True)
-        st.markdown("<p style='text-align: center; color: #666;'>自動重新設計 PowerPoint 演講風格</p>", 
+        st.markdown("<p style='text-align: center; color: #666;'>自動重新設計 PowerPoint 演講風格</p>",
                    unsafe_allow_html=True)
-    
+
     # 檢查依賴
-    deps_ok, PPTStyleConverter, STYLE_PRESETS = check_dependencies()
-    
+    deps_ok, missing, STYLE_PRESETS = check_dependencies()
+
     if not deps_ok:
         st.error("❌ 缺少必要的依賴！")
-        st.info("請執行: pip install python-pptx pillow")
+        st.info(f"請執行: pip install {' '.join(missing)}")
         return
-    
+
     # ==================== 側邊欄 ====================
     with st.sidebar:
         st.markdown("### ⚙️ 設定")
-        
+
+        profile_memory = st.checkbox(
+            "🔬 記錄記憶體峰值",
+            value=False,
+            help="以 tracemalloc 量測每種風格的記憶體峰值 (轉換會變慢)"
+        )
+
         # 顯示可用風格
         st.markdown("#### 🎨 可用風格")
-        styles_info = []
-        for style_name, style in STYLE_PRESETS.items():
-            styles_info.append({
-                '風格': style_name.upper(),
-                '名稱': style.name,
-                '描述': style.description,
-                '主色': f"RGB{style.primary_color}"
-            })
-        
-        styles_df = pd.DataFrame(styles_info)
-        st.dataframe(styles_df, use_container_width=True, hide_index=True)
-        
+        st.markdown(styles_table(styles_signature(STYLE_PRESETS)))
+
         # 版本資訊
         st.markdown("---")
         st.markdown("**版本**: 1.0 Streamlit Edition")
         st.markdown("**最後更新**: 2025-01-04")
         st.markdown("**作者**: AI Assistant")
-    
+
     # ==================== 主要內容 ====================
-    
-    # 三個選項卡
+
+    # 四個選項卡 (切換分頁時重新執行，只執行開啟中的分頁)
     tab1, tab2, tab3, tab4 = st.tabs(
-        ["🚀 快速開始", "📤 上傳 PPT", "📊 統計", "ℹ️ 說明"]
+        ["🚀 快速開始", "📤 上傳 PPT", "📊 統計", "ℹ️ 說明"],
+        key='main_tab', on_change='rerun'
     )
-    
-    # ========== TAB 1: 快速開始 ==========
+
     with tab1:
-        st.markdown("## 快速開始")
-        
-        col1, col2 = st.columns(2)
-        
-        with col1:
-            st.markdown("### 📄 建立示例 PPT")
-            st.write("點擊下方按鈕自動建立示例演講檔案。")
-            
-            if st.button("✨ 建立示例 PPT", use_container_width=True):
-                with st.spinner("正在建立示例 PPT..."):
-                    sample_file = create_sample_ppt()
-                    st.success(f"✅ 示例 PPT 已建立: {sample_file}")
-                    st.info(f"檔案位置: {Path(sample_file).absolute()}")
-        
-        with col2:
-            st.markdown("### 🎯 選擇轉換風格")
-            
-            # 風格選擇
-            available_styles = list(STYLE_PRESETS.keys())
-            default_styles = ['modern', 'minimal']
-            
-            selected_styles = st.multiselect(
-                "選擇要轉換的風格:",
-                options=available_styles,
-                default=default_styles,
-                help="可選擇多個風格，同時產生多個版本"
-            )
-            
-            st.session_state.current_styles = selected_styles
-        
-        # 預覽選定的風格
-        if st.session_state.current_styles:
-            st.markdown("### 📋 選定風格預覽")
-            cols = st.columns(min(len(st.session_state.current_styles), 3))
-            
-            for idx, style_name in enumerate(st.session_state.current_styles):
-                style = STYLE_PRESETS[style_name]
-                with cols[idx % 3]:
-                    with st.container():
-                        # 色彩預覽
-                        primary_rgb = f"rgb({style.primary_color[0]},{style.primary_color[1]},{style.primary_color[2]})"
-                        st.markdown(f"""
-                        <div style='
-                            background-color: {primary_rgb};
-                            padding: 20px;
-                            border-radius: 10px;
-                            color: white;
-                            text-align: center;
-                            margin-bottom: 10px;
-                        '>
-                            <strong>{style_name.upper()}</strong><br/>
-                            {style.name}
-                        </div>
-                        """, unsafe_allow_html=True)
-                        st.caption(style.description)
-    
-    # ========== TAB 2: 上傳 PPT ==========
+        if tab1.open:
+            show_quick_start(STYLE_PRESETS)
+
     with tab2:
-        st.markdown("## 上傳並轉換 PPT")
-        
-        col1, col2 = st.columns([2, 1])
-        
-        with col1:
-            # 檔案上傳
-            uploaded_file = st.file_uploader(
-                "選擇 PPT 檔案",
-                type=['pptx', 'ppt'],
-                help="支援 .pptx 和 .ppt 格式"
-            )
-        
-        with col2:
-            st.markdown("### 📊 檔案資訊")
-            if uploaded_file:
-                file_size = len(uploaded_file.getbuffer()) / 1024 / 1024
-                st.info(f"檔案大小: {file_size:.2f} MB")
-        
-        # 轉換操作
-        if uploaded_file and st.session_state.current_styles:
-            st.markdown("---")
-            
-            col1, col2, col3 = st.columns([1, 1, 1])
-            
-            with col2:
-                if st.button("🔄 開始轉換", use_container_width=True, type="primary"):
-                    with st.spinner("正在轉換..."):
-                        progress_bar = st.progress(0)
-                        status_text = st.empty()
-                        
-                        try:
-                            # 臨時儲存上傳的檔案
-                            with tempfile.NamedTemporaryFile(
-                                delete=False, 
-                                suffix='.pptx'
-                            ) as tmp:
-                                tmp.write(uploaded_file.getbuffer())
-                                tmp_path = tmp.name
-                            
-                            # 執行轉換
-                            converter = PPTStyleConverter(tmp_path)
-                            output_files = converter.batch_redesign(
-                                st.session_state.current_styles
-                            )
-                            
-                            # 更新進度
-                            progress_bar.progress(100)
-                            st.session_state.converted_files = output_files
-                            st.session_state.conversion_complete = True
-                            
-                            # 清理臨時檔案
-                            os.remove(tmp_path)
-                            
-                            st.success("✅ 轉換完成！")
-                            
-                        except Exception as e:
-                            st.error(f"❌ 轉換失敗: {str(e)}")
-                            if os.path.exists(tmp_path):
-                                os.remove(tmp_path)
-        
-        elif uploaded_file and not st.session_state.current_styles:
-            st.warning("⚠️ 請先在「快速開始」頁籤中選擇轉換風格")
-        
-        # 顯示轉換結果
-        if st.session_state.conversion_complete and st.session_state.converted_files:
-            st.markdown("---")
-            st.markdown("### 📥 轉換結果")
-            
-            for idx, output_file in enumerate(st.session_state.converted_files, 1):
-                if os.path.exists(output_file):
-                    file_size = os.path.getsize(output_file) / 1024
-                    filename = Path(output_file).name
-                    
-                    col1, col2 = st.columns([3, 1])
-                    
-                    with col1:
-                        st.markdown(f"**{idx}. {filename}**")
-                        st.caption(f"大小: {file_size:.1f} KB")
-                    
-                    with col2:
-                        # 下載按鈕
-                        with open(output_file, 'rb') as f:
-                            st.download_button(
-                                label="⬇️ 下載",
-                                data=f.read(),
-                                file_name=filename,
-                                mime="application/vnd.openxmlformats-officedocument.presentationml.presentation",
-                                use_container_width=True
-                            )
-    
-    # ========== TAB 3: 統計 ==========
+        if tab2.open:
+            show_upload(profile_memory)
+
     with tab3:
-        st.markdown("## 轉換統計")
-        
-        col1, col2, col3, col4 = st.columns(4)
-        
-        with col1:
-            st.metric("🎨 可用風格", len(STYLE_PRESETS))
-        
-        with col2:
-            # 計算已轉換檔案
-            output_dir = Path('./redesigned_ppts')
-            if output_dir.exists():
-                converted_count = len(list(output_dir.glob('*.pptx')))
-            else:
-                converted_count = 0
-            st.metric("📄 已轉換檔案", converted_count)
-        
-        with col3:
-            st.metric("⚡ 轉換時間", "~0.5秒/個")
-        
-        with col4:
-            st.metric("💾 支援大小", "無限制")
-        
-        st.markdown("---")
-        
-        # 已轉換檔案列表
-        st.markdown("### 📁 已轉換的檔案")
-        
-        output_dir = Path('./redesigned_ppts')
-        if output_dir.exists():
-            files = sorted(list(output_dir.glob('*.pptx')))
-            
-            if files:
-                file_data = []
-                for file in files:
-                    size_kb = file.stat().st_size / 1024
-                    created = datetime.fromtimestamp(file.stat().st_ctime)
-                    file_data.append({
-                        '檔案名': file.name,
-                        '大小 (KB)': f"{size_kb:.1f}",
-                        '建立時間': created.strftime("%Y-%m-%d %H:%M")
-                    })
-                
-                df = pd.DataFrame(file_data)
-                st.dataframe(df, use_container_width=True, hide_index=True)
-            else:
-                st.info("尚未有轉換檔案")
+        if tab3.open:
+            show_stats(STYLE_PRESETS)
+
+    with tab4:
+        if tab4.open:
+            show_help()
+
+
+# ==================== 分頁 ====================
+
+def show_quick_start(STYLE_PRESETS):
+    """TAB 1: 快速開始"""
+    st.markdown("## 快速開始")
+
+    col1, col2 = st.columns(2)
+
+    with col1:
+        st.markdown("### 📄 建立示例 PPT")
+        st.write("點擊下方按鈕自動建立示例演講檔案。")
+
+        if st.button("✨ 建立示例 PPT", use_container_width=True):
+            with st.spinner("正在建立示例 PPT..."):
+                sample_file = create_sample_ppt()
+                st.success(f"✅ 示例 PPT 已建立: {sample_file}")
+                st.info(f"檔案位置: {Path(sample_file).absolute()}")
+
+    with col2:
+        st.markdown("### 🎯 選擇轉換風格")
+
+        # 風格選擇 (分頁關閉後元件狀態會被清除，重新開啟時還原先前的選擇)
+        available_styles = list(STYLE_PRESETS.keys())
+        if 'style_select' not in st.session_state:
+            st.session_state.style_select = [name for name in st.session_state.current_styles
+                                             if name in STYLE_PRESETS]
+
+        selected_styles = st.multiselect(
+            "選擇要轉換的風格:",
+            options=available_styles,
+            key='style_select',
+            help="可選擇多個風格，同時產生多個版本"
+        )
+
+        st.session_state.current_styles = selected_styles
+
+    # 預覽選定的風格
+    if st.session_state.current_styles:
+        st.markdown("### 📋 選定風格預覽")
+        cols = st.columns(min(len(st.session_state.current_styles), 3))
+
+        for idx, style_name in enumerate(st.session_state.current_styles):
+            style = STYLE_PRESETS[style_name]
+            with cols[idx % 3]:
+                with st.container():
+                    # 色彩預覽
+                    primary_rgb = f"rgb({style.primary_color[0]},{style.primary_color[1]},{style.primary_color[2]})"
+                    st.markdown(f"""
+                    <div style='
+                        background-color: {primary_rgb};
+                        padding: 20px;
+                        border-radius: 10px;
+                        color: white;
+                        text-align: center;
+                        margin-bottom: 10px;
+                    '>
+                        <strong>{style_name.upper()}</strong><br/>
+                        {style.name}
+                    </div>
+                    """, unsafe_allow_html=True)
+                    st.caption(style.description)
+
+        # 投影片縮圖預覽 (使用上傳的簡報)
+        uploaded_preview = st.session_state.uploaded_deck
+        if uploaded_preview is not None and uploaded_preview.name.lower().endswith('.pptx'):
+            try:
+                prs = load_preview_deck(uploaded_preview.file_id, uploaded_preview.getvalue())
+            except Exception as e:
+                st.warning(f"無法預覽簡報: {e}")
+                prs = None
+            if prs is not None and len(prs.slides):
+                slide_number = 1
+                if len(prs.slides) > 1:
+                    slide_number = st.slider("預覽投影片", 1, len(prs.slides), 1)
+                slide = prs.slides[slide_number - 1]
+                thumbnails = get_thumbnail_cache()
+                thumb_cols = st.columns(min(len(st.session_state.current_styles), 3))
+                for idx, style_name in enumerate(st.session_state.current_styles):
+                    png = thumbnails.get_or_render(slide, STYLE_PRESETS[style_name],
+                                                   prs.slide_width, prs.slide_height)
+                    with thumb_cols[idx % 3]:
+                        st.image(png, caption=style_name, use_container_width=True)
         else:
-            st.info("輸出目錄不存在")
-        
-        # 效能資訊
+            st.caption("💡 在「上傳 PPT」分頁上傳 .pptx 後，這裡會顯示套用風格的投影片縮圖")
+
+
+def remember_upload():
+    """上傳元件變更 (上傳或移除檔案) 時保留目前的檔案"""
+    st.session_state.uploaded_deck = st.session_state.uploaded_pptx
+
+
+def show_upload(profile_memory: bool):
+    """TAB 2: 上傳 PPT"""
+    st.markdown("## 上傳並轉換 PPT")
+
+    col1, col2 = st.columns([2, 1])
+
+    with col1:
+        # 檔案上傳
+        st.file_uploader(
+            "選擇 PPT 檔案",
+            type=['pptx', 'ppt'],
+            help="支援 .pptx 和 .ppt 格式",
+            key='uploaded_pptx',
+            on_change=remember_upload
+        )
+        uploaded_file = st.session_state.uploaded_deck
+        if uploaded_file is not None and st.session_state.uploaded_pptx is None:
+            st.caption(f"📎 目前檔案: {uploaded_file.name} (重新上傳可替換)")
+
+    with col2:
+        st.markdown("### 📊 檔案資訊")
+        if uploaded_file:
+            file_size = uploaded_file.size / 1024 / 1024
+            st.info(f"檔案大小: {file_size:.2f} MB")
+
+    # 轉換操作
+    if uploaded_file and st.session_state.current_styles:
         st.markdown("---")
-        st.markdown("### ⚡ 效能資訊")
-        
-        perf_data = {
-            '操作': ['單個轉換', '5 風格批量', '平行處理 (4)', 'Web API'],
-            '時間': ['~0.5秒', '~2.5秒', '~1.2秒', '~1.0秒'],
-            '記憶體': ['~50MB', '~100MB', '~200MB', '~100MB']
-        }
-        
-        perf_df = pd.DataFrame(perf_data)
-        st.dataframe(perf_df, use_container_width=True, hide_index=True)
-    
-    # ========== TAB 4: 說明 ==========
-    with tab4:
-        st.markdown("## 使用說明")
-        
+
+        col1, col2, col3 = st.columns([1, 1, 1])
+
+        manager = get_job_manager()
+        current_job = (manager.get(st.session_state.current_job_id)
+                       if st.session_state.current_job_id else None)
+
+        with col2:
+            # 工作執行中時停用按鈕；相同檔案與風格的工作只會執行一次
+            if st.button("🔄 開始轉換", use_container_width=True, type="primary",
+                         disabled=current_job is not None and current_job.active):
+                # 轉換在背景執行，頁面不會凍結
+                # 多種風格時只分析一次簡報 (fanout 引擎，輸出與預設引擎相同)
+                job = manager.submit(
+                    bytes(uploaded_file.getbuffer()),
+                    uploaded_file.name,
+                    st.session_state.current_styles,
+                    engine='fanout' if len(st.session_state.current_styles) > 1 else 'lxml',
+                    profile=profile_memory
+                )
+                st.session_state.current_job_id = job.job_id
+                st.rerun()
+
+    elif uploaded_file and not st.session_state.current_styles:
+        st.warning("⚠️ 請先在「快速開始」頁籤中選擇轉換風格")
+
+    # 背景工作進度 (不依賴上傳元件，頁面重新執行後仍會顯示)
+    show_job_status()
+
+    # 顯示轉換結果
+    if st.session_state.conversion_complete and st.session_state.converted_files:
+        st.markdown("---")
+        st.markdown("### 📥 轉換結果")
+
+        for idx, (filename, size) in enumerate(st.session_state.converted_files, 1):
+            st.markdown(f"**{idx}. {filename}**")
+            st.caption(f"大小: {size / 1024:.1f} KB")
+
+        bundle = st.session_state.converted_bundle
         col1, col2 = st.columns(2)
-        
+
         with col1:
-            st.markdown("### 🎯 快速開始")
-            st.markdown("""
-            1. **建立示例** - 點擊「建立示例 PPT」按鈕
-            2. **選擇風格** - 選擇要轉換的設計風格
-            3. **上傳檔案** - 上傳你的 PPT 檔案
-            4. **開始轉換** - 點擊「開始轉換」按鈕
-            5. **下載結果** - 下載轉換後的 PPT
-            """)
-        
+            # 所有風格打包為單一 ZIP 下載
+            st.download_button(
+                label="📦 下載全部 (ZIP)",
+                data=bundle,
+                file_name="redesigned_ppts.zip",
+                mime="application/zip",
+                use_container_width=True
+            )
+
         with col2:
-            st.markdown("### 🎨 5 種風格")
-            st.markdown("""
-            - **Modern** - 現代科技風，適合技術演講
-            - **Minimal** - 極簡風格，清爽設計
-            - **Corporate** - 企業正式風，專業感
-            - **Creative** - 創意藝術風，充滿活力
-            - **Natural** - 清爽自然風，舒適感
-            """)
-        
-        st.markdown("---")
-        
-        st.markdown("### 💡 進階技巧")
+            # 單一檔案只在選定時從 ZIP 中取出 (未壓縮存放，讀取成本低)
+            filenames = [filename for filename, _ in st.session_state.converted_files]
+            selected_file = st.selectbox("單獨下載:", filenames)
+            with zipfile.ZipFile(BytesIO(bundle)) as zf:
+                selected_data = zf.read(selected_file)
+            st.download_button(
+                label="⬇️ 下載",
+                data=selected_data,
+                file_name=selected_file,
+                mime="application/vnd.openxmlformats-officedocument.presentationml.presentation",
+                use_container_width=True
+            )
+
+
+def show_stats(STYLE_PRESETS):
+    """TAB 3: 統計"""
+    st.markdown("## 轉換統計")
+
+    metrics_list = st.session_state.conversion_metrics
+    rendered = [metrics for metrics in metrics_list if not metrics.cached]
+    store = get_output_store()
+    file_data, file_count, total_bytes = output_table(store, store.version, OUTPUT_LIST_LIMIT)
+
+    col1, col2, col3, col4 = st.columns(4)
+
+    with col1:
+        st.metric("🎨 可用風格", len(STYLE_PRESETS))
+
+    with col2:
+        # 計算已轉換檔案
+        st.metric("📄 已轉換檔案", file_count)
+
+    with col3:
+        if rendered:
+            average = sum(metrics.total_seconds for metrics in rendered) / len(rendered)
+            st.metric("⚡ 轉換時間", f"{average:.2f}秒/個")
+        else:
+            st.metric("⚡ 轉換時間", "—")
+
+    with col4:
+        peaks = [metrics.peak_memory for metrics in rendered if metrics.peak_memory is not None]
+        if peaks:
+            st.metric("💾 記憶體峰值", f"{max(peaks) / 1024 / 1024:.1f} MB")
+        else:
+            st.metric("💾 記憶體峰值", "—")
+
+    st.markdown("---")
+
+    # 已轉換檔案列表
+    st.markdown("### 📁 已轉換的檔案")
+
+    if file_data:
+        st.dataframe(file_data, use_container_width=True, hide_index=True)
+        st.caption(f"共 {file_count} 個檔案，總計 {total_bytes / 1024 / 1024:.1f} MB"
+                   + (f" (顯示最新 {OUTPUT_LIST_LIMIT} 個)" if file_count > OUTPUT_LIST_LIMIT else ""))
+    else:
+        st.info("尚未有轉換檔案")
+
+    # 效能資訊 (最近一次轉換的實測結果)
+    st.markdown("---")
+    st.markdown("### ⚡ 效能資訊")
+
+    if metrics_list:
+        perf_data = []
+        for metrics in metrics_list:
+            row = metrics.summary()
+            perf_data.append({
+                '風格': row['style'],
+                '快取': '✓' if row['cached'] else '',
+                '解析 (秒)': f"{row['parse']:.3f}",
+                '複製 (秒)': f"{row['clone']:.3f}",
+                '套用 (秒)': f"{row['theme'] + row['apply']:.3f}",
+                '儲存 (秒)': f"{row['save']:.3f}",
+                '總計 (秒)': f"{row['total']:.3f}",
+                '形狀': row['shapes'],
+                '文字 run': row['runs'],
+                '記憶體峰值 (MB)': (f"{row['peak_memory'] / 1024 / 1024:.1f}"
+                                  if row['peak_memory'] is not None else '—'),
+            })
+
+        st.dataframe(perf_data, use_container_width=True, hide_index=True)
+
+        if rendered:
+            st.markdown("#### 🐢 最慢的投影片")
+            slow_data = []
+            for metrics in rendered:
+                for slide in metrics.slowest_slides(5):
+                    slow_data.append({
+                        '風格': metrics.style,
+                        '投影片': slide.index + 1,
+                        '耗時 (ms)': round(slide.seconds * 1000, 2),
+                        '形狀': slide.shapes,
+                        '文字 run': slide.runs,
+                    })
+            st.dataframe(slow_data, use_container_width=True, hide_index=True)
+    else:
+        st.info("尚無轉換紀錄，完成一次轉換後會顯示各階段的實測耗時")
+
+
+def show_help():
+    """TAB 4: 說明"""
+    st.markdown("## 使用說明")
+
+    col1, col2 = st.columns(2)
+
+    with col1:
+        st.markdown("### 🎯 快速開始")
         st.markdown("""
-        #### 1. 同時轉換多種風格
-        在「快速開始」中選擇多個風格，將同時產生多個版本的 PPT。
-        
-        #### 2. 批量轉換
-        使用命令行: `python ppt_style_converter.py input.pptx --all`
-        
-        #### 3. 自訂風格
-        編輯 `STYLE_PRESETS` 以建立公司品牌風格。
+        1. **建立示例** - 點擊「建立示例 PPT」按鈕
+        2. **選擇風格** - 選擇要轉換的設計風格
+        3. **上傳檔案** - 上傳你的 PPT 檔案
+        4. **開始轉換** - 點擊「開始轉換」按鈕
+        5. **下載結果** - 下載轉換後的 PPT
         """)
-        
-        st.markdown("---")
-        
-        st.markdown("### 📚 相關文件")
-        st.info("""
-        - README_ZH_TW.md - 詳細使用指南
-        - DEPLOYMENT_ZH_TW.md - 部署說明
-        - EXAMPLES_ZH_TW.md - 使用範例
+
+    with col2:
+        st.markdown("### 🎨 5 種風格")
+        st.markdown("""
+        - **Modern** - 現代科技風，適合技術演講
+        - **Minimal** - 極簡風格，清爽設計
+        - **Corporate** - 企業正式風，專業感
+        - **Creative** - 創意藝術風，充滿活力
+        - **Natural** - 清爽自然風，舒適感
         """)
-        
-        st.markdown("---")
-        
-        col1, col2, col3 = st.columns(3)
-        with col1:
-            st.markdown("**版本**: 1.0")
-        with col2:
-            st.markdown("**更新**: 2025-01-04")
-        with col3:
-            st.markdown("**作者**: AI Assistant")
+
+    st.markdown("---")
+
+    st.markdown("### 💡 進階技巧")
+    st.markdown("""
+    #### 1. 同時轉換多種風格
+    在「快速開始」中選擇多個風格，將同時產生多個版本的 PPT。
+
+    #### 2. 批量轉換
+    使用命令行: `python ppt_style_converter.py input.pptx --all`
+
+    #### 3. 自訂風格
+    由參考簡報或標誌擷取品牌色盤產生風格: `python ppt_palette.py brand.pptx --key acme --save`，
+    或編輯 `ppt_styles.py` 中的 `STYLE_PRESETS`。
+    """)
+
+    st.markdown("---")
+
+    st.markdown("### 📚 相關文件")
+    st.info("""
+    - README_ZH_TW.md - 詳細使用指南
+    - DEPLOYMENT_ZH_TW.md - 部署說明
+    - EXAMPLES_ZH_TW.md - 使用範例
+    """)
+
+    st.markdown("---")
+
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.markdown("**版本**: 1.0")
+    with col2:
+        st.markdown("**更新**: 2025-01-04")
+    with col3:
+        st.markdown("**作者**: AI Assistant")
 
 
 # ==================== 輔助函數 ====================
 
+def show_job_status():
+    """顯示目前背景工作的進度；完成時將結果存入 session state"""
+    job_id = st.session_state.current_job_id
+    if not job_id:
+        return
+    manager = get_job_manager()  # 有工作時才載入轉換器
+    job = manager.get(job_id)
+    if job is None:
+        return
+    
+    # 工作進行中時每 0.5 秒只重新執行此區塊
+    @st.fragment(run_every=0.5 if job.active else None)
+    def job_status():
+        job = manager.get(job_id)
+        if job is None:
+            st.warning("⚠️ 轉換工作已過期，請重新轉換")
+            return
+        
+        if job.active:
+            st.progress(job.progress, text=f"⏳ {job.progress_text()}")
+        elif job.status == 'failed':
+            st.error(f"❌ 轉換失敗: {job.error}")
+        elif st.session_state.result_job_id != job.job_id:
+            st.session_state.converted_bundle = job.bundle
+            st.session_state.converted_files = job.files
+            st.session_state.conversion_metrics = job.metrics
+            st.session_state.conversion_complete = True
+            st.session_state.result_job_id = job.job_id
+            # 重新執行整個頁面以顯示下載區與統計
+            st.rerun()
+        else:
+            st.success("✅ 轉換完成！")
+    
+    job_status()
+
+
 @st.cache_resource
 def create_sample_ppt():
     """建立示例 PPT"""
@@ -478,3 +691,5 @@ def create_sample_ppt():
 # ==================== 執行應用 ====================
 if __name__ == '__main__':
     main()
+    # 本次執行的耗時 (ppt_benchmark.py --app 讀取)
+    st.session_state.last_run_seconds = time.perf_counter() - _RUN_STARTED
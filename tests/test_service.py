@@ -0,0 +1,70 @@
+# 轉換服務行程池重建測試
+# 工作行程異常結束且第一次重建失敗後，後續請求仍能重建行程池並完成轉換
+
+import io
+import os
+import sys
+from pathlib import Path
+from wsgiref.util import setup_testing_defaults
+
+import pytest
+from pptx import Presentation
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import ppt_service  # noqa: E402
+
+
+def _crash(*args, **kwargs):
+    """模擬工作行程異常結束 (例如記憶體不足)"""
+    os._exit(1)
+
+
+def _failing_init(*args, **kwargs):
+    """模擬新行程池的初始化失敗"""
+    raise RuntimeError('warm-up failed')
+
+
+def _deck() -> bytes:
+    prs = Presentation()
+    slide = prs.slides.add_slide(prs.slide_layouts[1])
+    slide.shapes.title.text = 'restart'
+    buffer = io.BytesIO()
+    prs.save(buffer)
+    return buffer.getvalue()
+
+
+def _post(service, data: bytes) -> str:
+    environ = {}
+    setup_testing_defaults(environ)
+    environ.update(REQUEST_METHOD='POST', PATH_INFO='/convert', QUERY_STRING='styles=modern',
+                   CONTENT_LENGTH=str(len(data)), CONTENT_TYPE='application/octet-stream',
+                   **{'wsgi.input': io.BytesIO(data)})
+    status = []
+    b''.join(service(environ, lambda s, headers, exc_info=None: status.append(s)))
+    return status[0]
+
+
+@pytest.fixture
+def service():
+    service = ppt_service.ConversionService(workers=1, max_queue=1, timeout=60)
+    yield service
+    service.close()
+
+
+def test_request_succeeds_after_failed_restart(service, monkeypatch):
+    data = _deck()
+    assert _post(service, data).startswith('200')
+
+    # 工作行程異常結束，重建時新行程池的初始化也失敗
+    monkeypatch.setattr(ppt_service, '_convert', _crash)
+    monkeypatch.setattr(ppt_service, '_init_service_worker', _failing_init)
+    assert _post(service, data).startswith('503')
+    assert service._executor is not None
+    assert not service.healthy
+
+    # 問題排除後，下一個請求再次重建行程池並完成轉換
+    monkeypatch.undo()
+    assert _post(service, data).startswith('200')
+    assert service.healthy
+    assert _post(service, data).startswith('200')